@@ -20,7 +20,7 @@ export const createActorDrawer = (context) => {
     const { sprite, segment } = actor;
     const meta = sprite.meta;
     const frames = meta.frames;
-    const anchor = Object.values(frames)[0]?.anchor || { x: 256, y: 480 };
+    const defaultAnchor = Object.values(frames)[0]?.anchor || { x: 256, y: 480 };
     const sleeping = actor.sleepUntil > now;
     const eating = actor.eatUntil > now;
     const drinking = actor.drinkUntil > now;
@@ -99,17 +99,22 @@ export const createActorDrawer = (context) => {
       actor.position = { x, y };
     }
 
-    const frameScale = (mapData.meta.tileSize * scale * ASSET_SCALE) / frame.w;
-    const destX = x * scale - anchor.x * frameScale;
-    const destY = y * scale - anchor.y * frameScale;
-    const drawW = frame.w * frameScale;
-    const drawH = frame.h * frameScale;
+    // Trimmed frames carry their own anchor and untrimmed sourceSize, so
+    // scale by the source width and mirror around the anchor.
+    const anchor = frameEntry.anchor || defaultAnchor;
+    const sourceW = frameEntry.sourceSize?.w || frame.w;
+    const frameScale = (mapData.meta.tileSize * scale * ASSET_SCALE) / sourceW;
     const directionFlip = actor.facing === -1;
     const actionFlip =
       Array.isArray(sprite.pony.sprite_flip_actions) &&
       sprite.pony.sprite_flip_actions.includes(actionId);
     const baseFlip = Boolean(sprite.pony.sprite_flip);
     const flip = directionFlip !== (actionFlip ? !baseFlip : baseFlip);
+    const anchorX = flip ? frame.w - anchor.x : anchor.x;
+    const destX = x * scale - anchorX * frameScale;
+    const destY = y * scale - anchor.y * frameScale;
+    const drawW = frame.w * frameScale;
+    const drawH = frame.h * frameScale;
 
     if (flip) {
       ctx.save();
@@ -170,11 +175,17 @@ export const createActorDrawer = (context) => {
       }
     });
 
+    // Hit box and label follow the untrimmed cell so they do not jitter as
+    // trimmed frames change size.
+    const trim = frameEntry.spriteSourceSize || { x: 0, y: 0 };
+    const cellAnchorX = anchor.x + trim.x;
+    const cellX = x * scale - (flip ? sourceW - cellAnchorX : cellAnchorX) * frameScale;
+    const cellY = destY - trim.y * frameScale;
     actor.bounds = {
-      x: destX - 6,
-      y: destY - 6,
-      width: drawW + 12,
-      height: drawH + 12,
+      x: cellX - 6,
+      y: cellY - 6,
+      width: sourceW * frameScale + 12,
+      height: (frameEntry.sourceSize?.h || frame.h) * frameScale + 12,
     };
 
     const ponySlug = (sprite.pony.slug || "").toLowerCase();
@@ -200,7 +211,7 @@ export const createActorDrawer = (context) => {
     const iconSize = Math.round(fontSize * 1.35);
     const lineHeight = Math.max(fontSize + 6, iconSize + 6);
     const labelX = Math.round(x * scale);
-    const labelY = Math.round(destY - 8);
+    const labelY = Math.round(cellY - 8);
     const paddingX = 12;
     const paddingY = 8;
     const iconGap = Math.max(4, Math.round(fontSize * 0.3));
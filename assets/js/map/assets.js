@@ -85,13 +85,13 @@ export const loadPonySprites = async ({ ponies, loadImageWithFallback, loadJson
         const metaPath = pony.sprites.meta;
         const meta = await loadJson(metaPath);
         const basePath = metaPath.slice(0, metaPath.lastIndexOf("/") + 1);
+        const resolveSheetImage = (image) =>
+          image.startsWith("/") || image.startsWith("assets/") ? image : `${basePath}${image}`;
         const metaImage = meta.meta && meta.meta.image ? meta.meta.image : "";
         const sheetPath = pony.sprites.sheet
           ? pony.sprites.sheet
           : metaImage
-            ? metaImage.startsWith("/") || metaImage.startsWith("assets/")
-              ? metaImage
-              : `${basePath}${metaImage}`
+            ? resolveSheetImage(metaImage)
             : "";
         if (!sheetPath) {
           return null;
@@ -100,7 +100,15 @@ export const loadPonySprites = async ({ ponies, loadImageWithFallback, loadJson
         if (!sheet) {
           return null;
         }
-        const sheets = [sheet];
+        // Multi-page sheets list their extra pages after the first image;
+        // frame entries pick a page by their `sheet` index.
+        const extraPages = Array.isArray(meta.meta?.images) ? meta.meta.images.slice(1) : [];
+        const pages = await Promise.all(
+          extraPages.map((image) =>
+            loadImageWithFallback(resolveSheetImage(image)).catch(() => null)
+          )
+        );
+        const sheets = [sheet, ...pages];
         const moveType = meta.animations.walk
           ? "walk"
           : meta.animations.trot
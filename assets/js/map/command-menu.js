@@ -5,6 +5,7 @@ export const createCommandMenu = ({
   actors,
   actorBySlug,
   getWebpCandidates,
+  pickImageVariant,
   getStructureLabel,
   getSpotForLocationId,
   foodSpotById,
@@ -209,7 +210,9 @@ export const createCommandMenu = ({
     actors.forEach((actor) => {
       const pony = actor.sprite?.pony;
       if (!pony || !pony.slug) return;
-      const imagePath = `assets/ponies/${pony.slug}.png`;
+      const imagePath =
+        (pony.portrait && pickImageVariant(pony.portrait, 46, window.devicePixelRatio)) ||
+        `assets/ponies/${pony.slug}.png`;
       const [primaryImage, fallbackImage] = getWebpCandidates(imagePath);
       const button = document.createElement("button");
       const ponyName = pony.name || "Pony";
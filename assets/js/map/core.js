@@ -1,7 +1,7 @@
 // Pony Parade: map rendering and interactions.
 
 import { ponyMap, mapStatus, mapTooltip } from "../dom.js";
-import { getWebpCandidates, loadImageWithFallback, loadJson } from "../utils.js";
+import { getWebpCandidates, loadImageWithFallback, loadJson, pickImageVariant } from "../utils.js";
 import { HAS_API, apiUrl } from "../api_mode.js";
 import { createActorPipeline } from "./actor-pipeline.js";
 import { createRenderer } from "./draw.js";
@@ -313,6 +313,7 @@ export const initMap = async (mapData, ponies, locations, runtimeState) => {
     actors,
     actorBySlug,
     getWebpCandidates,
+    pickImageVariant,
     getStructureLabel,
     getSpotForLocationId: taskHelpers.getSpotForLocationId,
     foodSpotById,
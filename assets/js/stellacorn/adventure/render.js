@@ -74,8 +74,8 @@ function drawTiles(state) {
         ctx.fillRect(x, y, tileSize, tileSize);
         continue;
       }
-      if (img && img.complete && img.naturalWidth > 0) {
-        ctx.drawImage(img, x, y, tileSize, tileSize);
+      if (isSpriteReady(img)) {
+        drawSprite(ctx, img, x, y, tileSize, tileSize);
       } else {
         ctx.fillStyle = def?.color || "#3b4b45";
         ctx.fillRect(x, y, tileSize, tileSize);
@@ -88,6 +88,22 @@ function drawTiles(state) {
   }
 }
 
+// Tile and object sprites are either an Image or a mission atlas frame
+// ({ image, frame: { x, y, w, h } }).
+function isSpriteReady(sprite) {
+  const image = sprite?.frame ? sprite.image : sprite;
+  return Boolean(image && image.complete && image.naturalWidth > 0);
+}
+
+function drawSprite(ctx, sprite, x, y, width, height) {
+  if (sprite.frame) {
+    const { frame } = sprite;
+    ctx.drawImage(sprite.image, frame.x, frame.y, frame.w, frame.h, x, y, width, height);
+    return;
+  }
+  ctx.drawImage(sprite, x, y, width, height);
+}
+
 function drawObjects(state) {
   const { ctx, objects, camera, tileSize, objectSprites, getObjectSprite } = state;
   if (!ctx) return;
@@ -98,8 +114,8 @@ function drawObjects(state) {
     const centerX = (obj.tx + 0.5) * tileSize - camera.x;
     const centerY = (obj.ty + 0.5) * tileSize - camera.y;
     const size = tileSize * 1.1;
-    if (sprite && sprite.complete && sprite.naturalWidth > 0) {
-      ctx.drawImage(sprite, centerX - size / 2, centerY - size / 2, size, size);
+    if (isSpriteReady(sprite)) {
+      drawSprite(ctx, sprite, centerX - size / 2, centerY - size / 2, size, size);
       return;
     }
     ctx.beginPath();
@@ -140,19 +156,22 @@ function drawPlayer(state) {
       frameNames[playerSprite.frameIndex % frameNames.length] || frameNames[0];
     const entry = playerSprite.frames[frameName];
     const frame = entry?.frame;
-    if (frame) {
+    const sheetImage = playerSprite.images?.[entry?.sheet] || playerSprite.image;
+    if (frame && sheetImage.complete) {
       const anchor = entry.anchor || { x: frame.w / 2, y: frame.h };
-      const scale = (tileSize * playerScale) / frame.w;
+      // Trimmed frames scale by their untrimmed width and mirror around the anchor.
+      const scale = (tileSize * playerScale) / (entry.sourceSize?.w || frame.w);
+      const flip = player.facing === -1;
       const drawW = frame.w * scale;
       const drawH = frame.h * scale;
-      const destX = player.px - camera.x - anchor.x * scale;
+      const destX = player.px - camera.x - (flip ? frame.w - anchor.x : anchor.x) * scale;
       const destY = player.py - camera.y - anchor.y * scale;
-      if (player.facing === -1) {
+      if (flip) {
         ctx.save();
         ctx.translate(destX + drawW, 0);
         ctx.scale(-1, 1);
         ctx.drawImage(
-          playerSprite.image,
+          sheetImage,
           frame.x,
           frame.y,
           frame.w,
@@ -166,7 +185,7 @@ function drawPlayer(state) {
         return;
       }
       ctx.drawImage(
-        playerSprite.image,
+        sheetImage,
         frame.x,
         frame.y,
         frame.w,
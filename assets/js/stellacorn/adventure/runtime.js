@@ -10,6 +10,26 @@ const IS_TOUCH_DEVICE =
   typeof window !== "undefined" &&
   ("ontouchstart" in window || navigator.maxTouchPoints > 0);
 const DOUBLE_TAP_MS = 320;
+const CHUNK_PREFETCH_RADIUS = 1;
+
+export function decodeTiles(value, encoding) {
+  if (!encoding) return Array.isArray(value) ? value : [];
+  if (encoding === "rle") {
+    const tiles = [];
+    for (let i = 0; i + 1 < value.length; i += 2) {
+      for (let n = 0; n < value[i + 1]; n += 1) tiles.push(value[i]);
+    }
+    return tiles;
+  }
+  if (encoding === "u16-base64") {
+    const bytes = Uint8Array.from(atob(value), (ch) => ch.charCodeAt(0));
+    const view = new DataView(bytes.buffer);
+    const tiles = new Array(bytes.length >> 1);
+    for (let i = 0; i < tiles.length; i += 1) tiles[i] = view.getUint16(i * 2, true);
+    return tiles;
+  }
+  throw new Error(`Unsupported tile encoding: ${encoding}`);
+}
 
 export async function loadRuntime({
   missionPath,
@@ -28,6 +48,7 @@ export async function loadRuntime({
   let missionConfig = null;
   let missionBaseUrl = null;
   let assetRootUrl = null;
+  let atlas = null;
   let tileDefs = new Map();
   let objectDefs = new Map();
   let tileImages = new Map();
@@ -36,6 +57,8 @@ export async function loadRuntime({
   let mapHeight = 0;
   let tileSize = 64;
   let tiles = [];
+  let mapChunks = null;
+  let chunkSize = 0;
   let objects = [];
   let activePath = [];
   let interactable = null;
@@ -131,15 +154,18 @@ export async function loadRuntime({
     missionConfig = await missionResponse.json();
     assetRootUrl = resolveMissionUrl(missionConfig.assetRoot || "./", true);
 
-    const [mapData, tilesData, objectsData] = await Promise.all([
+    const [mapData, tilesData, objectsData, atlasData] = await Promise.all([
       fetchJson(resolveMissionUrl(missionConfig.map)),
       fetchJson(resolveMissionUrl(missionConfig.tiles)),
       fetchJson(resolveMissionUrl(missionConfig.objects)),
+      missionConfig.atlas ? loadAtlas(resolveMissionUrl(missionConfig.atlas)) : null,
     ]);
+    atlas = atlasData;
 
     hydrateTiles(tilesData);
     hydrateObjects(objectsData, mapData);
     hydrateMap(mapData);
+    await loadChunksNear(player.tx, player.ty);
     await loadPlayerSprite();
     resetFogOfWar();
     updateFogOfWar();
@@ -189,15 +215,61 @@ export async function loadRuntime({
     return new URL(asset, assetRootUrl).toString();
   }
 
+  async function loadAtlas(url) {
+    // One request per atlas page instead of one per tile/object image; any
+    // failure falls back to loading each asset separately.
+    try {
+      const data = await fetchJson(url);
+      const result = { frames: data.frames || {}, images: [] };
+      result.images = (data.images || []).map((entry, index) => {
+        const image = new Image();
+        image.onerror = () => {
+          console.warn(`Atlas page failed to load: ${image.src}`);
+          result.images[index] = null;
+          restoreAtlasPage(image);
+        };
+        image.src = new URL(entry.path, url).toString();
+        return image;
+      });
+      return result;
+    } catch (error) {
+      console.warn(error);
+      return null;
+    }
+  }
+
+  function restoreAtlasPage(page) {
+    // Sprites already handed out for a broken page go back to per-file images.
+    [tileImages, objectSprites].forEach((sprites) => {
+      sprites.forEach((sprite, key) => {
+        if (sprite?.frame && sprite.image === page) {
+          sprites.set(key, loadImage(sprite.asset));
+        }
+      });
+    });
+  }
+
+  function loadImage(asset) {
+    const image = new Image();
+    image.src = resolveAssetPath(asset);
+    return image;
+  }
+
+  function createSprite(asset) {
+    const frame = atlas?.frames?.[asset];
+    if (frame && atlas.images[frame.image]) {
+      return { image: atlas.images[frame.image], frame, asset };
+    }
+    return loadImage(asset);
+  }
+
   function hydrateTiles(tilesData) {
     tileDefs = new Map();
     tileImages = new Map();
     (tilesData.tiles || []).forEach((tile) => {
       tileDefs.set(tile.id, tile);
       if (tile.asset) {
-        const image = new Image();
-        image.src = resolveAssetPath(tile.asset);
-        tileImages.set(tile.id, image);
+        tileImages.set(tile.id, createSprite(tile.asset));
       }
     });
     renderState.tileDefs = tileDefs;
@@ -215,9 +287,7 @@ export async function loadRuntime({
       const def = objectDefs.get(obj.type);
       const asset = def?.asset ? resolveAssetPath(def.asset) : "";
       if (asset && !objectSprites.has(obj.type)) {
-        const image = new Image();
-        image.src = asset;
-        objectSprites.set(obj.type, image);
+        objectSprites.set(obj.type, createSprite(def.asset));
       }
       return {
         id: obj.id,
@@ -245,7 +315,17 @@ export async function loadRuntime({
   function hydrateMap(mapData) {
     mapWidth = mapData.width || 0;
     mapHeight = mapData.height || 0;
-    tiles = Array.isArray(mapData.tiles) ? mapData.tiles : [];
+    mapChunks = null;
+    if (Array.isArray(mapData.chunks)) {
+      chunkSize = mapData.chunkSize || 32;
+      mapChunks = new Map();
+      mapData.chunks.forEach((chunk) => {
+        mapChunks.set(`${chunk.cx},${chunk.cy}`, { ...chunk, state: "pending" });
+      });
+      tiles = new Array(mapWidth * mapHeight).fill(null);
+    } else {
+      tiles = decodeTiles(mapData.tiles, mapData.encoding);
+    }
     tileSize = missionConfig.tileSize || 64;
     const spawn = missionConfig.spawn || { tx: 0, ty: 0 };
     player.tx = spawn.tx;
@@ -264,6 +344,40 @@ export async function loadRuntime({
     renderState.tiles = tiles;
   }
 
+  function loadChunksNear(tx, ty) {
+    if (!mapChunks) return Promise.resolve();
+    const ccx = Math.floor(tx / chunkSize);
+    const ccy = Math.floor(ty / chunkSize);
+    const loads = [];
+    for (let dy = -CHUNK_PREFETCH_RADIUS; dy <= CHUNK_PREFETCH_RADIUS; dy += 1) {
+      for (let dx = -CHUNK_PREFETCH_RADIUS; dx <= CHUNK_PREFETCH_RADIUS; dx += 1) {
+        const chunk = mapChunks.get(`${ccx + dx},${ccy + dy}`);
+        if (!chunk || chunk.state !== "pending") continue;
+        chunk.state = "loading";
+        loads.push(loadChunk(chunk));
+      }
+    }
+    return Promise.all(loads);
+  }
+
+  async function loadChunk(chunk) {
+    try {
+      const data = Array.isArray(chunk.tiles)
+        ? chunk
+        : await fetchJson(resolveMissionUrl(chunk.path));
+      const chunkTiles = decodeTiles(data.tiles, data.encoding);
+      for (let ly = 0; ly < chunk.h; ly += 1) {
+        for (let lx = 0; lx < chunk.w; lx += 1) {
+          tiles[(chunk.y + ly) * mapWidth + chunk.x + lx] = chunkTiles[ly * chunk.w + lx] ?? null;
+        }
+      }
+      chunk.state = "loaded";
+    } catch (error) {
+      console.error(error);
+      chunk.state = "pending";
+    }
+  }
+
   async function loadPlayerSprite() {
     try {
       const response = await fetch(playerSpriteMetaUrl, { cache: "no-store" });
@@ -273,8 +387,16 @@ export async function loadRuntime({
       const data = await response.json();
       const image = new Image();
       image.src = playerSpriteSheetUrl;
+      // Extra pages of a multi-page sheet sit next to spritesheet.json.
+      const metaUrl = new URL(playerSpriteMetaUrl, window.location.href);
+      const pages = (data.meta?.images || []).slice(1).map((name) => {
+        const page = new Image();
+        page.src = new URL(name, metaUrl).toString();
+        return page;
+      });
       playerSprite = {
         image,
+        images: [image, ...pages],
         frames: data.frames || {},
         animations: data.animations || {},
         fps: data.fps || {},
@@ -716,7 +838,7 @@ export async function loadRuntime({
 
   function getTile(tx, ty) {
     if (tx < 0 || ty < 0 || tx >= mapWidth || ty >= mapHeight) return 0;
-    return tiles[ty * mapWidth + tx] ?? 0;
+    return tiles[ty * mapWidth + tx] ?? (mapChunks ? null : 0);
   }
 
   function isWalkable(tx, ty) {
@@ -771,6 +893,7 @@ export async function loadRuntime({
   }
 
   function updateFogOfWar() {
+    loadChunksNear(player.tx, player.ty);
     const radiusSq = FOG_RADIUS * FOG_RADIUS;
     const nextVisible = new Set();
     for (let dy = -FOG_RADIUS; dy <= FOG_RADIUS; dy += 1) {
@@ -799,10 +922,9 @@ export async function loadRuntime({
     if (objectSprites.has(type)) return objectSprites.get(type);
     const def = objectDefs.get(type);
     if (!def?.asset) return null;
-    const image = new Image();
-    image.src = resolveAssetPath(def.asset);
-    objectSprites.set(type, image);
-    return image;
+    const sprite = createSprite(def.asset);
+    objectSprites.set(type, sprite);
+    return sprite;
   }
 
   function setObjectType(obj, type) {
@@ -821,9 +943,7 @@ export async function loadRuntime({
       blockedByObjects.add(tileKey(obj.tx, obj.ty));
     }
     if (obj.asset && !objectSprites.has(type)) {
-      const image = new Image();
-      image.src = obj.asset;
-      objectSprites.set(type, image);
+      objectSprites.set(type, createSprite(def.asset));
     }
   }
 
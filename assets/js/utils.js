@@ -26,6 +26,18 @@ export const getWebpCandidates = (path) => {
   return [path];
 };
 
+// Picks the smallest recorded variant that still covers the display size,
+// falling back to the full-size image. `image` is { path, variants: [{ size, path }] }.
+export const pickImageVariant = (image, displaySize, pixelRatio = 1) => {
+  if (!image || !image.path) return "";
+  const target = displaySize * (pixelRatio || 1);
+  const variants = Array.isArray(image.variants) ? image.variants : [];
+  const match = variants
+    .filter((variant) => variant && variant.path && variant.size >= target)
+    .sort((a, b) => a.size - b.size)[0];
+  return match ? match.path : image.path;
+};
+
 export const loadImageCandidates = async (paths, { cacheBust } = {}) => {
   let lastError = null;
   for (const path of paths) {
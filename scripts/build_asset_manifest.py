@@ -1,6 +1,8 @@
 #!/usr/bin/env python3
 import argparse
+import hashlib
 import json
+import os
 import sys
 from pathlib import Path
 
@@ -17,6 +19,12 @@ from scripts.generate_adventure_assets import (  # noqa: E402
     TILE_PROMPTS,
     TREE_PROMPTS,
 )
+from scripts.sprites import images_api  # noqa: E402
+
+DEFAULT_CACHE = ROOT / "data" / "_generated" / "asset-manifest-cache.json"
+CACHE_VERSION = 1
+HASH_CHUNK = 1024 * 1024
+GENERATOR_SOURCES = (Path(__file__).resolve(), ROOT / "scripts" / "generate_adventure_assets.py")
 
 
 def parse_args():
@@ -33,6 +41,17 @@ def parse_args():
         default=ROOT / "assets" / "library" / "maps",
         help="Asset library root (default: assets/library/maps).",
     )
+    parser.add_argument(
+        "--cache",
+        type=Path,
+        default=DEFAULT_CACHE,
+        help="Sidecar metadata cache (default: data/_generated/asset-manifest-cache.json).",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Ignore the sidecar cache and rescan every file.",
+    )
     return parser.parse_args()
 
 
@@ -44,6 +63,152 @@ def list_webp(directory):
     return sorted(Path(directory).glob("*.webp"))
 
 
+def split_variants(paths):
+    # Separates <name>@<size>.webp variants from the assets they belong to.
+    assets = []
+    variants = {}
+    for path in paths:
+        if images_api.is_variant_path(path):
+            stem, _, size = path.stem.rpartition(images_api.VARIANT_SEPARATOR)
+            variants.setdefault(stem, []).append({"size": int(size), "path": rel(path)})
+        else:
+            assets.append(path)
+    for entries in variants.values():
+        entries.sort(key=lambda item: item["size"])
+    return assets, variants
+
+
+def file_record(role, label, path, variants=None):
+    record = {"role": role, "label": label, "path": rel(path)}
+    if variants:
+        record["variants"] = variants
+    return record
+
+
+def _file_sha256(path):
+    digest = hashlib.sha256()
+    with Path(path).open("rb") as handle:
+        for chunk in iter(lambda: handle.read(HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _signature(value):
+    payload = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ManifestCache:
+    # Sidecar cache for incremental manifest builds. Keeps, per library
+    # directory, its mtime and *.webp listing; per file, its size/mtime and
+    # sha256; and per asset group, the signature of its inputs plus the entries
+    # it produced. Unchanged directories skip the glob, unchanged files skip
+    # hashing, and groups whose inputs hash the same reuse their entries.
+    # Groups are also keyed on the hash of this script and the prompt module it
+    # imports, so code or prompt edits rebuild every group.
+    def __init__(self, path=None):
+        self.path = Path(path) if path else None
+        self.generator = _signature([_file_sha256(source) for source in GENERATOR_SOURCES])
+        self.dirs = {}
+        self.files = {}
+        self.groups = {}
+        self.stats = {"hashed": 0, "groups_reused": 0, "groups_rebuilt": 0}
+        self._used_dirs = set()
+        self._used_files = set()
+        self._used_groups = set()
+        data = self._load()
+        if data:
+            self.dirs = data.get("dirs") or {}
+            self.files = data.get("files") or {}
+            if data.get("generator") == self.generator:
+                self.groups = data.get("groups") or {}
+
+    def _load(self):
+        if not self.path:
+            return None
+        try:
+            with self.path.open("r", encoding="utf-8") as handle:
+                data = json.load(handle)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(data, dict) or data.get("version") != CACHE_VERSION:
+            return None
+        return data
+
+    def list_webp(self, directory):
+        directory = Path(directory)
+        key = rel(directory)
+        self._used_dirs.add(key)
+        try:
+            mtime_ns = directory.stat().st_mtime_ns
+        except OSError:
+            self.dirs.pop(key, None)
+            return []
+        cached = self.dirs.get(key)
+        if cached and cached.get("mtime_ns") == mtime_ns:
+            return [directory / name for name in cached.get("names", [])]
+        paths = list_webp(directory)
+        self.dirs[key] = {"mtime_ns": mtime_ns, "names": [path.name for path in paths]}
+        return paths
+
+    def file_sha256(self, path):
+        key = rel(path)
+        self._used_files.add(key)
+        try:
+            stat = Path(path).stat()
+        except OSError:
+            self.files.pop(key, None)
+            return None
+        cached = self.files.get(key)
+        if cached and cached.get("size") == stat.st_size and cached.get("mtime_ns") == stat.st_mtime_ns:
+            return cached["sha256"]
+        digest = _file_sha256(path)
+        self.stats["hashed"] += 1
+        self.files[key] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": digest}
+        return digest
+
+    def group(self, key, inputs, build):
+        self._used_groups.add(key)
+        signature = _signature(inputs)
+        cached = self.groups.get(key)
+        if cached and cached.get("signature") == signature:
+            self.stats["groups_reused"] += 1
+            return cached["assets"]
+        assets = build()
+        self.stats["groups_rebuilt"] += 1
+        self.groups[key] = {"signature": signature, "assets": assets}
+        return assets
+
+    def save(self):
+        if not self.path:
+            return
+        # Drop records for directories, files and groups this build no longer saw.
+        payload = {
+            "version": CACHE_VERSION,
+            "generator": self.generator,
+            "dirs": {key: value for key, value in sorted(self.dirs.items()) if key in self._used_dirs},
+            "files": {key: value for key, value in sorted(self.files.items()) if key in self._used_files},
+            "groups": {key: value for key, value in sorted(self.groups.items()) if key in self._used_groups},
+        }
+        _write_if_changed(self.path, json.dumps(payload, indent=2) + "\n")
+
+
+def _write_if_changed(path, text):
+    # Leaves the file (and its mtime) alone when the content is identical, so
+    # watchers and the server's manifest reload only react to real changes.
+    path = Path(path)
+    try:
+        if path.read_text(encoding="utf-8") == text:
+            return False
+    except OSError:
+        pass
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_text(text, encoding="utf-8")
+    os.replace(tmp_path, path)
+    return True
+
+
 def read_prompt_variations(path):
     try:
         with Path(path).open("r", encoding="utf-8") as handle:
@@ -78,7 +243,8 @@ def build_regenerate_command(script, flag, name, extra=None):
     return " ".join(parts)
 
 
-def build_manifest(library_root):
+def build_manifest(library_root, cache=None):
+    cache = cache or ManifestCache()
     base_meta = {
         "style": "storybook_fantasy",
         "alpha_correction": "none",
@@ -114,30 +280,45 @@ def build_manifest(library_root):
         prompt_source=None,
         regen_builder=None,
     ):
-        for path in list_webp(directory):
-            label = path.stem
-            prompt = prompt_lookup.get(label) if prompt_lookup else None
-            prompt_status = "ok" if prompt else "missing"
-            regenerate = None
-            if regen_builder and prompt:
-                regenerate = regen_builder(label)
-            add_asset(
-                id=f"{collection}-{type_label}-{label}",
-                title=f"{title_prefix}: {label.replace('-', ' ').replace('_', ' ')}",
-                system=system,
-                type=type_label,
-                stage=stage,
-                script=script,
-                source={"path": source_path},
-                preview=rel(path),
-                prompt=prompt,
-                prompt_profile=meta.get("prompt_profile"),
-                prompt_status=prompt_status,
-                prompt_source=prompt_source,
-                regenerate=regenerate,
-                meta={**meta, "collection": collection},
-                files=[{"role": role, "label": label, "path": rel(path)}],
-            )
+        paths, variants = split_variants(cache.list_webp(directory))
+
+        def build():
+            entries = []
+            for path in paths:
+                label = path.stem
+                prompt = prompt_lookup.get(label) if prompt_lookup else None
+                prompt_status = "ok" if prompt else "missing"
+                regenerate = None
+                if regen_builder and prompt:
+                    regenerate = regen_builder(label)
+                entries.append(
+                    dict(
+                        id=f"{collection}-{type_label}-{label}",
+                        title=f"{title_prefix}: {label.replace('-', ' ').replace('_', ' ')}",
+                        system=system,
+                        type=type_label,
+                        stage=stage,
+                        script=script,
+                        source={"path": source_path},
+                        preview=rel(path),
+                        prompt=prompt,
+                        prompt_profile=meta.get("prompt_profile"),
+                        prompt_status=prompt_status,
+                        prompt_source=prompt_source,
+                        regenerate=regenerate,
+                        meta={**meta, "collection": collection},
+                        files=[file_record(role, label, path, variants.get(label))],
+                    )
+                )
+            return entries
+
+        inputs = {
+            "files": [[rel(path), cache.file_sha256(path)] for path in paths],
+            "variants": variants,
+            "settings": [system, type_label, stage, script, collection, source_path, meta, role, title_prefix],
+            "prompt_source": prompt_source,
+        }
+        assets.extend(cache.group(rel(directory), inputs, build))
 
     tile_prompts = {**TILE_PROMPTS, **OVERLAY_PROMPTS}
 
@@ -352,57 +533,70 @@ def build_manifest(library_root):
         prompt_lookup=None,
     )
 
-    prompt_variations = read_prompt_variations(
-        ROOT / "adventures" / "missions" / "stellacorn" / "mission2" / "prompts" / "corrupted-oak.json"
-    )
-    variation_prompts = {}
-    if prompt_variations:
-        for variant_id, variant_prompt in prompt_variations["variants"].items():
-            variation_prompts[variant_id] = {
-                "base": prompt_variations["base_prompt"],
-                "variant": variant_prompt,
-                "prompt": f"{prompt_variations['base_prompt']} {variant_prompt}".strip(),
-            }
+    prompt_json = ROOT / "adventures" / "missions" / "stellacorn" / "mission2" / "prompts" / "corrupted-oak.json"
+    mission2_dir = library_root / "sprites" / "packed" / "stellacorn" / "mission2"
+    mission2_paths, mission2_variants = split_variants(cache.list_webp(mission2_dir))
+
+    def build_mission2():
+        prompt_variations = read_prompt_variations(prompt_json)
+        variation_prompts = {}
+        if prompt_variations:
+            for variant_id, variant_prompt in prompt_variations["variants"].items():
+                variation_prompts[variant_id] = {
+                    "base": prompt_variations["base_prompt"],
+                    "variant": variant_prompt,
+                    "prompt": f"{prompt_variations['base_prompt']} {variant_prompt}".strip(),
+                }
+
+        entries = []
+        for path in mission2_paths:
+            label = path.stem
+            parts = label.split("-")
+            variant_id = parts[-1] if parts else ""
+            prompt_data = variation_prompts.get(variant_id, {})
+            prompt = prompt_data.get("prompt")
+            entries.append(
+                dict(
+                    id=f"stellacorn-mission2-sprite-{label}",
+                    title=f"Mission 2 Sprite: {label.replace('-', ' ')}",
+                    system="adventure_map",
+                    type="sprite",
+                    stage="packed",
+                    script="scripts/generate_prompt_variations.py",
+                    source={
+                        "mission": "stellacorn/mission2",
+                        "path": "adventures/missions/stellacorn/mission2/adventures/sprites/mission2",
+                    },
+                    preview=rel(path),
+                    prompt=prompt,
+                    prompt_base=prompt_data.get("base"),
+                    prompt_variant=prompt_data.get("variant"),
+                    prompt_profile=base_meta["prompt_profile"],
+                    prompt_status="ok" if prompt else "missing",
+                    prompt_source="adventures/missions/stellacorn/mission2/prompts/corrupted-oak.json",
+                    regenerate={
+                        "command": (
+                            "python3 scripts/generate_prompt_variations.py "
+                            "--prompt-json adventures/missions/stellacorn/mission2/prompts/corrupted-oak.json "
+                            "--force"
+                        ),
+                        "notes": "Regenerates all corrupted-oak variants.",
+                    }
+                    if prompt
+                    else None,
+                    meta={**base_meta, "collection": "stellacorn_mission2_sprites"},
+                    files=[file_record("sprite", label, path, mission2_variants.get(label))],
+                )
+            )
+        return entries
 
-    for path in list_webp(
-        library_root / "sprites" / "packed" / "stellacorn" / "mission2"
-    ):
-        label = path.stem
-        parts = label.split("-")
-        variant_id = parts[-1] if parts else ""
-        prompt_data = variation_prompts.get(variant_id, {})
-        prompt = prompt_data.get("prompt")
-        add_asset(
-            id=f"stellacorn-mission2-sprite-{label}",
-            title=f"Mission 2 Sprite: {label.replace('-', ' ')}",
-            system="adventure_map",
-            type="sprite",
-            stage="packed",
-            script="scripts/generate_prompt_variations.py",
-            source={
-                "mission": "stellacorn/mission2",
-                "path": "adventures/missions/stellacorn/mission2/adventures/sprites/mission2",
-            },
-            preview=rel(path),
-            prompt=prompt,
-            prompt_base=prompt_data.get("base"),
-            prompt_variant=prompt_data.get("variant"),
-            prompt_profile=base_meta["prompt_profile"],
-            prompt_status="ok" if prompt else "missing",
-            prompt_source="adventures/missions/stellacorn/mission2/prompts/corrupted-oak.json",
-            regenerate={
-                "command": (
-                    "python3 scripts/generate_prompt_variations.py "
-                    "--prompt-json adventures/missions/stellacorn/mission2/prompts/corrupted-oak.json "
-                    "--force"
-                ),
-                "notes": "Regenerates all corrupted-oak variants.",
-            }
-            if prompt
-            else None,
-            meta={**base_meta, "collection": "stellacorn_mission2_sprites"},
-            files=[{"role": "sprite", "label": label, "path": rel(path)}],
-        )
+    mission2_inputs = {
+        "files": [[rel(path), cache.file_sha256(path)] for path in mission2_paths],
+        "variants": mission2_variants,
+        "prompt_json": cache.file_sha256(prompt_json) if prompt_json.exists() else None,
+        "meta": base_meta,
+    }
+    assets.extend(cache.group("stellacorn-mission2-sprites", mission2_inputs, build_mission2))
 
     add_asset(
         id="stellacorn-mission1-minimap",
@@ -482,12 +676,17 @@ def build_manifest(library_root):
 
 def main():
     args = parse_args()
-    manifest = build_manifest(args.library_root)
-    args.output.parent.mkdir(parents=True, exist_ok=True)
-    with args.output.open("w", encoding="utf-8") as handle:
-        json.dump(manifest, handle, indent=2)
-        handle.write("\n")
-    print(f"Wrote {len(manifest['assets'])} assets to {args.output}")
+    cache = ManifestCache(None if args.no_cache else args.cache)
+    manifest = build_manifest(args.library_root, cache)
+    changed = _write_if_changed(args.output, json.dumps(manifest, indent=2) + "\n")
+    if not args.no_cache:
+        cache.save()
+    stats = cache.stats
+    print(
+        f"{'Wrote' if changed else 'Unchanged:'} {len(manifest['assets'])} assets to {args.output} "
+        f"(groups reused {stats['groups_reused']}, rebuilt {stats['groups_rebuilt']}; "
+        f"files hashed {stats['hashed']})"
+    )
     return 0
 
 
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+import argparse
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from scripts.pony_server.io import load_data, save_data  # noqa: E402
+from scripts.pony_server.mission_atlas import (  # noqa: E402
+    ATLAS_INDEX_NAME,
+    Image,
+    build_mission_atlas,
+)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Pack the tiles and object sprites a mission uses into atlas pages."
+    )
+    parser.add_argument(
+        "missions",
+        nargs="*",
+        help="mission.json paths (default: every mission.json under adventures/missions).",
+    )
+    return parser.parse_args()
+
+
+def _asset_root(mission_path, mission):
+    # Matches the runtime: assetRoot is resolved against the mission URL, and
+    # a site-absolute root maps onto the repo root.
+    asset_root = mission.get("assetRoot") or "./"
+    if asset_root.startswith("/"):
+        return ROOT / asset_root.lstrip("/")
+    return mission_path.parent / asset_root
+
+
+def _load_list(mission_path, name, key):
+    if not name:
+        return []
+    try:
+        data = load_data(mission_path.parent / name)
+    except (OSError, ValueError):
+        return []
+    return data.get(key) or [] if isinstance(data, dict) else []
+
+
+def build_for_mission(mission_path):
+    mission_path = Path(mission_path)
+    mission = load_data(mission_path)
+    index = build_mission_atlas(
+        _load_list(mission_path, mission.get("tiles"), "tiles"),
+        _load_list(mission_path, mission.get("objects"), "objects"),
+        mission_path.parent,
+        asset_root=_asset_root(mission_path, mission),
+        tile_size=mission.get("tileSize", 64),
+    )
+    if index and mission.get("atlas") != ATLAS_INDEX_NAME:
+        mission["atlas"] = ATLAS_INDEX_NAME
+        save_data(mission_path, mission)
+    return index
+
+
+def main():
+    if Image is None:
+        print("Pillow is required. Install it to run this script.")
+        return 1
+    args = parse_args()
+    missions = [Path(path) for path in args.missions] or sorted(
+        (ROOT / "adventures" / "missions").rglob("mission.json")
+    )
+    for mission_path in missions:
+        index = build_for_mission(mission_path)
+        if not index:
+            print(f"{mission_path}: no tile or object assets found; skipped")
+            continue
+        print(
+            f"{mission_path}: packed {len(index['frames'])} frames into "
+            f"{len(index['images'])} atlas page(s)"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,27 +1,44 @@
 #!/usr/bin/env python3
 import argparse
+import hashlib
+import json
+import os
+import posixpath
 import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 ROOT = Path(__file__).resolve().parents[1]
 DEFAULT_OUTPUT = ROOT / "public"
+DEFAULT_MANIFEST = ROOT / "data" / "_generated" / "public-build.json"
+DEFAULT_JOBS = min(32, (os.cpu_count() or 1) * 4)
+MANIFEST_VERSION = 1
+HASH_CHUNK = 1024 * 1024
+FINGERPRINT_DIR = "immutable"
+FINGERPRINT_LENGTH = 10
+ASSET_MANIFEST_NAME = "asset-manifest.json"
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+FINGERPRINT_SUFFIXES = {".png", ".webp", ".jpg", ".jpeg", ".json"}
 
 
-def copy_file(src: Path, dest: Path):
-    dest.parent.mkdir(parents=True, exist_ok=True)
-    shutil.copy2(src, dest)
+def add_file(plan: dict, src: Path, rel_out: str):
+    if src.is_file():
+        plan[rel_out] = src
 
 
-def copy_tree(src: Path, dest: Path):
+def add_tree(plan: dict, src: Path, rel_dest: str):
     if not src.exists():
         return
-    shutil.copytree(src, dest, dirs_exist_ok=True)
+    for path in sorted(src.rglob("*")):
+        if path.is_file():
+            plan[f"{rel_dest}/{path.relative_to(src).as_posix()}"] = path
 
 
-def copy_tree_assets(src: Path, dest: Path, prefer_webp: bool):
+def add_tree_assets(plan: dict, src: Path, rel_dest: str, prefer_webp: bool):
     if not src.exists():
         return
-    for path in src.rglob("*"):
+    for path in sorted(src.rglob("*")):
         if path.is_dir():
             continue
         suffix = path.suffix.lower()
@@ -31,17 +48,16 @@ def copy_tree_assets(src: Path, dest: Path, prefer_webp: bool):
             webp_path = path.with_suffix(".webp")
             if webp_path.exists():
                 continue
-        copy_file(path, dest / path.relative_to(src))
+        plan[f"{rel_dest}/{path.relative_to(src).as_posix()}"] = path
 
 
-def copy_pony_assets(src_root: Path, dest_root: Path):
+def add_pony_assets(plan: dict, src_root: Path, rel_dest: str):
     if not src_root.exists():
         return ["Missing assets/ponies directory."]
 
     warnings = []
-    dest_root.mkdir(parents=True, exist_ok=True)
 
-    for image in src_root.iterdir():
+    for image in sorted(src_root.iterdir()):
         if not image.is_file():
             continue
         suffix = image.suffix.lower()
@@ -51,7 +67,7 @@ def copy_pony_assets(src_root: Path, dest_root: Path):
             webp_path = image.with_suffix(".webp")
             if webp_path.exists():
                 continue
-        copy_file(image, dest_root / image.name)
+        plan[f"{rel_dest}/{image.name}"] = image
 
     for pony_dir in sorted(path for path in src_root.iterdir() if path.is_dir()):
         sheets_dir = pony_dir / "sheets"
@@ -59,34 +75,352 @@ def copy_pony_assets(src_root: Path, dest_root: Path):
             warnings.append(f"[{pony_dir.name}] Missing sheets directory.")
             continue
 
-        dest_sheets = dest_root / pony_dir.name / "sheets"
+        dest_sheets = f"{rel_dest}/{pony_dir.name}/sheets"
         sprite_png = sheets_dir / "spritesheet.png"
         sprite_webp = sheets_dir / "spritesheet.webp"
         sprite_json = sheets_dir / "spritesheet.json"
 
         if sprite_webp.exists():
-            copy_file(sprite_webp, dest_sheets / sprite_webp.name)
+            plan[f"{dest_sheets}/{sprite_webp.name}"] = sprite_webp
         elif sprite_png.exists():
-            copy_file(sprite_png, dest_sheets / sprite_png.name)
+            plan[f"{dest_sheets}/{sprite_png.name}"] = sprite_png
         else:
             warnings.append(f"[{pony_dir.name}] Missing spritesheet.png/.webp")
 
+        # Extra pages of a multi-page sheet (spritesheet-1.webp, ...).
+        for page in sorted(sheets_dir.glob("spritesheet-*.webp")):
+            plan[f"{dest_sheets}/{page.name}"] = page
+
         if sprite_json.exists():
-            copy_file(sprite_json, dest_sheets / sprite_json.name)
+            plan[f"{dest_sheets}/{sprite_json.name}"] = sprite_json
         else:
             warnings.append(f"[{pony_dir.name}] Missing spritesheet.json")
 
     return warnings
 
 
-def copy_data(src_root: Path, dest_root: Path):
+def add_data(plan: dict, src_root: Path, rel_dest: str):
     if not src_root.exists():
         return
-    dest_root.mkdir(parents=True, exist_ok=True)
-    for item in src_root.glob("*.json"):
+    for item in sorted(src_root.glob("*.json")):
         if item.name == "runtime_state.json":
             continue
-        copy_file(item, dest_root / item.name)
+        plan[f"{rel_dest}/{item.name}"] = item
+
+
+def build_plan():
+    # Maps each output path (relative to the output directory) to its source.
+    plan = {}
+    add_file(plan, ROOT / "index.html", "index.html")
+    add_file(plan, ROOT / "styles.css", "styles.css")
+    add_tree(plan, ROOT / "styles", "styles")
+    add_file(plan, ROOT / "_headers", "_headers")
+
+    add_tree(plan, ROOT / "adventures", "adventures")
+    add_tree(plan, ROOT / "assets" / "js", "assets/js")
+    add_tree_assets(plan, ROOT / "assets" / "author", "assets/author", prefer_webp=True)
+    add_tree_assets(plan, ROOT / "assets" / "ui", "assets/ui", prefer_webp=True)
+    add_tree_assets(plan, ROOT / "assets" / "world", "assets/world", prefer_webp=True)
+
+    add_data(plan, ROOT / "data", "data")
+    warnings = add_pony_assets(plan, ROOT / "assets" / "ponies", "assets/ponies")
+    return plan, warnings
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _stat_fields(path: Path):
+    stat = path.stat()
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def _display_path(path: Path) -> str:
+    try:
+        return path.resolve().relative_to(ROOT).as_posix()
+    except ValueError:
+        return path.as_posix()
+
+
+def _load_json(src):
+    if not isinstance(src, Path):
+        return None
+    try:
+        with open(src, "r", encoding="utf-8") as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return None
+
+
+def _json_bytes(data) -> bytes:
+    return (json.dumps(data, indent=2, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def _rewrite_strings(node, rewrite):
+    if isinstance(node, dict):
+        return {key: _rewrite_strings(value, rewrite) for key, value in node.items()}
+    if isinstance(node, list):
+        return [_rewrite_strings(value, rewrite) for value in node]
+    if isinstance(node, str):
+        return rewrite(node)
+    return node
+
+
+def resolve_reference(plan: dict, value: str, base: str = ""):
+    # Maps a path found in JSON to the planned output that serves it. Paths are
+    # root-relative unless a base directory is given (spritesheet meta images),
+    # and PNG/JPG references follow the WebP substitution the bundle makes.
+    if not value or "://" in value or value.startswith("data:") or "?" in value:
+        return None
+    if value.startswith("/"):
+        rel_path = value[1:]
+    elif base and not value.startswith("assets/"):
+        rel_path = posixpath.join(base, value)
+    else:
+        rel_path = value
+    rel_path = posixpath.normpath(rel_path)
+    if rel_path.startswith(".."):
+        return None
+    stem, suffix = posixpath.splitext(rel_path)
+    if suffix.lower() not in FINGERPRINT_SUFFIXES or not rel_path.startswith("assets/"):
+        return None
+    if rel_path in plan:
+        return rel_path
+    webp_path = f"{stem}.webp"
+    if suffix.lower() in {".png", ".jpg", ".jpeg"} and webp_path in plan:
+        return webp_path
+    return None
+
+
+def fingerprinted_path(rel_out: str, digest: str) -> str:
+    stem, suffix = posixpath.splitext(rel_out)
+    return f"{FINGERPRINT_DIR}/{stem}.{digest[:FINGERPRINT_LENGTH]}{suffix}"
+
+
+def _digest_lookup(previous: dict):
+    # Reuses hashes from the last build for sources whose stats did not move.
+    known = {entry.get("source"): entry for entry in previous.values() if entry.get("source")}
+
+    def digest(content):
+        if isinstance(content, bytes):
+            return hashlib.sha256(content).hexdigest()
+        entry = known.get(_display_path(content))
+        if entry and entry.get("source_stat") == _stat_fields(content):
+            return entry["sha256"]
+        return file_sha256(content)
+
+    return digest
+
+
+def fingerprint_plan(plan: dict, digest) -> dict:
+    # Adds a content-hashed copy under immutable/ for every asset referenced
+    # from data/*.json (and the images those spritesheet.json files point at),
+    # then rewrites the references. Original names stay in the bundle for the
+    # paths the JS builds at runtime. Returns the original -> hashed path map.
+    hashed = {}
+
+    def fingerprint(rel_out):
+        if rel_out in hashed:
+            return hashed[rel_out]
+        content = plan[rel_out]
+        data = _load_json(content) if rel_out.endswith(".json") else None
+        if data is not None:
+            base = posixpath.dirname(rel_out)
+            hashed_dir = f"{FINGERPRINT_DIR}/{base}"
+
+            def rewrite_image(value):
+                target = resolve_reference(plan, value, base)
+                if not target or target.endswith(".json"):
+                    return value
+                return posixpath.relpath(fingerprint(target), hashed_dir)
+
+            content = _json_bytes(_rewrite_strings(data, rewrite_image))
+        path = fingerprinted_path(rel_out, digest(content))
+        plan[path] = content
+        hashed[rel_out] = path
+        return path
+
+    def rewrite_reference(value):
+        target = resolve_reference(plan, value)
+        if not target:
+            return value
+        path = fingerprint(target)
+        return f"/{path}" if value.startswith("/") else path
+
+    for rel_out in sorted(plan):
+        if not (rel_out.startswith("data/") and rel_out.endswith(".json")):
+            continue
+        data = _load_json(plan[rel_out])
+        if data is None:
+            continue
+        rewritten = _rewrite_strings(data, rewrite_reference)
+        if rewritten != data:
+            plan[rel_out] = _json_bytes(rewritten)
+    return hashed
+
+
+def add_cache_headers(plan: dict, hashed: dict):
+    # Appends an immutable rule for the fingerprinted tree to the repo's _headers.
+    source = plan.get("_headers")
+    text = source.read_text(encoding="utf-8") if isinstance(source, Path) else ""
+    if not hashed:
+        return
+    if text and not text.endswith("\n"):
+        text += "\n"
+    if text:
+        text += "\n"
+    text += (
+        "# Generated by scripts/build_public.py: fingerprinted paths never change.\n"
+        f"/{FINGERPRINT_DIR}/*\n"
+        f"  Cache-Control: {IMMUTABLE_CACHE_CONTROL}\n"
+    )
+    plan["_headers"] = text.encode("utf-8")
+
+
+def apply_fingerprints(plan: dict, previous: dict) -> dict:
+    hashed = fingerprint_plan(plan, _digest_lookup(previous))
+    add_cache_headers(plan, hashed)
+    plan[ASSET_MANIFEST_NAME] = _json_bytes({"version": 1, "files": dict(sorted(hashed.items()))})
+    return hashed
+
+
+def load_manifest(path: Path, output_dir: Path) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as handle:
+            data = json.load(handle)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != MANIFEST_VERSION:
+        return {}
+    if data.get("output") != str(output_dir.resolve()):
+        return {}
+    files = data.get("files")
+    return files if isinstance(files, dict) else {}
+
+
+def save_manifest(path: Path, output_dir: Path, files: dict):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    payload = {"version": MANIFEST_VERSION, "output": str(output_dir.resolve()), "files": files}
+    with open(tmp_path, "w", encoding="utf-8") as handle:
+        json.dump(payload, handle, indent=2, sort_keys=True)
+        handle.write("\n")
+    os.replace(tmp_path, path)
+
+
+def _place(src: Path, dest: Path, link: bool) -> str:
+    # Writes through a temp name so a half-copied file is never served.
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = dest.with_name(f".{dest.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    if link:
+        try:
+            os.link(src, tmp_path)
+            os.replace(tmp_path, dest)
+            return "linked"
+        except OSError:
+            tmp_path.unlink(missing_ok=True)
+    shutil.copy2(src, tmp_path)
+    os.replace(tmp_path, dest)
+    return "copied"
+
+
+def _write_bytes(dest: Path, content: bytes):
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = dest.with_name(f".{dest.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp_path.write_bytes(content)
+    os.replace(tmp_path, dest)
+
+
+def sync_generated(rel_out: str, content: bytes, output_dir: Path, entry):
+    # Outputs produced by the build itself (rewritten JSON, _headers).
+    dest = output_dir / rel_out
+    digest = hashlib.sha256(content).hexdigest()
+    dest_stat = _stat_fields(dest) if dest.exists() else None
+    if entry and entry.get("source") is None and entry.get("sha256") == digest and dest_stat == entry.get("output_stat"):
+        return "unchanged", entry
+    if dest_stat and dest_stat["size"] == len(content) and dest.read_bytes() == content:
+        status = "unchanged"
+    else:
+        _write_bytes(dest, content)
+        status = "written"
+    return status, {"source": None, "sha256": digest, "output_stat": _stat_fields(dest)}
+
+
+def sync_file(rel_out: str, src: Path, output_dir: Path, entry, link: bool):
+    # Returns (status, manifest_entry). Hashing only happens when the source
+    # stats moved since the last build or the output was never recorded.
+    if isinstance(src, bytes):
+        return sync_generated(rel_out, src, output_dir, entry)
+    dest = output_dir / rel_out
+    source_stat = _stat_fields(src)
+    source = _display_path(src)
+    dest_stat = _stat_fields(dest) if dest.exists() else None
+    if entry and entry.get("source") == source and dest_stat == entry.get("output_stat"):
+        if entry.get("source_stat") == source_stat:
+            return "unchanged", entry
+        digest = file_sha256(src)
+        if digest == entry.get("sha256"):
+            return "unchanged", dict(entry, source_stat=source_stat)
+        status = _place(src, dest, link)
+    else:
+        digest = file_sha256(src)
+        # An output from before the manifest (or an untracked edit): keep it
+        # when its bytes already match so its mtime and CDN copy stay valid.
+        if dest_stat and dest_stat["size"] == source_stat["size"] and file_sha256(dest) == digest:
+            status = "unchanged"
+        else:
+            status = _place(src, dest, link)
+    return status, {
+        "source": source,
+        "sha256": digest,
+        "source_stat": source_stat,
+        "output_stat": _stat_fields(dest),
+    }
+
+
+def remove_orphans(output_dir: Path, previous: dict, plan: dict):
+    removed = 0
+    parents = set()
+    for rel_out in previous:
+        if rel_out in plan:
+            continue
+        path = output_dir / rel_out
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            continue
+        removed += 1
+        parents.update(path.parents)
+    # Drop directories the removals left empty, deepest first.
+    for directory in sorted(parents, key=lambda item: len(item.parts), reverse=True):
+        if directory == output_dir or output_dir not in directory.parents:
+            continue
+        try:
+            directory.rmdir()
+        except OSError:
+            pass
+    return removed
+
+
+def sync_outputs(plan: dict, output_dir: Path, previous: dict, jobs: int, link: bool):
+    counts = {"copied": 0, "linked": 0, "written": 0, "unchanged": 0, "removed": 0}
+    files = {}
+
+    def run(item):
+        rel_out, src = item
+        return rel_out, sync_file(rel_out, src, output_dir, previous.get(rel_out), link)
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+        for rel_out, (status, entry) in executor.map(run, sorted(plan.items())):
+            counts[status] += 1
+            files[rel_out] = entry
+    counts["removed"] = remove_orphans(output_dir, previous, plan)
+    return files, counts
 
 
 def parse_args():
@@ -103,36 +437,54 @@ def parse_args():
         action="store_true",
         help="Delete the output directory before copying.",
     )
+    parser.add_argument(
+        "--manifest",
+        default=str(DEFAULT_MANIFEST),
+        help=f"Build manifest path (default: {DEFAULT_MANIFEST}).",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=DEFAULT_JOBS,
+        help=f"Copy threads (default: {DEFAULT_JOBS}).",
+    )
+    parser.add_argument(
+        "--link",
+        action="store_true",
+        help="Hardlink outputs to their sources when on the same filesystem (falls back to copying).",
+    )
+    parser.add_argument(
+        "--no-fingerprint",
+        action="store_true",
+        help="Skip content-hashed copies, reference rewriting, and immutable cache rules.",
+    )
     return parser.parse_args()
 
 
 def main():
     args = parse_args()
     output_dir = Path(args.output)
+    manifest_path = Path(args.manifest)
     if args.clean and output_dir.exists():
         shutil.rmtree(output_dir)
 
-    copy_file(ROOT / "index.html", output_dir / "index.html")
-    copy_file(ROOT / "styles.css", output_dir / "styles.css")
-    copy_tree(ROOT / "styles", output_dir / "styles")
-    if (ROOT / "_headers").exists():
-        copy_file(ROOT / "_headers", output_dir / "_headers")
-
-    copy_tree(ROOT / "adventures", output_dir / "adventures")
-    copy_tree(ROOT / "assets" / "js", output_dir / "assets" / "js")
-    copy_tree_assets(ROOT / "assets" / "author", output_dir / "assets" / "author", prefer_webp=True)
-    copy_tree_assets(ROOT / "assets" / "ui", output_dir / "assets" / "ui", prefer_webp=True)
-    copy_tree_assets(ROOT / "assets" / "world", output_dir / "assets" / "world", prefer_webp=True)
-
-    copy_data(ROOT / "data", output_dir / "data")
-    warnings = copy_pony_assets(ROOT / "assets" / "ponies", output_dir / "assets" / "ponies")
+    previous = {} if args.clean else load_manifest(manifest_path, output_dir)
+    plan, warnings = build_plan()
+    hashed = {} if args.no_fingerprint else apply_fingerprints(plan, previous)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    files, counts = sync_outputs(plan, output_dir, previous, args.jobs, args.link)
+    save_manifest(manifest_path, output_dir, files)
 
     if warnings:
         print("Warnings:")
         for warning in warnings:
             print(f"  - {warning}")
 
-    print(f"Wrote public bundle to {output_dir}")
+    print(
+        f"Wrote public bundle to {output_dir} "
+        f"(copied {counts['copied']}, linked {counts['linked']}, written {counts['written']}, "
+        f"unchanged {counts['unchanged']}, removed {counts['removed']}; fingerprinted {len(hashed)})"
+    )
     return 0
 
 
@@ -1,5 +1,12 @@
 #!/usr/bin/env python3
 import argparse
+import hashlib
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 try:
@@ -9,8 +16,10 @@ except ImportError:  # pragma: no cover - runtime dependency check
 
 ROOT = Path(__file__).resolve().parents[1]
 DEFAULT_ROOT = ROOT / "assets"
+DEFAULT_MANIFEST = ROOT / "data" / "_generated" / "webp-manifest.json"
 DEFAULT_EXTS = {".png", ".jpg", ".jpeg"}
 DEFAULT_EXCLUDES = {"frames", "frames_dense", "sheets.bak"}
+MANIFEST_VERSION = 1
 
 
 def parse_args():
@@ -42,7 +51,7 @@ def parse_args():
     parser.add_argument(
         "--force",
         action="store_true",
-        help="Overwrite existing .webp files.",
+        help="Reconvert every source, even when the manifest says it is current.",
     )
     parser.add_argument(
         "--include-frames",
@@ -59,6 +68,22 @@ def parse_args():
         action="store_true",
         help="List conversions without writing files.",
     )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Worker processes (default: CPU count; 1 converts in-process).",
+    )
+    parser.add_argument(
+        "--manifest",
+        default=str(DEFAULT_MANIFEST),
+        help=f"Conversion manifest path (default: {DEFAULT_MANIFEST}).",
+    )
+    parser.add_argument(
+        "--summary",
+        default="",
+        help="Write a JSON summary to this path ('-' for stdout).",
+    )
     return parser.parse_args()
 
 
@@ -71,15 +96,137 @@ def should_skip(path: Path, include_frames: bool) -> bool:
     return False
 
 
-def convert_image(src: Path, dest: Path, quality: int, lossless: bool, method: int) -> None:
-    with Image.open(src) as image:
-        if image.mode not in ("RGB", "RGBA"):
-            has_alpha = "A" in image.getbands()
-            image = image.convert("RGBA" if has_alpha else "RGB")
-        save_kwargs = {"format": "WEBP", "quality": quality, "method": method}
-        if lossless:
-            save_kwargs["lossless"] = True
-        image.save(dest, **save_kwargs)
+def _encode_webp(image, quality, lossless, method):
+    if image.mode not in ("RGB", "RGBA"):
+        has_alpha = "A" in image.getbands()
+        image = image.convert("RGBA" if has_alpha else "RGB")
+    save_kwargs = {"format": "WEBP", "quality": quality, "method": method}
+    if lossless:
+        save_kwargs["lossless"] = True
+    output = io.BytesIO()
+    image.save(output, **save_kwargs)
+    return output.getvalue()
+
+
+def manifest_key(path: Path) -> str:
+    path = path.resolve()
+    try:
+        return path.relative_to(ROOT).as_posix()
+    except ValueError:
+        return path.as_posix()
+
+
+def load_manifest(path: Path) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as handle:
+            data = json.load(handle)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != MANIFEST_VERSION:
+        return {}
+    files = data.get("files")
+    return files if isinstance(files, dict) else {}
+
+
+def save_manifest(path: Path, files: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as handle:
+        json.dump({"version": MANIFEST_VERSION, "files": files}, handle, indent=2, sort_keys=True)
+        handle.write("\n")
+    os.replace(tmp_path, path)
+
+
+def _stat_fields(path: Path):
+    stat = path.stat()
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def is_current(entry, src: Path, dest: Path, settings: dict) -> bool:
+    # Fast path: nothing to hash when the source and output stats still match
+    # what the last conversion recorded under the same encoder settings.
+    if not entry or entry.get("settings") != settings:
+        return False
+    try:
+        return (
+            _stat_fields(src) == entry.get("source_stat")
+            and _stat_fields(dest) == entry.get("output_stat")
+        )
+    except OSError:
+        return False
+
+
+def convert_one(task: dict) -> dict:
+    # Runs in a worker process. Returns a result record with the new manifest
+    # entry; the parent process owns the manifest file.
+    src = Path(task["src"])
+    dest = Path(task["dest"])
+    settings = task["settings"]
+    entry = task.get("entry") or {}
+    result = {"key": task["key"], "path": str(src), "status": "error", "entry": None}
+    try:
+        source_stat = _stat_fields(src)
+        data = src.read_bytes()
+        source_hash = _sha256(data)
+        output = None
+        if not task["force"] and dest.exists():
+            output = dest.read_bytes()
+            unchanged = (
+                entry.get("settings") == settings
+                and entry.get("source_sha256") == source_hash
+                and entry.get("output_sha256") == _sha256(output)
+            )
+            if unchanged:
+                result["status"] = "unchanged"
+            elif not entry:
+                # A .webp made before the manifest existed: adopt it as-is.
+                result["status"] = "adopted"
+            else:
+                output = None
+        if output is None:
+            with Image.open(io.BytesIO(data)) as image:
+                output = _encode_webp(image, settings["quality"], settings["lossless"], settings["method"])
+            tmp_path = dest.with_name(f"{dest.name}.{os.getpid()}.tmp")
+            tmp_path.write_bytes(output)
+            os.replace(tmp_path, dest)
+            result["status"] = "converted"
+        result["entry"] = {
+            "output": manifest_key(dest),
+            "settings": settings,
+            "source_sha256": source_hash,
+            "source_stat": source_stat,
+            "output_sha256": _sha256(output),
+            "output_stat": _stat_fields(dest),
+        }
+        result["bytes_in"] = len(data)
+        result["bytes_out"] = len(output)
+        if task["prune"]:
+            src.unlink(missing_ok=True)
+    except Exception as error:
+        result["error"] = str(error)
+    return result
+
+
+def collect_sources(root: Path, include_frames: bool):
+    for path in sorted(root.rglob("*")):
+        if not path.is_file():
+            continue
+        if path.suffix.lower() not in DEFAULT_EXTS:
+            continue
+        if should_skip(path, include_frames):
+            continue
+        yield path
+
+
+def run_tasks(tasks, jobs):
+    if jobs <= 1 or len(tasks) <= 1:
+        return [convert_one(task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        return list(executor.map(convert_one, tasks, chunksize=max(1, len(tasks) // (jobs * 4))))
 
 
 def main() -> int:
@@ -89,45 +236,87 @@ def main() -> int:
         print(f"Root path not found: {root}")
         return 1
 
-    total = 0
-    converted = 0
-    skipped = 0
-    errors = 0
+    started = time.time()
+    settings = {"quality": args.quality, "lossless": bool(args.lossless), "method": args.method}
+    manifest_path = Path(args.manifest)
+    files = load_manifest(manifest_path)
 
-    for path in root.rglob("*"):
-        if not path.is_file():
-            continue
-        if path.suffix.lower() not in DEFAULT_EXTS:
-            continue
-        if should_skip(path, args.include_frames):
-            continue
+    total = 0
+    current = 0
+    planned = 0
+    tasks = []
+    for path in collect_sources(root, args.include_frames):
         total += 1
+        key = manifest_key(path)
         dest = path.with_suffix(".webp")
-        if dest.exists() and not args.force:
-            if args.prune_source:
+        entry = files.get(key)
+        if not args.force and is_current(entry, path, dest, settings):
+            current += 1
+            if args.prune_source and not args.dry_run:
                 path.unlink(missing_ok=True)
-                converted += 1
-            else:
-                skipped += 1
             continue
+        planned += 1
         if args.dry_run:
             print(f"[dry-run] {path} -> {dest}")
-            converted += 1
             continue
-        try:
-            convert_image(path, dest, args.quality, args.lossless, args.method)
-            if args.prune_source:
-                path.unlink(missing_ok=True)
-            converted += 1
-        except Exception as error:
-            errors += 1
-            print(f"Failed: {path} ({error})")
-
-    print(
-        f"WebP conversion complete. Sources: {total}, converted: {converted}, "
-        f"skipped: {skipped}, errors: {errors}."
-    )
-    return 1 if errors else 0
+        tasks.append(
+            {
+                "key": key,
+                "src": str(path),
+                "dest": str(dest),
+                "settings": settings,
+                "entry": entry,
+                "force": args.force,
+                "prune": args.prune_source,
+            }
+        )
+
+    results = run_tasks(tasks, max(1, args.jobs))
+    counts = {"converted": 0, "unchanged": 0, "adopted": 0, "error": 0}
+    failures = []
+    bytes_in = 0
+    bytes_out = 0
+    for result in results:
+        counts[result["status"]] += 1
+        if result["status"] == "error":
+            failures.append({"path": result["path"], "error": result.get("error")})
+            print(f"Failed: {result['path']} ({result.get('error')})")
+            continue
+        files[result["key"]] = result["entry"]
+        if result["status"] == "converted":
+            bytes_in += result["bytes_in"]
+            bytes_out += result["bytes_out"]
+    if results:
+        save_manifest(manifest_path, files)
+
+    summary = {
+        "root": str(root),
+        "manifest": str(manifest_path),
+        "jobs": max(1, args.jobs),
+        "settings": settings,
+        "dry_run": bool(args.dry_run),
+        "sources": total,
+        "planned": planned,
+        "converted": counts["converted"],
+        "skipped": current + counts["unchanged"],
+        "adopted": counts["adopted"],
+        "errors": counts["error"],
+        "failures": failures,
+        "bytes_in": bytes_in,
+        "bytes_out": bytes_out,
+        "seconds": round(time.time() - started, 3),
+    }
+    if args.summary == "-":
+        json.dump(summary, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    else:
+        if args.summary:
+            Path(args.summary).write_text(json.dumps(summary, indent=2) + "\n", encoding="utf-8")
+        print(
+            f"WebP conversion complete. Sources: {total}, converted: {summary['converted']}, "
+            f"skipped: {summary['skipped']}, adopted: {summary['adopted']}, errors: {summary['errors']}."
+        )
+    return 1 if counts["error"] else 0
 
 
 if __name__ == "__main__":
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+try:
+    from PIL import Image
+except ImportError:  # pragma: no cover - runtime dependency check
+    raise SystemExit("Pillow is required. Install it to run this script.")
+
+from scripts.sprites import images_api  # noqa: E402
+
+DEFAULT_PORTRAITS = ROOT / "assets" / "ponies"
+DEFAULT_LIBRARY = ROOT / "assets" / "library" / "maps"
+DEFAULT_PONIES = ROOT / "data" / "ponies.json"
+
+
+def parse_sizes(value):
+    sizes = sorted({int(part) for part in str(value).split(",") if part.strip()})
+    if not sizes or sizes[0] <= 0:
+        raise argparse.ArgumentTypeError("sizes must be positive integers, e.g. 64,128,256,512")
+    return sizes
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Write downscaled WebP variants (<name>@<size>.webp) for portraits, tiles and sprites."
+    )
+    parser.add_argument(
+        "--sizes",
+        type=parse_sizes,
+        default=list(images_api.DEFAULT_VARIANT_SIZES),
+        help="Comma-separated longest-side sizes (default: 64,128,256,512).",
+    )
+    parser.add_argument(
+        "--root",
+        action="append",
+        default=[],
+        help="Extra directory to scan recursively for .webp assets (repeatable).",
+    )
+    parser.add_argument(
+        "--ponies",
+        default=str(DEFAULT_PONIES),
+        help=f"Pony data file to record portrait variants in (default: {DEFAULT_PONIES}).",
+    )
+    parser.add_argument("--quality", type=int, default=images_api.DEFAULT_WEBP_QUALITY)
+    parser.add_argument("--method", type=int, default=images_api.DEFAULT_WEBP_METHOD)
+    parser.add_argument("--lossless", action="store_true", help="Use lossless WebP encoding.")
+    parser.add_argument("--force", action="store_true", help="Rewrite variants even when current.")
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Worker processes (default: CPU count; 1 runs in-process).",
+    )
+    parser.add_argument("--dry-run", action="store_true", help="List work without writing files.")
+    return parser.parse_args()
+
+
+def collect_assets(portraits_dir, library_root, extra_roots):
+    # Portraits are the top-level <slug>.webp files; the library and any extra
+    # roots are scanned recursively. Existing variants are never sources.
+    paths = []
+    if portraits_dir.exists():
+        paths.extend(sorted(portraits_dir.glob("*.webp")))
+    for root in [library_root, *extra_roots]:
+        if root.exists():
+            paths.extend(sorted(root.rglob("*.webp")))
+    seen = set()
+    assets = []
+    for path in paths:
+        if images_api.is_variant_path(path) or path in seen:
+            continue
+        seen.add(path)
+        assets.append(path)
+    return assets
+
+
+def expected_sizes(path, sizes):
+    with Image.open(path) as image:
+        longest = max(image.size)
+    return [size for size in sizes if size < longest]
+
+
+def is_current(path, sizes):
+    # Current when exactly the expected ladder exists and is newer than the source.
+    source_mtime = path.stat().st_mtime_ns
+    existing = images_api.existing_variants(path)
+    if [variant["size"] for variant in existing] != expected_sizes(path, sizes):
+        return False
+    return all(variant["path"].stat().st_mtime_ns >= source_mtime for variant in existing)
+
+
+def build_variants(task):
+    path = Path(task["path"])
+    result = {"path": str(path), "status": "error", "sizes": []}
+    try:
+        variants = images_api.generate_variants(
+            path,
+            task["sizes"],
+            quality=task["quality"],
+            method=task["method"],
+            lossless=task["lossless"],
+        )
+        written = {variant["path"] for variant in variants}
+        # Drop variants left over from a different ladder.
+        for variant in images_api.existing_variants(path):
+            if variant["path"] not in written:
+                variant["path"].unlink(missing_ok=True)
+        result["status"] = "written"
+        result["sizes"] = [variant["size"] for variant in variants]
+    except Exception as error:
+        result["error"] = str(error)
+    return result
+
+
+def run_tasks(tasks, jobs):
+    if jobs <= 1 or len(tasks) <= 1:
+        return [build_variants(task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        return list(executor.map(build_variants, tasks))
+
+
+def _web_path(path):
+    try:
+        return Path(path).resolve().relative_to(ROOT).as_posix()
+    except ValueError:
+        return Path(path).as_posix()
+
+
+def record_portraits(ponies_path, portraits_dir):
+    # Adds {"portrait": {"path", "variants": [{"size", "path"}]}} to each pony
+    # whose portrait exists. Rewrites the file only when something changed.
+    try:
+        with open(ponies_path, "r", encoding="utf-8") as handle:
+            data = json.load(handle)
+    except (OSError, ValueError):
+        return False
+    changed = False
+    for pony in data.get("ponies", []):
+        slug = pony.get("slug")
+        portrait = portraits_dir / f"{slug}.webp" if slug else None
+        if not portrait or not portrait.exists():
+            continue
+        record = {
+            "path": _web_path(portrait),
+            "variants": [
+                {"size": variant["size"], "path": _web_path(variant["path"])}
+                for variant in images_api.existing_variants(portrait)
+            ],
+        }
+        if pony.get("portrait") != record:
+            pony["portrait"] = record
+            changed = True
+    if changed:
+        tmp_path = Path(ponies_path).with_name(f"{Path(ponies_path).name}.{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            json.dump(data, handle, indent=2)
+            handle.write("\n")
+        os.replace(tmp_path, ponies_path)
+    return changed
+
+
+def main():
+    args = parse_args()
+    extra_roots = [Path(root) for root in args.root]
+    assets = collect_assets(DEFAULT_PORTRAITS, DEFAULT_LIBRARY, extra_roots)
+
+    tasks = []
+    current = 0
+    for path in assets:
+        if not args.force and is_current(path, args.sizes):
+            current += 1
+            continue
+        if args.dry_run:
+            print(f"[dry-run] {path} -> {expected_sizes(path, args.sizes)}")
+            continue
+        tasks.append(
+            {
+                "path": str(path),
+                "sizes": args.sizes,
+                "quality": args.quality,
+                "method": args.method,
+                "lossless": bool(args.lossless),
+            }
+        )
+
+    results = run_tasks(tasks, max(1, args.jobs))
+    errors = 0
+    for result in results:
+        if result["status"] == "error":
+            errors += 1
+            print(f"Failed: {result['path']} ({result.get('error')})")
+
+    recorded = False if args.dry_run else record_portraits(Path(args.ponies), DEFAULT_PORTRAITS)
+    print(
+        f"Variants complete. Assets: {len(assets)}, written: {len(results) - errors}, "
+        f"current: {current}, errors: {errors}."
+        + (f" Updated {args.ponies}." if recorded else "")
+    )
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -193,16 +193,7 @@ def main():
         if args.dry_run:
             print(f"[{house['id']}] {prompt}")
             continue
-        temp_path = output_path.with_suffix(".png")
-        if temp_path.exists():
-            temp_path.unlink()
-        images_api.generate_png(prompt, args.size, temp_path)
-        images_api.convert_to_webp(
-            temp_path,
-            output_path=output_path,
-            target_size=args.size,
-            remove_source=True,
-        )
+        images_api.generate_webp(prompt, args.size, output_path, target_size=args.size)
         print(f"Wrote {output_path}")
 
     return 0
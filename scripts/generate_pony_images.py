@@ -187,6 +187,7 @@ def save_images(image_data, output_dir, slug, overwrite, target_size):
             output_path=path,
             target_size=target_size,
             remove_source=True,
+            variants=images_api.DEFAULT_VARIANT_SIZES,
         )
         paths.append(path)
     return paths
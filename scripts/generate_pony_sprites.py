@@ -13,6 +13,7 @@ from scripts.sprites.prompting import (  # noqa: E402
     get_action_frame_name,
 )
 from scripts.sprites import images_api, qc  # noqa: E402
+from scripts.rate_limits import RATE_LIMITER  # noqa: E402
 
 DEFAULT_DATA = "data/ponies.json"
 DEFAULT_ACTIONS = "data/pony_actions.json"
@@ -85,9 +86,36 @@ def parse_args():
         action="store_true",
         help="Auto-flip frames to face right (disabled by default).",
     )
+    parser.add_argument(
+        "--no-image-cache",
+        action="store_true",
+        help="Always call the Images API instead of reusing cached results.",
+    )
+    parser.add_argument(
+        "--images-per-minute",
+        type=int,
+        default=0,
+        help="Cap Images API requests per minute (default: OPENAI_IMAGES_RPM or server headers).",
+    )
     return parser.parse_args()
 
 
+def print_cache_stats():
+    stats = images_api.cache_stats()
+    print(
+        f"image cache: {stats['hits']} hits, {stats['misses']} misses, "
+        f"{stats['bypassed']} bypassed, {stats['evictions']} evicted"
+    )
+
+
+def print_rate_limit_stats():
+    stats = RATE_LIMITER.stats()
+    print(
+        f"rate limiter: {stats['requests']} requests, {stats['throttled']} throttled, "
+        f"{stats['waited_seconds']}s waiting, images concurrency {stats['concurrency'].get('images', '-')}"
+    )
+
+
 def log(prefix, message):
     print(f"[{prefix}] {message}", flush=True)
 
@@ -153,15 +181,18 @@ def generate_frame(task):
         for attempt in range(1, max_retries + 1):
             if temp_path.exists():
                 temp_path.unlink()
+            # A retry repeats the same request, so only the first attempt may
+            # be served from the image cache.
+            use_cache = attempt == 1
             try:
                 if source_image and source_image.exists():
                     images_api.generate_png_from_image(
-                        prompt + suffix, size, temp_path, source_image
+                        prompt + suffix, size, temp_path, source_image, use_cache=use_cache
                     )
                 else:
                     if source_image:
                         log(prefix, f"Source image missing: {source_image}. Falling back.")
-                    images_api.generate_png(prompt + suffix, size, temp_path)
+                    images_api.generate_png(prompt + suffix, size, temp_path, use_cache=use_cache)
             except Exception as exc:
                 log(prefix, f"API error ({attempt_label} {attempt}/{max_retries}): {exc}")
                 continue
@@ -231,6 +262,11 @@ def main():
 
     frame_size = args.size or action_data.get("sprite", {}).get("frame_size", 512)
 
+    if args.no_image_cache:
+        images_api.IMAGE_CACHE.enabled = False
+    # Worker threads only queue frames; the shared limiter decides how many
+    # requests are in flight and backs off when the API returns 429s.
+    RATE_LIMITER.configure("images", rpm=args.images_per_minute or None, max_concurrency=args.jobs)
     if not args.dry_run:
         images_api.ensure_api_key()
         qc.ensure_pillow()
@@ -340,6 +376,8 @@ def main():
     print("Sprite generation complete.")
     for key, value in results.items():
         print(f"{key}: {value}")
+    print_cache_stats()
+    print_rate_limit_stats()
 
     if results.get("failed"):
         return 1
@@ -15,7 +15,7 @@ except ImportError as exc:
 ROOT = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(ROOT))
 
-from scripts.sprites import qc  # noqa: E402
+from scripts.sprites import frame_qc, qc  # noqa: E402
 from scripts.sprites.interpolation import (  # noqa: E402
     alpha_y_max,
     apply_affine,
@@ -212,38 +212,7 @@ def write_image(path, image):
 
 
 def qc_dense_frame(path):
-    Image = qc.ensure_pillow()
-    with Image.open(path) as image:
-        if image.mode != "RGBA":
-            return False, f"Expected RGBA, got {image.mode}."
-        width, height = image.size
-        alpha = image.getchannel("A")
-        alpha_min, alpha_max = alpha.getextrema()
-        if alpha_max == 0:
-            return False, "Empty frame (all transparent)."
-        if alpha_min == 255:
-            return False, "No transparent pixels detected."
-        bbox = alpha.getbbox()
-        if bbox is None:
-            return False, "Empty frame (no alpha)."
-
-        left, upper, right, lower = bbox
-        area = (right - left) * (lower - upper)
-        total_area = width * height
-        min_area = 0.12 * total_area
-        max_area = 0.85 * total_area
-        if area < min_area:
-            return False, "Subject area too small."
-        if area > max_area:
-            return False, "Subject area too large."
-
-        padding = 8
-        if left < padding or upper < padding:
-            return False, "Subject too close to top/left edge."
-        if (width - right) < padding or (height - lower) < padding:
-            return False, "Subject too close to bottom/right edge."
-
-    return True, "ok"
+    return frame_qc.qc_frame(path, "frames_dense")
 
 
 def load_keyframes(frames_dir, action_id):
@@ -0,0 +1,309 @@
+import http.client
+import json
+import os
+import random
+import ssl
+import threading
+import time
+import urllib.parse
+import urllib.request
+
+from scripts.rate_limits import RATE_LIMITER, estimate_tokens, limit_key, retry_after
+
+DEFAULT_BASE_URL = "https://api.openai.com/v1"
+DEFAULT_TIMEOUT = 60
+DEFAULT_ATTEMPTS = 2
+MAX_IDLE_PER_HOST = 8
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_MAX_SECONDS = 30.0
+RETRY_STATUSES = frozenset({408, 409, 429, 500, 502, 503, 504})
+
+_NETWORK_ERRORS = (OSError, http.client.HTTPException)
+# A pooled socket the server already closed fails like this on the next send.
+_STALE_ERRORS = (http.client.RemoteDisconnected, ConnectionResetError, ConnectionAbortedError, BrokenPipeError)
+
+
+def api_url(path):
+    # Read per call so OPENAI_BASE_URL can point at a local stand-in server.
+    base = (os.getenv("OPENAI_BASE_URL") or DEFAULT_BASE_URL).rstrip("/")
+    return f"{base}/{path.lstrip('/')}"
+
+
+class RequestError(RuntimeError):
+    def __init__(self, message, status=None, reason=None, detail="", headers=None):
+        super().__init__(message)
+        self.status = status
+        self.reason = reason
+        self.detail = detail
+        self.headers = headers or {}
+
+
+class Response:
+    def __init__(self, status, reason, headers, body):
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self.body = body
+
+    def json(self):
+        return json.loads(self.body.decode("utf-8"))
+
+
+class HTTPTransport:
+    # Keep-alive connections pooled per (scheme, host, port). A connection is
+    # owned by one request at a time and goes back to the idle list once its
+    # response has been read to the end.
+    def __init__(self, max_idle_per_host=MAX_IDLE_PER_HOST, sleep=time.sleep, limiter=None):
+        self.max_idle_per_host = max_idle_per_host
+        self.limiter = limiter
+        self._sleep = sleep
+        self._idle = {}
+        self._lock = threading.Lock()
+        self._ssl_context = ssl.create_default_context()
+        self._stats = {"connections": 0, "reused": 0, "retries": 0}
+
+    def request(
+        self,
+        method,
+        url,
+        body=None,
+        headers=None,
+        *,
+        timeout=DEFAULT_TIMEOUT,
+        attempts=DEFAULT_ATTEMPTS,
+        label="OpenAI request",
+        tokens=0,
+    ):
+        key = limit_key(url)
+        for attempt in range(1, attempts + 1):
+            self._limit_acquire(key, tokens)
+            status = response_headers = None
+            try:
+                origin, conn, response = self._open(method, url, body, headers, timeout)
+                status, response_headers = response.status, response.headers
+                try:
+                    data = response.read()
+                except BaseException:
+                    conn.close()
+                    raise
+            except _NETWORK_ERRORS as exc:
+                if attempt == attempts:
+                    raise RequestError(f"{label} failed: {exc}") from exc
+                self._backoff(attempt)
+                continue
+            finally:
+                self._limit_release(key, status, response_headers)
+            self._release(origin, conn, response)
+            if response.status < 400:
+                return Response(response.status, response.reason, response.headers, data)
+            error = _status_error(label, response, data)
+            if response.status not in RETRY_STATUSES or attempt == attempts:
+                raise error
+            self._backoff(attempt, response.headers)
+        raise RequestError(f"{label} failed after retries.")
+
+    def stream(
+        self,
+        method,
+        url,
+        body=None,
+        headers=None,
+        *,
+        timeout=DEFAULT_TIMEOUT,
+        attempts=DEFAULT_ATTEMPTS,
+        label="OpenAI request",
+        chunk_size=None,
+        tokens=0,
+    ):
+        # Yields the body as it arrives: lines when chunk_size is None, else
+        # chunks of up to chunk_size bytes. Retries stop once data is handed out.
+        # The rate-limit slot is held until the stream ends.
+        key = limit_key(url)
+        for attempt in range(1, attempts + 1):
+            self._limit_acquire(key, tokens)
+            try:
+                origin, conn, response = self._open(method, url, body, headers, timeout)
+            except _NETWORK_ERRORS as exc:
+                self._limit_release(key)
+                if attempt == attempts:
+                    raise RequestError(f"{label} failed: {exc}") from exc
+                self._backoff(attempt)
+                continue
+            if response.status < 400:
+                break
+            try:
+                data = response.read()
+            except _NETWORK_ERRORS:
+                conn.close()
+                data = b""
+            else:
+                self._release(origin, conn, response)
+            self._limit_release(key, response.status, response.headers)
+            error = _status_error(label, response, data)
+            if response.status not in RETRY_STATUSES or attempt == attempts:
+                raise error
+            self._backoff(attempt, response.headers)
+        else:
+            raise RequestError(f"{label} failed after retries.")
+
+        completed = False
+        try:
+            while True:
+                piece = response.readline() if chunk_size is None else response.read(chunk_size)
+                if not piece:
+                    break
+                yield piece
+            # readline() stops at Content-Length without marking the response
+            # done; read() does, which frees the connection for the next call.
+            response.read()
+            completed = True
+        except _NETWORK_ERRORS as exc:
+            raise RequestError(f"{label} failed: {exc}") from exc
+        finally:
+            # A consumer that stops early leaves unread bytes on the socket.
+            if completed:
+                self._release(origin, conn, response)
+            else:
+                conn.close()
+            self._limit_release(key, response.status, response.headers)
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats)
+
+    def close(self):
+        with self._lock:
+            pools = list(self._idle.values())
+            self._idle.clear()
+        for idle in pools:
+            for conn in idle:
+                conn.close()
+
+    def _open(self, method, url, body, headers, timeout):
+        parts = urllib.parse.urlsplit(url)
+        scheme = parts.scheme or "https"
+        origin = (scheme, parts.hostname, parts.port or (443 if scheme == "https" else 80))
+        target = parts.path or "/"
+        if parts.query:
+            target = f"{target}?{parts.query}"
+        while True:
+            conn, reused = self._acquire(origin, timeout)
+            try:
+                conn.request(method, target, body=body, headers=headers or {})
+                response = conn.getresponse()
+            except _STALE_ERRORS:
+                conn.close()
+                if reused:
+                    continue
+                raise
+            except BaseException:
+                conn.close()
+                raise
+            return origin, conn, response
+
+    def _acquire(self, origin, timeout):
+        with self._lock:
+            idle = self._idle.get(origin)
+            conn = idle.pop() if idle else None
+            self._stats["reused" if conn else "connections"] += 1
+        if conn is None:
+            return self._connect(origin, timeout), False
+        conn.timeout = timeout
+        if conn.sock is not None:
+            conn.sock.settimeout(timeout)
+        return conn, True
+
+    def _connect(self, origin, timeout):
+        scheme, host, port = origin
+        if scheme == "http":
+            return http.client.HTTPConnection(host, port, timeout=timeout)
+        proxy = _https_proxy(host)
+        if proxy is None:
+            return http.client.HTTPSConnection(host, port, timeout=timeout, context=self._ssl_context)
+        conn = http.client.HTTPSConnection(proxy.hostname, proxy.port or 80, timeout=timeout, context=self._ssl_context)
+        conn.set_tunnel(host, port)
+        return conn
+
+    def _release(self, origin, conn, response):
+        if response.will_close:
+            conn.close()
+            return
+        with self._lock:
+            idle = self._idle.setdefault(origin, [])
+            if len(idle) < self.max_idle_per_host:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def _limit_acquire(self, key, tokens):
+        if self.limiter is not None:
+            self.limiter.acquire(key, tokens)
+
+    def _limit_release(self, key, status=None, headers=None):
+        if self.limiter is not None:
+            self.limiter.release(key, status, headers)
+
+    def _backoff(self, attempt, headers=None):
+        with self._lock:
+            self._stats["retries"] += 1
+        delay = retry_after(headers)
+        self._sleep(backoff_delay(attempt) if delay is None else delay)
+
+
+def backoff_delay(attempt):
+    # Exponential with jitter so threads that failed together retry apart.
+    delay = min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** (attempt - 1))
+    return delay * random.uniform(0.5, 1.0)
+
+
+def iter_sse(lines):
+    # Decodes `data:` lines from a server-sent event stream. Reading continues
+    # past [DONE] so the connection is drained and can be reused.
+    done = False
+    for raw_line in lines:
+        line = raw_line.decode("utf-8", errors="replace").strip()
+        if done or not line.startswith("data:"):
+            continue
+        payload = line[len("data:") :].strip()
+        if payload == "[DONE]":
+            done = True
+            continue
+        try:
+            yield json.loads(payload)
+        except json.JSONDecodeError:
+            continue
+
+
+def _status_error(label, response, data):
+    detail = data.decode("utf-8", errors="replace")
+    return RequestError(
+        f"{label} failed: {response.status} {response.reason}\n{detail}",
+        status=response.status,
+        reason=response.reason,
+        detail=detail,
+        headers=response.headers,
+    )
+
+
+def _https_proxy(host):
+    proxy = urllib.request.getproxies().get("https")
+    if not proxy or urllib.request.proxy_bypass(host):
+        return None
+    return urllib.parse.urlsplit(proxy if "://" in proxy else f"http://{proxy}")
+
+
+TRANSPORT = HTTPTransport(limiter=RATE_LIMITER)
+
+
+def request(method, url, body=None, headers=None, **kwargs):
+    return TRANSPORT.request(method, url, body, headers, **kwargs)
+
+
+def stream(method, url, body=None, headers=None, **kwargs):
+    return TRANSPORT.stream(method, url, body, headers, **kwargs)
+
+
+def post_json(url, payload, api_key, **kwargs):
+    headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
+    kwargs.setdefault("tokens", estimate_tokens(payload))
+    return request("POST", url, json.dumps(payload).encode("utf-8"), headers, **kwargs)
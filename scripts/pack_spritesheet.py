@@ -1,12 +1,15 @@
 #!/usr/bin/env python3
 import argparse
+import hashlib
 import json
 import math
+import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 try:
-    from PIL import Image
+    from PIL import Image, ImageChops, ImageStat
 except ImportError as exc:
     raise SystemExit("Pillow is required. Install with: pip install pillow") from exc
 
@@ -25,6 +28,17 @@ DEFAULT_FRAME_SIZE = 512
 DEFAULT_PADDING = 2
 DEFAULT_MAX_SIZE = 8192
 DEFAULT_MAX_FPS = 60
+DEFAULT_ANCHOR_OFFSET = 32
+PACKING_MODES = ("grid", "trim")
+DEDUPE_MODES = ("off", "exact", "near")
+NEAR_DUPLICATE_DISTANCE = 4
+# Measured inside the union of both frames' alpha bounding boxes: mean of the
+# per-pixel max channel difference, and the share of pixels allowed to differ
+# by more than NEAR_DUPLICATE_PIXEL_DIFF.
+NEAR_DUPLICATE_DIFF = 2.0
+NEAR_DUPLICATE_PIXEL_DIFF = 16
+NEAR_DUPLICATE_OUTLIERS = 0.001
+DEFAULT_JOBS = os.cpu_count() or 1
 
 
 def load_json(path):
@@ -78,6 +92,30 @@ def parse_args():
         action="store_false",
         help="Prefer explicit keyframes when both dense and explicit frames exist.",
     )
+    parser.add_argument(
+        "--packing",
+        choices=PACKING_MODES,
+        default="grid",
+        help=(
+            "grid: one frame-size cell per frame; trim: crop frames to their alpha "
+            "bounds and MaxRects-pack them (default: grid)."
+        ),
+    )
+    parser.add_argument(
+        "--dedupe",
+        choices=DEDUPE_MODES,
+        default="exact",
+        help=(
+            "Share one sheet region between duplicate frames: exact (identical pixels), "
+            "near (also visually identical frames), or off (default: exact)."
+        ),
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=DEFAULT_JOBS,
+        help=f"Threads that decode, facing-check and flip frames (default: {DEFAULT_JOBS}).",
+    )
     parser.add_argument(
         "--max-size",
         type=int,
@@ -169,6 +207,181 @@ def collect_action_frames_with_fallback(
     return collect_action_frames(fallback_dir, action_id, prefer_dense)
 
 
+def _load_frame(frame_path, frame_size, auto_flip):
+    # Decodes a frame once; with auto_flip the facing check runs on the decoded
+    # image and a flipped frame is written back, as enforce_facing_right does.
+    with Image.open(frame_path) as frame:
+        if frame.size != (frame_size, frame_size):
+            raise SystemExit(
+                f"Frame {frame_path.name} has size {frame.size}, expected {frame_size}."
+            )
+        image = frame.convert("RGBA")
+    if auto_flip and qc.image_needs_horizontal_flip(image):
+        image = image.transpose(Image.FLIP_LEFT_RIGHT)
+        image.save(frame_path)
+        print(f"Auto-flipped {frame_path.name} to face right.")
+    return image
+
+
+def load_frames(frames, frame_size, auto_flip, jobs=1):
+    # Pillow decodes and numpy sums outside the GIL, so a thread pool keeps
+    # every core busy without copying frames between processes.
+    if jobs <= 1 or len(frames) <= 1:
+        return [_load_frame(frame_path, frame_size, auto_flip) for frame_path in frames]
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        return list(
+            executor.map(lambda frame_path: _load_frame(frame_path, frame_size, auto_flip), frames)
+        )
+
+
+def frame_dhash(image):
+    # 64-bit difference hash of the frame composited on grey, so transparent
+    # pixels with stray colour values do not matter.
+    backdrop = Image.new("RGBA", image.size, (128, 128, 128, 255))
+    gray = Image.alpha_composite(backdrop, image).convert("L")
+    pixels = gray.resize((9, 8), getattr(Image, "Resampling", Image).LANCZOS).tobytes()
+    bits = 0
+    for row in range(8):
+        for col in range(8):
+            bits = (bits << 1) | (pixels[row * 9 + col] > pixels[row * 9 + col + 1])
+    return bits
+
+
+def _on_backdrop(image):
+    backdrop = Image.new("RGBA", image.size, (128, 128, 128, 255))
+    return Image.alpha_composite(backdrop, image).convert("RGB")
+
+
+def _is_near_duplicate(image, other):
+    # Transparent padding would dilute a moved limb or a colour shift, so only
+    # the union of the two subjects' boxes is compared.
+    boxes = [box for box in (image.getchannel("A").getbbox(), other.getchannel("A").getbbox()) if box]
+    if not boxes:
+        return True
+    box = (
+        min(box[0] for box in boxes),
+        min(box[1] for box in boxes),
+        max(box[2] for box in boxes),
+        max(box[3] for box in boxes),
+    )
+    image, other = image.crop(box), other.crop(box)
+    channels = ImageChops.difference(_on_backdrop(image), _on_backdrop(other)).split()
+    channels += (ImageChops.difference(image.getchannel("A"), other.getchannel("A")),)
+    per_pixel = channels[0]
+    for channel in channels[1:]:
+        per_pixel = ImageChops.lighter(per_pixel, channel)
+    histogram = per_pixel.histogram()
+    total = per_pixel.width * per_pixel.height
+    if sum(histogram[NEAR_DUPLICATE_PIXEL_DIFF + 1 :]) > total * NEAR_DUPLICATE_OUTLIERS:
+        return False
+    return ImageStat.Stat(per_pixel).mean[0] <= NEAR_DUPLICATE_DIFF
+
+
+def load_unique_frames(frames, frame_size, auto_flip, dedupe="exact", jobs=1):
+    # Loads each frame once and maps duplicates onto the first matching frame:
+    # identical pixels for "exact"; for "near" also frames whose dHash is
+    # within NEAR_DUPLICATE_DISTANCE bits that _is_near_duplicate() accepts.
+    # Returns ({index: image} for unique frames, canonical index per frame).
+    images = {}
+    canonical = []
+    by_digest = {}
+    by_dhash = []
+    for index, image in enumerate(load_frames(frames, frame_size, auto_flip, jobs)):
+        match = None
+        if dedupe != "off":
+            digest = hashlib.sha256(image.tobytes()).digest()
+            match = by_digest.get(digest)
+            if match is None and dedupe == "near":
+                bits = frame_dhash(image)
+                match = next(
+                    (
+                        other
+                        for other_bits, other in by_dhash
+                        if bin(bits ^ other_bits).count("1") <= NEAR_DUPLICATE_DISTANCE
+                        and _is_near_duplicate(image, images[other])
+                    ),
+                    None,
+                )
+                if match is None:
+                    by_dhash.append((bits, index))
+            if match is None:
+                by_digest[digest] = index
+        if match is None:
+            images[index] = image
+            match = index
+        canonical.append(match)
+    return images, canonical
+
+
+def _unique_groups(groups, canonical):
+    # Rewrites animation groups onto unique frames; a frame shared between
+    # animations is placed with the first one.
+    seen = set()
+    unique = []
+    for group in groups:
+        items = []
+        for index in group:
+            if canonical[index] not in seen:
+                seen.add(canonical[index])
+                items.append(canonical[index])
+        unique.append(items)
+    return unique
+
+
+def _share_duplicates(names, canonical, frames_meta):
+    merged = 0
+    for index, match in enumerate(canonical):
+        if match != index:
+            frames_meta[names[index]] = dict(frames_meta[names[match]])
+            merged += 1
+    if merged:
+        print(f"Shared {merged} duplicate frame(s) with identical sheet regions.")
+
+
+def _default_anchor(frame_size):
+    return {"x": frame_size // 2, "y": frame_size - DEFAULT_ANCHOR_OFFSET}
+
+
+def sheet_image_name(page):
+    return "spritesheet.webp" if page == 0 else f"spritesheet-{page}.webp"
+
+
+def _write_sheet(sheet, sheets_dir, image_name):
+    webp_path = images_api.save_webp(sheet, sheets_dir / image_name)
+    print(f"Wrote {webp_path}")
+    return image_name
+
+
+def assign_pages(groups, new_page, try_add):
+    # Places each group (an animation's frame indices) whole on the first page
+    # with room, so an animation rarely switches textures; a group larger
+    # than an empty page spills frame by frame onto fresh pages. Returns the
+    # frame indices per page.
+    pages = []
+    assigned = []
+    for group in groups:
+        if not group:
+            continue
+        for page, items in zip(pages, assigned):
+            if try_add(page, group):
+                items.extend(group)
+                break
+        else:
+            pages.append(new_page())
+            assigned.append([])
+            if try_add(pages[-1], group):
+                assigned[-1].extend(group)
+                continue
+            for item in group:
+                if not try_add(pages[-1], [item]):
+                    pages.append(new_page())
+                    assigned.append([])
+                    if not try_add(pages[-1], [item]):
+                        raise SystemExit("Frame does not fit on an empty spritesheet page.")
+                assigned[-1].append(item)
+    return assigned
+
+
 def pack_single_sheet(
     frames,
     names,
@@ -179,9 +392,12 @@ def pack_single_sheet(
     max_size,
     auto_flip,
     frames_meta,
+    groups=None,
+    dedupe="exact",
+    jobs=1,
 ):
     if not frames:
-        return None
+        return []
 
     sheet_width, _ = calc_sheet_size(columns, 1, frame_size, padding)
     if sheet_width > max_size:
@@ -189,56 +405,206 @@ def pack_single_sheet(
             f"Columns {columns} produce width {sheet_width}, exceeds max {max_size}."
         )
 
-    rows = math.ceil(len(frames) / columns)
-    sheet_width, sheet_height = calc_sheet_size(columns, rows, frame_size, padding)
-    if sheet_height > max_size:
-        raise SystemExit(
-            f"Spritesheet height {sheet_height} exceeds max {max_size}."
-        )
+    capacity = columns * max_rows_for_sheet(max_size, frame_size, padding)
 
-    sheet = Image.new("RGBA", (sheet_width, sheet_height), (0, 0, 0, 0))
-    for index, frame_path in enumerate(frames):
-        col = index % columns
-        row = index // columns
-        x = col * (frame_size + padding)
-        y = row * (frame_size + padding)
-
-        if auto_flip:
-            try:
-                if qc.enforce_facing_right(frame_path):
-                    print(f"Auto-flipped {frame_path.name} to face right.")
-            except RuntimeError as exc:
-                print(f"Facing check skipped for {frame_path.name}: {exc}")
-
-        with Image.open(frame_path) as frame:
-            if frame.size != (frame_size, frame_size):
-                raise SystemExit(
-                    f"Frame {frame_path.name} has size {frame.size}, expected {frame_size}."
-                )
-            sheet.paste(frame, (x, y))
+    def try_add(remaining, items):
+        if len(items) > remaining[0]:
+            return False
+        remaining[0] -= len(items)
+        return True
+
+    images, canonical = load_unique_frames(frames, frame_size, auto_flip, dedupe, jobs)
+    groups = _unique_groups(groups or [list(range(len(frames)))], canonical)
+    pages = assign_pages(groups, lambda: [capacity], try_add)
+    sheets = []
+    for page, items in enumerate(pages):
+        rows = math.ceil(len(items) / columns)
+        sheet_width, sheet_height = calc_sheet_size(columns, rows, frame_size, padding)
+        sheet = Image.new("RGBA", (sheet_width, sheet_height), (0, 0, 0, 0))
+        for cell, index in enumerate(items):
+            x = (cell % columns) * (frame_size + padding)
+            y = (cell // columns) * (frame_size + padding)
+            sheet.paste(images[index], (x, y))
+            frames_meta[names[index]] = {
+                "frame": {"x": x, "y": y, "w": frame_size, "h": frame_size},
+                "anchor": _default_anchor(frame_size),
+                "sheet": page,
+            }
+        image_name = _write_sheet(sheet, sheets_dir, sheet_image_name(page))
+        sheets.append({"image": image_name, "size": {"w": sheet_width, "h": sheet_height}})
+    _share_duplicates(names, canonical, frames_meta)
+    return sheets
+
+
+class MaxRectsBin:
+    # MaxRects bin packer (best short side fit): keeps the maximal free
+    # rectangles of the bin and splits every one a placement overlaps.
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.free = [(0, 0, width, height)]
+
+    def insert(self, width, height):
+        best = None
+        best_score = None
+        for free_x, free_y, free_w, free_h in self.free:
+            if width > free_w or height > free_h:
+                continue
+            score = (min(free_w - width, free_h - height), max(free_w - width, free_h - height))
+            if best_score is None or score < best_score:
+                best, best_score = (free_x, free_y), score
+        if best is None:
+            return None
+        self._place(best[0], best[1], width, height)
+        return best
+
+    def _place(self, x, y, width, height):
+        right, bottom = x + width, y + height
+        split = []
+        for free in self.free:
+            free_x, free_y, free_w, free_h = free
+            free_right, free_bottom = free_x + free_w, free_y + free_h
+            if x >= free_right or right <= free_x or y >= free_bottom or bottom <= free_y:
+                split.append(free)
+                continue
+            if x > free_x:
+                split.append((free_x, free_y, x - free_x, free_h))
+            if right < free_right:
+                split.append((right, free_y, free_right - right, free_h))
+            if y > free_y:
+                split.append((free_x, free_y, free_w, y - free_y))
+            if bottom < free_bottom:
+                split.append((free_x, bottom, free_w, free_bottom - bottom))
+        self.free = [
+            rect
+            for index, rect in enumerate(split)
+            if not any(
+                other_index != index
+                and _contains(other, rect)
+                and (other != rect or other_index < index)
+                for other_index, other in enumerate(split)
+            )
+        ]
+
+
+def _contains(outer, inner):
+    return (
+        outer[0] <= inner[0]
+        and outer[1] <= inner[1]
+        and outer[0] + outer[2] >= inner[0] + inner[2]
+        and outer[1] + outer[3] >= inner[1] + inner[3]
+    )
 
-        frame_name = names[index]
-        frames_meta[frame_name] = {
-            "frame": {"x": x, "y": y, "w": frame_size, "h": frame_size},
-            "anchor": {"x": frame_size // 2, "y": frame_size - 32},
-            "sheet": 0,
-        }
 
-    image_name = "spritesheet.webp"
-    sheet_path = sheets_dir / "spritesheet.png"
-    sheet.save(sheet_path)
-    webp_path = sheets_dir / image_name
-    images_api.convert_to_webp(
-        sheet_path,
-        output_path=webp_path,
-        remove_source=True,
+def pack_rects(sizes, max_size, padding):
+    # Packs (w, h) rectangles, largest first, into the smallest square-ish bin
+    # that fits, growing it up to max_size. Each rect reserves `padding`
+    # pixels on its right/bottom edge. Returns ([(x, y)] in input order,
+    # (sheet_w, sheet_h)) or None when they do not fit in max_size.
+    if not sizes:
+        return [], (0, 0)
+    padded = [(width + padding, height + padding) for width, height in sizes]
+    order = sorted(
+        range(len(sizes)),
+        key=lambda index: (-max(padded[index]), -padded[index][0] * padded[index][1], index),
     )
-    print(f"Wrote {webp_path}")
-    return {
-        "image": image_name,
-        "action": "all",
-        "size": {"w": sheet_width, "h": sheet_height},
-    }
+    area = sum(width * height for width, height in padded)
+    side = max(math.ceil(math.sqrt(area)), *(max(size) for size in padded))
+    while True:
+        side = min(side, max_size + padding)
+        bin_ = MaxRectsBin(side, side)
+        placements = [None] * len(sizes)
+        for index in order:
+            placements[index] = bin_.insert(*padded[index])
+            if placements[index] is None:
+                break
+        else:
+            width = max(x + size[0] for (x, _), size in zip(placements, sizes))
+            height = max(y + size[1] for (_, y), size in zip(placements, sizes))
+            return placements, (width, height)
+        if side >= max_size + padding:
+            return None
+        side = math.ceil(side * 1.1)
+
+
+def trim_frame(frame):
+    # Crops a frame to its alpha bounding box; returns (cropped, (left, top)).
+    # Fully transparent frames keep a single pixel so they still get a rect.
+    bbox = frame.getchannel("A").getbbox() or (0, 0, 1, 1)
+    return frame.crop(bbox), bbox[:2]
+
+
+def pack_trimmed_sheet(
+    frames,
+    names,
+    sheets_dir,
+    frame_size,
+    padding,
+    max_size,
+    auto_flip,
+    frames_meta,
+    groups=None,
+    dedupe="exact",
+    jobs=1,
+):
+    if not frames:
+        return []
+
+    images, canonical = load_unique_frames(frames, frame_size, auto_flip, dedupe, jobs)
+    trimmed = {index: trim_frame(image) for index, image in images.items()}
+    sizes = {index: image.size for index, (image, _) in trimmed.items()}
+    for width, height in sizes.values():
+        if max(width, height) > max_size:
+            raise SystemExit(f"Trimmed frame {width}x{height} exceeds max {max_size}.")
+
+    positions = {}
+
+    def try_add(bin_, items):
+        saved = list(bin_.free)
+        placed = {}
+        for index in sorted(items, key=lambda index: (-max(sizes[index]), index)):
+            width, height = sizes[index]
+            placed[index] = bin_.insert(width + padding, height + padding)
+            if placed[index] is None:
+                bin_.free = saved
+                return False
+        positions.update(placed)
+        return True
+
+    page_bin = max_size + padding
+    groups = _unique_groups(groups or [list(range(len(frames)))], canonical)
+    pages = assign_pages(groups, lambda: MaxRectsBin(page_bin, page_bin), try_add)
+    anchor = _default_anchor(frame_size)
+    sheets = []
+    for page, items in enumerate(pages):
+        # Repack each page into its smallest bin, keeping the full-page
+        # placement if the repack happens not to fit.
+        packed = pack_rects([sizes[index] for index in items], max_size, padding)
+        if packed is None:
+            placements = [positions[index] for index in items]
+            sheet_width = max(x + sizes[index][0] for index, (x, _) in zip(items, placements))
+            sheet_height = max(y + sizes[index][1] for index, (_, y) in zip(items, placements))
+        else:
+            placements, (sheet_width, sheet_height) = packed
+        sheet = Image.new("RGBA", (sheet_width, sheet_height), (0, 0, 0, 0))
+        for index, (x, y) in zip(items, placements):
+            image, (left, top) = trimmed[index]
+            sheet.paste(image, (x, y))
+            width, height = image.size
+            # Anchors are relative to the trimmed rect; spriteSourceSize and
+            # sourceSize let the runtime scale by the untrimmed frame.
+            frames_meta[names[index]] = {
+                "frame": {"x": x, "y": y, "w": width, "h": height},
+                "anchor": {"x": anchor["x"] - left, "y": anchor["y"] - top},
+                "sheet": page,
+                "trimmed": True,
+                "spriteSourceSize": {"x": left, "y": top, "w": width, "h": height},
+                "sourceSize": {"w": frame_size, "h": frame_size},
+            }
+        image_name = _write_sheet(sheet, sheets_dir, sheet_image_name(page))
+        sheets.append({"image": image_name, "size": {"w": sheet_width, "h": sheet_height}})
+    _share_duplicates(names, canonical, frames_meta)
+    return sheets
 
 
 def pack_spritesheet(
@@ -253,6 +619,9 @@ def pack_spritesheet(
     fallback_subdir,
     retime,
     max_fps,
+    packing="grid",
+    dedupe="exact",
+    jobs=1,
 ):
     frames_dir = ROOT / DEFAULT_OUTPUT_ROOT / pony_id / frames_subdir
     fallback_dir = ROOT / DEFAULT_OUTPUT_ROOT / pony_id / fallback_subdir
@@ -273,6 +642,7 @@ def pack_spritesheet(
     animations = {}
     all_frames = []
     all_names = []
+    groups = []
 
     for action_id in action_order:
         frames, names = collect_action_frames_with_fallback(
@@ -281,25 +651,61 @@ def pack_spritesheet(
         if not frames:
             continue
         animations[action_id] = names
+        groups.append(list(range(len(all_frames), len(all_frames) + len(frames))))
         all_frames.extend(frames)
         all_names.extend(names)
 
-    sheet_entry = pack_single_sheet(
-        frames=all_frames,
-        names=all_names,
-        sheets_dir=sheets_dir,
-        frame_size=frame_size,
-        columns=columns,
-        padding=DEFAULT_PADDING,
-        max_size=max_size,
-        auto_flip=auto_flip,
-        frames_meta=frames_meta,
-    )
+    if packing == "trim":
+        sheets = pack_trimmed_sheet(
+            frames=all_frames,
+            names=all_names,
+            sheets_dir=sheets_dir,
+            frame_size=frame_size,
+            padding=DEFAULT_PADDING,
+            max_size=max_size,
+            auto_flip=auto_flip,
+            frames_meta=frames_meta,
+            groups=groups,
+            dedupe=dedupe,
+            jobs=jobs,
+        )
+    else:
+        sheets = pack_single_sheet(
+            frames=all_frames,
+            names=all_names,
+            sheets_dir=sheets_dir,
+            frame_size=frame_size,
+            columns=columns,
+            padding=DEFAULT_PADDING,
+            max_size=max_size,
+            auto_flip=auto_flip,
+            frames_meta=frames_meta,
+            groups=groups,
+            dedupe=dedupe,
+            jobs=jobs,
+        )
 
-    if not sheet_entry:
+    if not sheets:
         print(f"No frames found for {pony_id}.")
         return False
 
+    written = {sheet["image"] for sheet in sheets}
+    for stale in sheets_dir.glob("spritesheet-*.webp"):
+        if stale.name not in written:
+            stale.unlink()
+    for page, sheet in enumerate(sheets):
+        page_actions = [
+            action_id
+            for action_id, names in animations.items()
+            if any(frames_meta[name]["sheet"] == page for name in names)
+        ]
+        sheets[page] = {
+            "image": sheet["image"],
+            "action": "all" if len(sheets) == 1 else ",".join(page_actions),
+            "animations": page_actions,
+            "size": sheet["size"],
+        }
+
     base_fps = {action["id"]: action.get("fps", 1) for action in actions}
     base_frames = {action["id"]: action.get("frames", 1) for action in actions}
     fps = {}
@@ -315,10 +721,10 @@ def pack_spritesheet(
         else:
             fps[action_id] = fps_value
     meta = {
-        "image": sheet_entry["image"],
-        "size": sheet_entry["size"],
-        "images": [sheet_entry["image"]],
-        "sheets": [sheet_entry],
+        "image": sheets[0]["image"],
+        "size": sheets[0]["size"],
+        "images": [sheet["image"] for sheet in sheets],
+        "sheets": sheets,
     }
 
     spritesheet_json = {
@@ -358,6 +764,9 @@ def main():
             args.fallback_subdir,
             args.retime,
             args.max_fps,
+            args.packing,
+            args.dedupe,
+            args.jobs,
         )
         success = success and result
 
@@ -10,7 +10,7 @@ from .config import (
     DEFAULT_ASSET_MANIFEST,
     ROOT,
 )
-from .io import load_data, save_data
+from .asset_manifest import asset_manifest
 from .utils import sanitize_value, slugify
 
 if str(ROOT) not in sys.path:
@@ -36,11 +36,6 @@ PLACEHOLDER_PNG = (
 )
 PLACEHOLDER_WEBP = "UklGRiIAAABXRUJQVlA4TCEAAAAvAAAAAAfQ//73v/+BiOh/AAA="
 
-
-def _iso_timestamp():
-    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
-
-
 def _coerce_int(value):
     try:
         return int(value)
@@ -75,16 +70,6 @@ def _web_path(path):
         return Path(path).as_posix()
 
 
-def _reserve_slug(slug_base, existing_ids):
-    slug = slug_base
-    suffix = 1
-    existing = set(existing_ids)
-    while slug in existing:
-        slug = f"{slug_base}-{suffix}"
-        suffix += 1
-    return slug
-
-
 def _write_placeholder(path, encoded):
     path = Path(path)
     path.parent.mkdir(parents=True, exist_ok=True)
@@ -98,6 +83,7 @@ def generate_asset(
     library_root=None,
     generated_root=None,
     env_file=None,
+    progress=None,
 ):
     if not isinstance(payload, dict):
         raise ValueError("Payload must be a JSON object.")
@@ -126,6 +112,9 @@ def generate_asset(
     request_size = payload.get("request_size") or 1024
     target_override = _coerce_int(payload.get("target_size"))
     dry_run = bool(payload.get("dry_run"))
+    # The raw API PNG is only kept on request; the WebP is built in memory.
+    keep_source = bool(payload.get("keep_source"))
+    use_cache = not payload.get("no_cache")
 
     base_slug = sanitize_value(payload.get("slug"), fallback="", max_len=120)
     if not base_slug:
@@ -137,34 +126,39 @@ def generate_asset(
     library_root = Path(library_root or (ROOT / DEFAULT_ASSET_LIBRARY_ROOT)).resolve()
     generated_root = Path(generated_root or (ROOT / DEFAULT_ASSET_GENERATED_ROOT)).resolve()
 
-    if not manifest_path.exists():
+    manifest = asset_manifest(manifest_path)
+    if not manifest.exists():
         raise ValueError("Asset manifest not found.")
 
-    manifest = load_data(manifest_path)
-    assets = manifest.get("assets") if isinstance(manifest, dict) else None
-    if not isinstance(assets, list):
-        assets = []
-        manifest["assets"] = assets
-
-    existing_ids = [entry.get("meta", {}).get("slug") for entry in assets if entry.get("meta")]
-    slug = _reserve_slug(base_slug, [entry for entry in existing_ids if entry])
-    config, webp_path, png_path = _resolve_paths(
-        asset_type, stage, slug, library_root, generated_root
-    )
-
-    if dry_run:
-        _write_placeholder(png_path, PLACEHOLDER_PNG)
-        _write_placeholder(webp_path, PLACEHOLDER_WEBP)
-    else:
-        _ensure_openai_key(env_file)
-        images_api.generate_png(prompt, request_size, png_path)
-        images_api.convert_to_webp(
-            png_path,
-            output_path=webp_path,
-            target_size=target_override or config["default_size"],
-            remove_source=False,
+    # Background jobs run generate_asset concurrently; the slug stays reserved
+    # in the manifest index until the entry is appended or the call fails.
+    _report(progress, "reserving")
+    slug = manifest.reserve_slug(base_slug)
+    try:
+        config, webp_path, png_path = _resolve_paths(
+            asset_type, stage, slug, library_root, generated_root
         )
 
+        if dry_run:
+            if keep_source:
+                _write_placeholder(png_path, PLACEHOLDER_PNG)
+            _write_placeholder(webp_path, PLACEHOLDER_WEBP)
+        else:
+            _ensure_openai_key(env_file)
+            _report(progress, "requesting_image")
+            images_api.generate_webp(
+                prompt,
+                request_size,
+                webp_path,
+                target_size=target_override or config["default_size"],
+                use_cache=use_cache,
+                png_path=png_path if keep_source else None,
+                variants=images_api.DEFAULT_VARIANT_SIZES,
+            )
+    except BaseException:
+        manifest.release_slug(slug)
+        raise
+
     asset_id = f"{slugify(system)}-{asset_type}-{slug}"
     preview_path = _web_path(webp_path)
 
@@ -182,6 +176,13 @@ def generate_asset(
     }
     meta = {key: value for key, value in meta.items() if value is not None}
 
+    file_entry = {"role": config["role"], "label": slug, "path": preview_path}
+    variants = images_api.existing_variants(webp_path)
+    if variants:
+        file_entry["variants"] = [
+            {"size": variant["size"], "path": _web_path(variant["path"])} for variant in variants
+        ]
+
     asset_entry = {
         "id": asset_id,
         "title": title,
@@ -189,7 +190,7 @@ def generate_asset(
         "type": asset_type,
         "stage": stage,
         "script": "Asset Forge API",
-        "source": {"path": str(png_path)},
+        "source": {"path": str(png_path)} if keep_source else None,
         "preview": preview_path,
         "prompt": prompt,
         "prompt_profile": prompt_profile or None,
@@ -197,13 +198,7 @@ def generate_asset(
         "prompt_base": prompt_base or None,
         "prompt_variant": prompt_variant or None,
         "meta": meta,
-        "files": [
-            {
-                "role": config["role"],
-                "label": slug,
-                "path": preview_path,
-            }
-        ],
+        "files": [file_entry],
         "regenerate": {
             "notes": "Regenerate via Asset Forge API.",
             "provider": provider,
@@ -223,7 +218,14 @@ def generate_asset(
     }
     asset_entry = {key: value for key, value in asset_entry.items() if value is not None}
 
-    assets.append(asset_entry)
-    manifest["generated_at"] = _iso_timestamp()
-    save_data(manifest_path, manifest)
+    _report(progress, "saving_manifest")
+    try:
+        manifest.append(asset_entry)
+    finally:
+        manifest.release_slug(slug)
     return asset_entry
+
+
+def _report(progress, stage):
+    if progress:
+        progress(stage)
@@ -0,0 +1,177 @@
+import hashlib
+import json
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from .asset_generation import generate_asset
+from .config import ASSET_JOB_RETENTION_SECONDS, ASSET_JOB_WORKERS
+
+_FINISHED = ("done", "failed")
+
+# Fields that decide what gets generated and where it lands (library path,
+# manifest id and entry); payloads that agree on these while a job is in
+# flight share that job instead of paying for a second image.
+_DEDUPE_FIELDS = (
+    "provider",
+    "type",
+    "prompt",
+    "request_size",
+    "target_size",
+    "style",
+    "dry_run",
+    "no_cache",
+    "keep_source",
+    "system",
+    "stage",
+    "collection",
+    "slug",
+    "title",
+    "alpha_correction",
+    "prompt_profile",
+    "prompt_base",
+    "prompt_variant",
+)
+
+
+def job_fingerprint(payload):
+    if not isinstance(payload, dict):
+        return None
+    key = {field: payload.get(field) for field in _DEDUPE_FIELDS}
+    key["request_size"] = str(key["request_size"] or 1024)
+    key["target_size"] = str(key["target_size"] or "")
+    key["dry_run"] = bool(key["dry_run"])
+    key["no_cache"] = bool(key["no_cache"])
+    key["keep_source"] = bool(key["keep_source"])
+    encoded = json.dumps(key, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class AssetJobQueue:
+    def __init__(self, workers=ASSET_JOB_WORKERS, retention_seconds=ASSET_JOB_RETENTION_SECONDS, generate=None):
+        self.retention_seconds = retention_seconds
+        self._generate = generate or generate_asset
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="asset-job")
+        self._jobs = {}
+        self._in_flight = {}
+        self._changed = threading.Condition()
+
+    def submit(self, payload, **generate_kwargs):
+        # Returns (job_view, deduplicated).
+        fingerprint = job_fingerprint(payload)
+        with self._changed:
+            self._prune()
+            job_id = self._in_flight.get(fingerprint)
+            if job_id:
+                job = self._jobs[job_id]
+                job["requests"] += 1
+                return self._view(job), True
+            now = time.time()
+            job = {
+                "id": uuid.uuid4().hex[:12],
+                "status": "queued",
+                "stage": "queued",
+                "fingerprint": fingerprint,
+                "title": payload.get("title") if isinstance(payload, dict) else None,
+                "type": payload.get("type") if isinstance(payload, dict) else None,
+                "requests": 1,
+                "created_at": now,
+                "updated_at": now,
+                "events": [{"stage": "queued", "at": now}],
+                "asset": None,
+                "error": None,
+                "error_kind": None,
+            }
+            self._jobs[job["id"]] = job
+            if fingerprint:
+                self._in_flight[fingerprint] = job["id"]
+            view = self._view(job)
+        self._executor.submit(self._run, job["id"], payload, generate_kwargs)
+        return view, False
+
+    def get(self, job_id):
+        with self._changed:
+            job = self._jobs.get(job_id)
+            return self._view(job) if job else None
+
+    def list(self):
+        with self._changed:
+            return [self._view(job) for job in self._jobs.values()]
+
+    def wait(self, job_id, timeout=None):
+        deadline = None if timeout is None else time.time() + timeout
+        with self._changed:
+            while True:
+                job = self._jobs.get(job_id)
+                if not job or job["status"] in _FINISHED:
+                    return self._view(job) if job else None
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    return self._view(job)
+                self._changed.wait(remaining)
+
+    def events(self, job_id, heartbeat=15.0):
+        # Yields progress records as they happen and a final status record.
+        sent = 0
+        while True:
+            with self._changed:
+                job = self._jobs.get(job_id)
+                if not job:
+                    return
+                if sent == len(job["events"]) and job["status"] not in _FINISHED:
+                    self._changed.wait(heartbeat)
+                pending = job["events"][sent:]
+                sent += len(pending)
+                finished = job["status"] in _FINISHED
+                view = self._view(job)
+            for event in pending:
+                yield {"type": "progress", "job": job_id, **event}
+            if finished:
+                yield {"type": "status", "job": view}
+                return
+            if not pending:
+                yield {"type": "heartbeat", "job": job_id}
+
+    def _run(self, job_id, payload, generate_kwargs):
+        self._update(job_id, status="running", stage="running")
+        try:
+            asset = self._generate(
+                payload,
+                progress=lambda stage: self._update(job_id, stage=stage),
+                **generate_kwargs,
+            )
+        except ValueError as exc:
+            self._update(job_id, status="failed", stage="failed", error=str(exc), error_kind="bad_request")
+        except Exception as exc:
+            self._update(job_id, status="failed", stage="failed", error=str(exc), error_kind="error")
+        else:
+            self._update(job_id, status="done", stage="done", asset=asset)
+
+    def _update(self, job_id, **fields):
+        with self._changed:
+            job = self._jobs.get(job_id)
+            if not job:
+                return
+            now = time.time()
+            if fields.get("stage") and fields["stage"] != job["stage"]:
+                job["events"].append({"stage": fields["stage"], "at": now})
+            job.update(fields)
+            job["updated_at"] = now
+            if job["status"] in _FINISHED and self._in_flight.get(job["fingerprint"]) == job_id:
+                del self._in_flight[job["fingerprint"]]
+            self._changed.notify_all()
+
+    def _prune(self):
+        cutoff = time.time() - self.retention_seconds
+        for job_id in [key for key, job in self._jobs.items() if job["status"] in _FINISHED and job["updated_at"] < cutoff]:
+            del self._jobs[job_id]
+
+    @staticmethod
+    def _view(job):
+        view = {key: value for key, value in job.items() if key not in ("fingerprint", "events")}
+        view["events"] = list(job["events"])
+        return view
+
+
+ASSET_JOBS = AssetJobQueue()
@@ -0,0 +1,292 @@
+import atexit
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from .config import (
+    ASSET_MANIFEST_COMPACT_EVERY,
+    ASSET_MANIFEST_COMPACT_SECONDS,
+    ASSET_MANIFEST_RESERVATION_SECONDS,
+)
+from .io import load_data
+
+
+def journal_path_for(manifest_path):
+    path = Path(manifest_path)
+    return path.with_name(f"{path.stem}.journal.jsonl")
+
+
+class AssetManifest:
+    # manifest.json plus an append-only journal of entries added since the last
+    # compaction. Adding an asset appends one line; readers get the merged view
+    # from snapshot(), and compact() folds the journal back into manifest.json.
+    # Entries are keyed by id, so a crash between rewriting manifest.json and
+    # truncating the journal only leaves duplicates that are skipped on load.
+    # Slug reservations are journal records too ({"reserve": slug} and
+    # {"release": slug}), so every process sharing the manifest sees them.
+    def __init__(
+        self,
+        manifest_path,
+        compact_every=ASSET_MANIFEST_COMPACT_EVERY,
+        compact_seconds=ASSET_MANIFEST_COMPACT_SECONDS,
+        reservation_seconds=ASSET_MANIFEST_RESERVATION_SECONDS,
+    ):
+        self.path = Path(manifest_path)
+        self.journal_path = journal_path_for(self.path)
+        self.compact_every = compact_every
+        self.compact_seconds = compact_seconds
+        self.reservation_seconds = reservation_seconds
+        self._lock = threading.RLock()
+        self._manifest = None
+        self._signature = None
+        self._journal_offset = 0
+        self._journal_entries = 0
+        self._ids = set()
+        self._slugs = set()
+        self._pending = set()
+        self._reserved = {}
+        self._suffixes = {}
+        self._compacted_at = time.monotonic()
+
+    def exists(self):
+        return self.path.exists()
+
+    def snapshot(self):
+        with self._lock:
+            self._refresh()
+            return {**self._manifest, "assets": list(self._manifest["assets"])}
+
+    def reserve_slug(self, slug_base):
+        # The slug stays reserved, for every process sharing the manifest,
+        # until append() or release_slug().
+        with self._lock, self._journal() as handle:
+            self._refresh()
+            slug = slug_base
+            if self._taken(slug):
+                suffix = self._suffixes.get(slug_base, 1)
+                while self._taken(f"{slug_base}-{suffix}"):
+                    suffix += 1
+                self._suffixes[slug_base] = suffix
+                slug = f"{slug_base}-{suffix}"
+            record = {"reserve": slug, "at": time.time()}
+            self._write(handle, record)
+            self._apply_reservation(record)
+            self._pending.add(slug)
+            return slug
+
+    def release_slug(self, slug):
+        with self._lock:
+            if slug not in self._pending:
+                return
+            with self._journal() as handle:
+                self._refresh()
+                record = {"release": slug}
+                self._write(handle, record)
+                self._apply_reservation(record)
+                self._pending.discard(slug)
+
+    def append(self, entry):
+        with self._lock, self._journal() as handle:
+            self._refresh()
+            if entry.get("id") in self._ids:
+                raise ValueError(f"Asset id already exists: {entry['id']}")
+            self._write(handle, entry)
+            self._journal_entries += 1
+            self._add(entry)
+            self._manifest["generated_at"] = _iso_timestamp()
+            slug = (entry.get("meta") or {}).get("slug")
+            self._pending.discard(slug)
+            if self._compaction_due():
+                self._compact(handle)
+
+    def compact(self):
+        with self._lock:
+            if not self.path.exists():
+                return False
+            with self._journal() as handle:
+                self._refresh()
+                if not self._journal_entries:
+                    return False
+                self._compact(handle)
+                return True
+
+    def _write(self, handle, record):
+        # Callers hold the journal lock and have just refreshed, so the
+        # journal ends exactly at _journal_offset.
+        line = (json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+        handle.write(line)
+        handle.flush()
+        os.fsync(handle.fileno())
+        self._journal_offset += len(line)
+
+    def _refresh(self):
+        signature = _signature(self.path)
+        if signature is None:
+            raise FileNotFoundError(self.path)
+        if signature != self._signature:
+            # First load, or manifest.json was rewritten (compaction elsewhere
+            # or build_asset_manifest.py); rebuild the index and replay the journal.
+            manifest = load_data(self.path)
+            if not isinstance(manifest, dict):
+                manifest = {}
+            if not isinstance(manifest.get("assets"), list):
+                manifest["assets"] = []
+            self._manifest = manifest
+            self._signature = signature
+            self._ids = set()
+            self._slugs = set()
+            self._reserved = {}
+            self._suffixes = {}
+            for entry in manifest["assets"]:
+                self._index(entry)
+            self._journal_offset = 0
+            self._journal_entries = 0
+        self._read_journal()
+
+    def _read_journal(self):
+        try:
+            size = self.journal_path.stat().st_size
+        except OSError:
+            return
+        if size < self._journal_offset:
+            self._journal_offset = 0
+            self._journal_entries = 0
+            self._reserved = {}
+        if size == self._journal_offset:
+            return
+        with open(self.journal_path, "rb") as handle:
+            handle.seek(self._journal_offset)
+            data = handle.read()
+        # Only consume whole lines; a writer may be mid-append.
+        end = data.rfind(b"\n") + 1
+        self._journal_offset += end
+        for raw_line in data[:end].splitlines():
+            try:
+                entry = json.loads(raw_line)
+            except ValueError:
+                continue
+            if not isinstance(entry, dict):
+                continue
+            if "reserve" in entry or "release" in entry:
+                self._apply_reservation(entry)
+                continue
+            self._journal_entries += 1
+            self._add(entry)
+
+    def _add(self, entry):
+        if entry.get("id") in self._ids:
+            return
+        self._manifest["assets"].append(entry)
+        self._index(entry)
+
+    def _index(self, entry):
+        if not isinstance(entry, dict):
+            return
+        if entry.get("id"):
+            self._ids.add(entry["id"])
+        slug = (entry.get("meta") or {}).get("slug")
+        if slug:
+            self._slugs.add(slug)
+            self._reserved.pop(slug, None)
+
+    def _apply_reservation(self, record):
+        if "release" in record:
+            self._reserved.pop(record["release"], None)
+        elif record.get("reserve") and record["reserve"] not in self._slugs:
+            self._reserved[record["reserve"]] = record.get("at") or 0
+
+    def _live_reservations(self):
+        cutoff = time.time() - self.reservation_seconds
+        return {slug: at for slug, at in self._reserved.items() if at >= cutoff or slug in self._pending}
+
+    def _taken(self, slug):
+        if slug in self._slugs or slug in self._pending:
+            return True
+        at = self._reserved.get(slug)
+        return at is not None and at >= time.time() - self.reservation_seconds
+
+    def _compaction_due(self):
+        if self._journal_entries >= self.compact_every:
+            return True
+        return bool(self._journal_entries) and time.monotonic() - self._compacted_at >= self.compact_seconds
+
+    def _compact(self, handle):
+        self._manifest["generated_at"] = _iso_timestamp()
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as output:
+            json.dump(self._manifest, output, indent=2, sort_keys=False)
+            output.write("\n")
+            output.flush()
+            os.fsync(output.fileno())
+        os.replace(tmp_path, self.path)
+        handle.truncate(0)
+        self._signature = _signature(self.path)
+        self._journal_offset = 0
+        self._journal_entries = 0
+        self._compacted_at = time.monotonic()
+        # Reservations still in flight outlive the truncate; expired ones
+        # (their process died) are dropped here.
+        self._reserved = self._live_reservations()
+        for slug, at in self._reserved.items():
+            self._write(handle, {"reserve": slug, "at": at})
+
+    @contextmanager
+    def _journal(self):
+        # The journal handle doubles as a cross-process lock so two servers or
+        # scripts sharing a manifest never interleave appends with compaction.
+        self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.journal_path, "ab") as handle:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield handle
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+def _signature(path):
+    try:
+        stat = Path(path).stat()
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+
+def _iso_timestamp():
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+
+
+_MANIFESTS = {}
+_MANIFESTS_LOCK = threading.Lock()
+
+
+def asset_manifest(manifest_path):
+    key = Path(manifest_path).resolve()
+    with _MANIFESTS_LOCK:
+        manifest = _MANIFESTS.get(key)
+        if manifest is None:
+            manifest = _MANIFESTS[key] = AssetManifest(key)
+        return manifest
+
+
+def compact_all():
+    with _MANIFESTS_LOCK:
+        manifests = list(_MANIFESTS.values())
+    for manifest in manifests:
+        try:
+            manifest.compact()
+        except OSError:
+            continue
+
+
+# One-shot scripts and server shutdown leave a canonical manifest.json behind.
+atexit.register(compact_all)
@@ -11,6 +11,18 @@ DEFAULT_STATE_PATH = "data/_generated/runtime_state.json"
 DEFAULT_ASSET_MANIFEST = "assets/library/manifest.json"
 DEFAULT_ASSET_LIBRARY_ROOT = "assets/library/maps"
 DEFAULT_ASSET_GENERATED_ROOT = "../pony_generated_assets/asset_forge"
+ASSET_JOB_WORKERS = 4
+ASSET_JOB_RETENTION_SECONDS = 3600
+ASSET_MANIFEST_COMPACT_EVERY = 50
+ASSET_MANIFEST_COMPACT_SECONDS = 300
+# Journaled slug reservations from a process that died are ignored after this.
+ASSET_MANIFEST_RESERVATION_SECONDS = 3600
+MISSION_ATLAS_MAX_SIZE = 2048
+MISSION_ATLAS_PADDING = 2
+MISSION_ATLAS_FRAME_SCALE = 2
+DEFAULT_REFINE_CACHE_DIR = "data/_generated/refine-cache"
+REFINE_CACHE_MEMORY_BYTES = 64 * 1024 * 1024
+REFINE_CACHE_DISK_BYTES = 512 * 1024 * 1024
 DEFAULT_MISSION_PROGRESS_PATH = str(Path.home() / "Documents/Games/PonyParade/mission_progress.json")
 HOUSE_SHARE_CHANCE = 0.35
 HOUSE_GROUP_CHANCE = 0.2
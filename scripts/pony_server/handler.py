@@ -57,15 +57,39 @@ class PonyHandler(
         self._response_logged = False
         super().__init__(*args, directory=str(ROOT), **kwargs)
 
-    def send_json(self, status, payload):
+    def send_json(self, status, payload, headers=None):
         body = json.dumps(payload).encode("utf-8")
         self.send_response(status)
         self.send_header("Content-Type", "application/json")
         self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
         self.end_headers()
         self.wfile.write(body)
         self._finish_request(status, payload)
 
+    def send_ndjson_stream(self, status, records, headers=None):
+        # Chunked transfer needs an HTTP/1.1 status line; the connection is
+        # closed afterwards so the rest of the server can stay on HTTP/1.0.
+        self.protocol_version = "HTTP/1.1"
+        self.send_response(status)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.send_header("Connection", "close")
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.close_connection = True
+        count = 0
+        last_type = None
+        for record in records:
+            line = (json.dumps(record) + "\n").encode("utf-8")
+            self.wfile.write(f"{len(line):X}\r\n".encode("ascii") + line + b"\r\n")
+            count += 1
+            last_type = record.get("type") if isinstance(record, dict) else None
+        self.wfile.write(b"0\r\n\r\n")
+        self._finish_request(status, {"streamed_records": count, "last_type": last_type})
+
     def do_GET(self):
         path = self.path.split("?", 1)[0]
         if path.startswith("/api/"):
@@ -74,6 +98,8 @@ class PonyHandler(
             return self.send_json(HTTPStatus.OK, {"ok": True})
         if path == "/api/assets/manifest":
             return self._handle_asset_manifest()
+        if path == "/api/assets/jobs" or path.startswith("/api/assets/jobs/"):
+            return self._handle_asset_jobs()
         if path == "/api/adventures":
             return self._handle_list_adventures()
         if path == "/api/state":
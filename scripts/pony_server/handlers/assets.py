@@ -5,7 +5,8 @@ import traceback
 from http import HTTPStatus
 
 from ..config import ROOT
-from ..asset_generation import generate_asset
+from ..asset_jobs import ASSET_JOBS
+from ..asset_manifest import asset_manifest
 from ..io import load_json_body
 
 
@@ -23,32 +24,59 @@ class AssetHandlerMixin:
         started = time.time()
         print("[asset-generate] request received", file=sys.stderr)
         try:
-            asset = generate_asset(
+            job, deduplicated = ASSET_JOBS.submit(
                 payload,
                 manifest_path=self.asset_manifest_path,
                 env_file=self.env_file,
             )
-            elapsed_ms = int((time.time() - started) * 1000)
-            print(f"[asset-generate] ok duration_ms={elapsed_ms}", file=sys.stderr)
-            self._log_server_event("asset-generate", {"status": "ok", "duration_ms": elapsed_ms})
-            self.send_json(HTTPStatus.OK, {"ok": True, "asset": asset})
-        except ValueError as exc:
-            elapsed_ms = int((time.time() - started) * 1000)
-            print(f"[asset-generate] bad_request duration_ms={elapsed_ms} error={exc}", file=sys.stderr)
-            self._log_server_event("asset-generate", {"status": "bad_request", "duration_ms": elapsed_ms, "error": str(exc)})
-            self.send_json(HTTPStatus.BAD_REQUEST, {"error": str(exc)})
         except Exception as exc:
             print(f"[asset-generate] error: {exc}", file=sys.stderr)
             traceback.print_exc(file=sys.stderr)
-            elapsed_ms = int((time.time() - started) * 1000)
-            print(f"[asset-generate] duration_ms={elapsed_ms}", file=sys.stderr)
-            self._log_server_event("asset-generate", {"status": "error", "duration_ms": elapsed_ms, "error": str(exc)})
+            self._log_server_event("asset-generate", {"status": "error", "error": str(exc)})
+            self.send_json(HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(exc)})
+            return
+        print(f"[asset-generate] job={job['id']} deduplicated={deduplicated}", file=sys.stderr)
+        self._log_server_event("asset-generate", {"status": "queued", "job": job["id"], "deduplicated": deduplicated})
+        if isinstance(payload, dict) and payload.get("async"):
+            self.send_json(HTTPStatus.ACCEPTED, {"ok": True, "job": job, "deduplicated": deduplicated})
+            return
+
+        # Blocking callers still go through the job queue, so they share
+        # in-flight duplicates too.
+        job = ASSET_JOBS.wait(job["id"])
+        elapsed_ms = int((time.time() - started) * 1000)
+        if job["status"] == "done":
+            print(f"[asset-generate] ok duration_ms={elapsed_ms}", file=sys.stderr)
+            self._log_server_event("asset-generate", {"status": "ok", "duration_ms": elapsed_ms})
+            self.send_json(HTTPStatus.OK, {"ok": True, "asset": job["asset"]})
+        elif job["error_kind"] == "bad_request":
+            print(f"[asset-generate] bad_request duration_ms={elapsed_ms} error={job['error']}", file=sys.stderr)
+            self._log_server_event("asset-generate", {"status": "bad_request", "duration_ms": elapsed_ms, "error": job["error"]})
+            self.send_json(HTTPStatus.BAD_REQUEST, {"error": job["error"]})
+        else:
+            print(f"[asset-generate] error: {job['error']} duration_ms={elapsed_ms}", file=sys.stderr)
+            self._log_server_event("asset-generate", {"status": "error", "duration_ms": elapsed_ms, "error": job["error"]})
             self.send_json(
                 HTTPStatus.INTERNAL_SERVER_ERROR,
-                {"error": str(exc)},
+                {"error": job["error"]},
             )
         return
 
+    def _handle_asset_jobs(self):
+        parts = self.path.split("?", 1)[0].strip("/").split("/")
+        if parts == ["api", "assets", "jobs"]:
+            self.send_json(HTTPStatus.OK, {"jobs": ASSET_JOBS.list()})
+            return
+        job_id = parts[3] if len(parts) in (4, 5) else None
+        job = ASSET_JOBS.get(job_id) if job_id else None
+        if not job or (len(parts) == 5 and parts[4] != "events"):
+            self.send_json(HTTPStatus.NOT_FOUND, {"error": "Asset job not found."})
+            return
+        if len(parts) == 5:
+            self.send_ndjson_stream(HTTPStatus.OK, ASSET_JOBS.events(job_id))
+            return
+        self.send_json(HTTPStatus.OK, {"job": job})
+
     def _handle_asset_manifest(self):
         manifest_path = ROOT / self.asset_manifest_path
         if not manifest_path.exists():
@@ -58,7 +86,7 @@ class AssetHandlerMixin:
             )
             return
         try:
-            payload = json.loads(manifest_path.read_text(encoding="utf-8"))
+            payload = asset_manifest(manifest_path).snapshot()
         except (OSError, json.JSONDecodeError):
             self.send_json(
                 HTTPStatus.INTERNAL_SERVER_ERROR,
@@ -5,7 +5,17 @@ from http import HTTPStatus
 
 from ..config import ROOT
 from ..io import load_data, load_json_body, save_data
-from ..map_refine import refine_map
+from ..map_refine import (
+    MIN_BAND_ROWS,
+    NOISE_MODES,
+    iter_refine_rows,
+    pyramid_levels,
+    refine_map,
+    refine_pyramid,
+    resolve_workers,
+)
+from ..map_regions import RegionLabeler, build_decor_rules
+from ..refine_cache import REFINE_CACHE, refine_cache_key
 from ..utils import sanitize_value
 
 
@@ -74,32 +84,95 @@ class MapHandlerMixin:
         decor_style = sanitize_value(payload.get("decor_style"), fallback="default", max_len=80)
         seed = sanitize_value(payload.get("seed"), fallback="seed", max_len=120)
         notes = _normalize_notes(payload.get("notes"))
-
+        noise = payload.get("noise") or "counter"
+        if noise not in NOISE_MODES:
+            self.send_json(
+                HTTPStatus.BAD_REQUEST,
+                {"error": f"noise must be one of: {', '.join(NOISE_MODES)}."},
+            )
+            return
         try:
-            print(
-                f"[map-refine] base={base_resolution} target={target_resolution} "
-                f"tileset={tileset} decor={decor_style} notes={len(notes)}",
-                file=sys.stderr,
+            workers = resolve_workers(payload.get("workers", 1))
+        except (TypeError, ValueError):
+            self.send_json(
+                HTTPStatus.BAD_REQUEST,
+                {"error": "workers must be a positive integer or 'auto'."},
             )
-            refined = refine_map(
+            return
+        use_cache = payload.get("cache", True) is not False
+        mode = "pyramid" if payload.get("pyramid") else "direct"
+        region_masks = bool(payload.get("region_masks"))
+        cache_key = refine_cache_key(
+            rows, legend, base_resolution, target_resolution, seed, notes, noise, mode, region_masks
+        )
+        if payload.get("stream"):
+            meta = {
+                "type": "meta",
+                "base_resolution": list(base_resolution),
+                "target_resolution": list(target_resolution),
+                "tileset": tileset,
+                "decor_style": decor_style,
+                "seed": seed,
+                "noise": noise,
+                "mode": mode,
+            }
+            cached, cache_tier = REFINE_CACHE.get(cache_key) if use_cache else (None, None)
+            cache_status = f"hit-{cache_tier}" if cache_tier else ("miss" if use_cache else "bypass")
+            records = self._map_refine_records(
+                meta,
+                cached,
                 rows,
                 legend,
                 base_resolution,
                 target_resolution,
                 seed,
                 notes,
+                noise,
+                workers,
+                use_cache,
+                region_masks,
+                started,
             )
-            _normalize_refine_output(refined, legend, target_width, target_height)
-            _validate_refine_output(refined, target_width, target_height)
+            self.send_ndjson_stream(HTTPStatus.OK, records, headers={"X-Refine-Cache": cache_status})
+            return
+
+        try:
+            print(
+                f"[map-refine] base={base_resolution} target={target_resolution} "
+                f"tileset={tileset} decor={decor_style} notes={len(notes)} workers={workers} mode={mode}",
+                file=sys.stderr,
+            )
+            refined, cache_tier = REFINE_CACHE.get(cache_key) if use_cache else (None, None)
+            if refined is None and mode == "pyramid":
+                refined = _refine_pyramid_cached(
+                    rows, legend, base_resolution, target_resolution, seed, notes, noise, workers, use_cache, region_masks
+                )
+            elif refined is None:
+                refined = refine_map(
+                    rows,
+                    legend,
+                    base_resolution,
+                    target_resolution,
+                    seed,
+                    notes,
+                    noise=noise,
+                    workers=workers,
+                    region_masks=region_masks,
+                )
+                _normalize_refine_output(refined, legend, target_width, target_height)
+                _validate_refine_output(refined, target_width, target_height)
+                REFINE_CACHE.put(cache_key, refined)
+            cache_status = f"hit-{cache_tier}" if cache_tier else ("miss" if use_cache else "bypass")
             refined.setdefault("base_resolution", list(base_resolution))
             refined.setdefault("target_resolution", list(target_resolution))
             refined.setdefault("tileset", tileset)
             refined.setdefault("decor_style", decor_style)
             refined.setdefault("seed", seed)
+            refined.setdefault("noise", noise)
             elapsed_ms = int((time.time() - started) * 1000)
-            print(f"[map-refine] duration_ms={elapsed_ms}", file=sys.stderr)
-            self._log_server_event("map-refine", {"status": "ok", "duration_ms": elapsed_ms})
-            self.send_json(HTTPStatus.OK, refined)
+            print(f"[map-refine] duration_ms={elapsed_ms} cache={cache_status}", file=sys.stderr)
+            self._log_server_event("map-refine", {"status": "ok", "duration_ms": elapsed_ms, "cache": cache_status})
+            self.send_json(HTTPStatus.OK, refined, headers={"X-Refine-Cache": cache_status})
         except Exception as exc:
             print(f"[map-refine] error: {exc}", file=sys.stderr)
             traceback.print_exc(file=sys.stderr)
@@ -112,6 +185,72 @@ class MapHandlerMixin:
             )
         return
 
+    def _map_refine_records(
+        self,
+        meta,
+        refined,
+        rows,
+        legend,
+        base_resolution,
+        target_resolution,
+        seed,
+        notes,
+        noise,
+        workers,
+        use_cache,
+        region_masks,
+        started,
+    ):
+        target_width, target_height = target_resolution
+        labeler = None
+        yield meta
+        try:
+            if refined is None and meta["mode"] == "pyramid":
+                refined = _refine_pyramid_cached(
+                    rows, legend, base_resolution, target_resolution, seed, notes, noise, workers, use_cache, region_masks
+                )
+            if refined is not None:
+                terrain = refined["layers"]["terrain"]
+                bands = (
+                    (start, terrain[start : start + MIN_BAND_ROWS])
+                    for start in range(0, len(terrain), MIN_BAND_ROWS)
+                )
+            else:
+                # Direct streaming misses are not cached: holding the full grid
+                # would defeat the bounded-memory point of streaming. Regions
+                # are labeled incrementally as the bands go out.
+                labeler = RegionLabeler(legend, masks=region_masks)
+                bands = iter_refine_rows(
+                    rows, legend, base_resolution, target_resolution, seed, notes, noise=noise, workers=workers
+                )
+            next_row = 0
+            for start, band in bands:
+                _validate_stream_rows(band, start, next_row, target_width, target_height)
+                next_row += len(band)
+                if labeler:
+                    labeler.feed(band)
+                yield {"type": "rows", "y": start, "rows": band}
+            if next_row != target_height:
+                raise ValueError("Terrain layer shape does not match target resolution.")
+        except Exception as exc:
+            print(f"[map-refine] stream error: {exc}", file=sys.stderr)
+            traceback.print_exc(file=sys.stderr)
+            self._log_server_event("map-refine", {"status": "error", "stream": True, "error": str(exc)})
+            yield {"type": "error", "error": str(exc)}
+            return
+        elapsed_ms = int((time.time() - started) * 1000)
+        print(f"[map-refine] stream duration_ms={elapsed_ms} rows={next_row}", file=sys.stderr)
+        self._log_server_event("map-refine", {"status": "ok", "stream": True, "duration_ms": elapsed_ms})
+        regions = labeler.regions() if labeler else refined.get("regions", [])
+        yield {
+            "type": "end",
+            "rows": next_row,
+            "regions": regions,
+            "decor_rules": build_decor_rules(regions) if labeler else refined.get("decor_rules", []),
+            "pyramid_levels": (refined or {}).get("pyramid_levels"),
+            "duration_ms": elapsed_ms,
+        }
+
     def _handle_update_map_object(self):
         parts = self.path.strip("/").split("/")
         if len(parts) != 4 or parts[:3] != ["api", "map", "objects"]:
@@ -226,6 +365,56 @@ def _normalize_notes(notes_payload):
     return notes
 
 
+def _refine_pyramid_cached(
+    rows, legend, base_resolution, target_resolution, seed, notes, noise, workers, use_cache, region_masks
+):
+    levels = pyramid_levels(base_resolution, target_resolution)
+
+    def level_key(level):
+        return refine_cache_key(rows, legend, base_resolution, level, seed, notes, noise, "pyramid", region_masks)
+
+    # Resume from the finest cached level on the way to the target.
+    start = None
+    for level in reversed(levels[:-1] if use_cache else []):
+        cached, _ = REFINE_CACHE.get(level_key(level))
+        if cached is not None:
+            start = (level, cached["layers"]["terrain"])
+            break
+
+    def store_level(level, refined):
+        _normalize_refine_output(refined, legend, level[0], level[1])
+        _validate_refine_output(refined, level[0], level[1])
+        refined["pyramid_levels"] = [list(entry) for entry in levels if entry[0] <= level[0] and entry[1] <= level[1]]
+        REFINE_CACHE.put(level_key(level), refined)
+
+    start_label = f"{start[0][0]}x{start[0][1]}" if start else "base"
+    print(f"[map-refine] pyramid levels={len(levels)} start={start_label}", file=sys.stderr)
+    refined = refine_pyramid(
+        rows,
+        legend,
+        base_resolution,
+        target_resolution,
+        seed,
+        notes,
+        noise=noise,
+        workers=workers,
+        region_masks=region_masks,
+        start=start,
+        on_level=store_level,
+    )
+    if not levels:
+        store_level(tuple(target_resolution), refined)
+    return refined
+
+
+def _validate_stream_rows(band, start, expected_start, target_width, target_height):
+    if start != expected_start or start + len(band) > target_height:
+        raise ValueError("Terrain rows streamed out of order or past target height.")
+    for row in band:
+        if not isinstance(row, str) or len(row) != target_width:
+            raise ValueError("Terrain layer shape does not match target resolution.")
+
+
 def _normalize_refine_output(refined, legend, target_width, target_height):
     if not isinstance(refined, dict):
         return
@@ -15,6 +15,7 @@ from ..mission_generator import (
     save_mission_bundle,
     validate_mission,
 )
+from ..mission_tiles import TILE_ENCODINGS
 
 
 class MissionHandlerMixin:
@@ -58,12 +59,16 @@ class MissionHandlerMixin:
             return
         plan = payload.get("plan") if isinstance(payload, dict) else None
         seed = payload.get("seed") if isinstance(payload, dict) else None
+        tile_encoding = payload.get("tileEncoding") if isinstance(payload, dict) else None
         if not isinstance(plan, dict):
             self.send_json(HTTPStatus.BAD_REQUEST, {"error": "Plan payload is required."})
             return
+        if not _valid_tile_encoding(tile_encoding):
+            self.send_json(HTTPStatus.BAD_REQUEST, {"error": _TILE_ENCODING_ERROR})
+            return
         try:
             manifest = load_manifest(self.asset_manifest_path)
-            bundle = generate_mission(plan, seed, manifest)
+            bundle = generate_mission(plan, seed, manifest, tile_encoding=tile_encoding)
             errors = validate_mission(bundle)
             response_payload = {
                 "ok": not errors,
@@ -111,9 +116,13 @@ class MissionHandlerMixin:
         adventure_actions = payload.get("adventureActions") if isinstance(payload, dict) else None
         adventure_background = payload.get("adventureBackground") if isinstance(payload, dict) else None
         create_adventure = bool(payload.get("createAdventure")) if isinstance(payload, dict) else False
+        tile_encoding = payload.get("tileEncoding") if isinstance(payload, dict) else None
         if not isinstance(bundle, dict):
             self.send_json(HTTPStatus.BAD_REQUEST, {"error": "Bundle payload is required."})
             return
+        if not _valid_tile_encoding(tile_encoding):
+            self.send_json(HTTPStatus.BAD_REQUEST, {"error": _TILE_ENCODING_ERROR})
+            return
         try:
             result = save_mission_bundle(
                 bundle,
@@ -124,6 +133,7 @@ class MissionHandlerMixin:
                 adventure_actions=adventure_actions,
                 adventure_background=adventure_background,
                 create_adventure=create_adventure,
+                tile_encoding=tile_encoding,
             )
             self._log_mission_event("save-response", result)
             self.send_json(HTTPStatus.OK, result)
@@ -143,10 +153,19 @@ class MissionHandlerMixin:
             self.send_json(HTTPStatus.BAD_REQUEST, {"error": "Invalid JSON body."})
             return
         bundle = payload.get("bundle") if isinstance(payload, dict) else None
+        tile_encoding = payload.get("tileEncoding") if isinstance(payload, dict) else None
         if not isinstance(bundle, dict):
             self.send_json(HTTPStatus.BAD_REQUEST, {"error": "Bundle payload is required."})
             return
-        result = save_draft_bundle(bundle)
+        if not _valid_tile_encoding(tile_encoding):
+            self.send_json(HTTPStatus.BAD_REQUEST, {"error": _TILE_ENCODING_ERROR})
+            return
+        try:
+            result = save_draft_bundle(bundle, tile_encoding=tile_encoding)
+        except MissionValidationError as exc:
+            self._log_mission_event("draft-error", {"error": str(exc)})
+            self.send_json(HTTPStatus.BAD_REQUEST, {"error": str(exc)})
+            return
         self._log_mission_event("draft-response", result)
         self.send_json(HTTPStatus.OK, result)
         return
@@ -188,3 +207,10 @@ class MissionHandlerMixin:
                 }
             )
         self.send_json(HTTPStatus.OK, {"ok": True, "adventures": results})
+
+
+_TILE_ENCODING_ERROR = f"tileEncoding must be one of: {', '.join(TILE_ENCODINGS)}."
+
+
+def _valid_tile_encoding(value):
+    return value is None or value in TILE_ENCODINGS
@@ -1,4 +1,17 @@
 import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from .map_regions import build_decor_rules, label_regions
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; refine_map falls back to pure Python.
+    np = None
+
+NOISE_MODES = ("counter", "sha256")
+_MASK64 = (1 << 64) - 1
+MIN_BAND_ROWS = 64
 
 
 def refine_map(
@@ -8,17 +21,182 @@ def refine_map(
     target_resolution,
     seed,
     notes=None,
+    noise="counter",
+    vectorized=None,
+    workers=1,
+    regions=True,
+    region_masks=False,
+):
+    args = _band_args(intent_rows, legend, base_resolution, target_resolution, seed, noise, vectorized)
+    bands = _split_bands(target_resolution[1], workers)
+    if len(bands) > 1:
+        with ProcessPoolExecutor(max_workers=min(len(bands), workers)) as executor:
+            parts = executor.map(_refine_band, [args + (band,) for band in bands])
+            terrain_rows = [row for part in parts for row in part]
+    else:
+        terrain_rows = _refine_band(args + (None,))
+    return _refine_result(terrain_rows, legend if regions else None, region_masks)
+
+
+def iter_refine_rows(
+    intent_rows,
+    legend,
+    base_resolution,
+    target_resolution,
+    seed,
+    notes=None,
+    noise="counter",
+    vectorized=None,
+    workers=1,
+    band_rows=MIN_BAND_ROWS,
+):
+    # Yields (start_row, terrain_rows) band by band; the concatenation is
+    # byte-identical to refine_map's terrain layer.
+    args = _band_args(intent_rows, legend, base_resolution, target_resolution, seed, noise, vectorized)
+    target_height = target_resolution[1]
+    bands = [(start, min(target_height, start + band_rows)) for start in range(0, target_height, band_rows)]
+    if workers > 1 and len(bands) > 1:
+        with ProcessPoolExecutor(max_workers=min(len(bands), workers)) as executor:
+            for band, rows in zip(bands, executor.map(_refine_band, [args + (band,) for band in bands])):
+                yield band[0], rows
+        return
+    for band in bands:
+        yield band[0], _refine_band(args + (band,))
+
+
+def pyramid_levels(base_resolution, target_resolution):
+    # x2 steps per axis while the remaining scale is even, then one final step
+    # for whatever odd factor is left. Every level is a fixed function of base
+    # and resolution, so different targets share their common prefix.
+    width, height = base_resolution
+    scale_x = target_resolution[0] // width
+    scale_y = target_resolution[1] // height
+    levels = []
+    while scale_x % 2 == 0 or scale_y % 2 == 0:
+        step_x = 2 if scale_x % 2 == 0 else 1
+        step_y = 2 if scale_y % 2 == 0 else 1
+        width, height = width * step_x, height * step_y
+        scale_x, scale_y = scale_x // step_x, scale_y // step_y
+        levels.append((width, height))
+    if scale_x > 1 or scale_y > 1:
+        levels.append(tuple(target_resolution))
+    return levels
+
+
+def refine_pyramid(
+    intent_rows,
+    legend,
+    base_resolution,
+    target_resolution,
+    seed,
+    notes=None,
+    noise="counter",
+    vectorized=None,
+    workers=1,
+    regions=True,
+    region_masks=False,
+    start=None,
+    on_level=None,
 ):
+    # start=(resolution, terrain_rows) resumes from an already refined level.
+    resolution, rows = tuple(base_resolution), list(intent_rows)
+    if start:
+        resolution, rows = tuple(start[0]), list(start[1])
+    result = None
+    for level in pyramid_levels(base_resolution, target_resolution):
+        if level[0] <= resolution[0] and level[1] <= resolution[1]:
+            continue
+        result = refine_map(
+            rows,
+            legend,
+            resolution,
+            level,
+            f"{seed}:{level[0]}x{level[1]}",
+            notes,
+            noise=noise,
+            vectorized=vectorized,
+            workers=workers,
+            regions=regions,
+            region_masks=region_masks,
+        )
+        if on_level:
+            on_level(level, result)
+        resolution, rows = level, result["layers"]["terrain"]
+    return result or _refine_result(rows, legend if regions else None, region_masks)
+
+
+def _refine_result(terrain_rows, legend=None, region_masks=False):
+    region_index = label_regions(terrain_rows, legend, masks=region_masks) if legend is not None else []
+    return {
+        "layers": {
+            "terrain": terrain_rows,
+            "water": None,
+            "roads": None,
+            "elevation": None,
+        },
+        "regions": region_index,
+        "decor_rules": build_decor_rules(region_index),
+    }
+
+
+def resolve_workers(value):
+    cpu_count = os.cpu_count() or 1
+    if value in (None, "", 0, "auto"):
+        return cpu_count
+    workers = int(value)
+    if workers < 1:
+        raise ValueError("workers must be a positive integer or 'auto'.")
+    return min(workers, cpu_count)
+
+
+def _band_args(intent_rows, legend, base_resolution, target_resolution, seed, noise, vectorized):
+    if noise not in NOISE_MODES:
+        raise ValueError(f"Unsupported noise mode: {noise}.")
+    if vectorized is None:
+        vectorized = np is not None
+    if vectorized and np is None:
+        raise RuntimeError("numpy is required for vectorized refinement. Install with: pip install numpy")
+    return (list(intent_rows), dict(legend), tuple(base_resolution), tuple(target_resolution), seed, noise, vectorized)
+
+
+def _split_bands(target_height, workers):
+    # Bands are only worth a process when each has real work in it.
+    count = min(workers or 1, target_height // MIN_BAND_ROWS)
+    if count <= 1:
+        return [None]
+    step = -(-target_height // count)
+    return [(start, min(target_height, start + step)) for start in range(0, target_height, step)]
+
+
+def _refine_band(args):
+    intent_rows, legend, base_resolution, target_resolution, seed, noise, vectorized, band = args
+    refine = _refine_terrain_numpy if vectorized else _refine_terrain_python
+    return refine(intent_rows, legend, base_resolution, target_resolution, seed, noise, band)
+
+
+def _band_window(band, target_height, smooth_passes):
+    # Each smoothing pass reads one row above and below, so a band computes
+    # that many halo rows on each side and crops them after smoothing.
+    start, stop = band or (0, target_height)
+    window_start = max(0, start - smooth_passes)
+    window_stop = min(target_height, stop + smooth_passes)
+    return window_start, window_stop, start - window_start, stop - window_start
+
+
+def _refine_terrain_python(intent_rows, legend, base_resolution, target_resolution, seed, noise, band=None):
     base_width, base_height = base_resolution
     target_width, target_height = target_resolution
     scale_x = target_width // base_width
     scale_y = target_height // base_height
     base_grid = [list(row) for row in intent_rows]
     road_codes = _codes_with_hint(legend, "road_hint", {"path", "road"})
+    noise_fn = _noise if noise == "sha256" else _counter_noise_fn(seed)
 
     jitter_band = _resolve_jitter_band(scale_x, scale_y)
+    smooth_passes = 1 if max(scale_x, scale_y) >= 3 else 0
+    window_start, window_stop, keep_start, keep_stop = _band_window(band, target_height, smooth_passes)
     grid = []
-    for y in range(target_height):
+    for y in range(window_start, window_stop):
         row = []
         by = min(base_height - 1, y // scale_y)
         ly = y % scale_y
@@ -38,25 +216,15 @@ def refine_map(
                 base_code,
                 seed,
                 road_codes,
+                noise_fn,
             )
             row.append(code)
         grid.append(row)
 
-    smooth_passes = 1 if max(scale_x, scale_y) >= 3 else 0
     for _ in range(smooth_passes):
         grid = _smooth_grid(grid, road_codes)
 
-    terrain_rows = ["".join(row) for row in grid]
-    return {
-        "layers": {
-            "terrain": terrain_rows,
-            "water": None,
-            "roads": None,
-            "elevation": None,
-        },
-        "regions": [],
-        "decor_rules": [],
-    }
+    return ["".join(row) for row in grid[keep_start:keep_stop]]
 
 
 def _codes_with_hint(legend, hint_key, terrain_names):
@@ -92,6 +260,7 @@ def _jitter_cell(
     base_code,
     seed,
     road_codes,
+    noise_fn=None,
 ):
     if jitter_band <= 0:
         return base_code
@@ -123,7 +292,7 @@ def _jitter_cell(
 
     if len(weights) == 1:
         return base_code
-    return _weighted_choice(weights, seed, bx, by, lx, ly)
+    return _weighted_choice(weights, seed, bx, by, lx, ly, noise_fn)
 
 
 def _edge_weight(band, dist):
@@ -142,11 +311,11 @@ def _add_weight(weights, code, weight):
     weights.append((code, weight))
 
 
-def _weighted_choice(weights, seed, bx, by, lx, ly):
+def _weighted_choice(weights, seed, bx, by, lx, ly, noise_fn=None):
     total = sum(weight for _, weight in weights)
     if total <= 0:
         return weights[0][0]
-    pick = _noise(seed, bx, by, lx, ly) * total
+    pick = (noise_fn or _noise)(seed, bx, by, lx, ly) * total
     for code, weight in weights:
         pick -= weight
         if pick <= 0:
@@ -161,6 +330,32 @@ def _noise(seed, bx, by, lx, ly):
     return value / 18446744073709551616
 
 
+def _counter_key(seed):
+    digest = hashlib.sha256(str(seed).encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big")
+
+
+def _splitmix64(value):
+    value = (value + 0x9E3779B97F4A7C15) & _MASK64
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return value ^ (value >> 31)
+
+
+def _counter_noise_fn(seed):
+    # Counter-based noise: one SHA-256 per refinement for the key, then a cheap
+    # SplitMix64 chain over the cell coordinates. _counter_noise_grid matches it.
+    key = _counter_key(seed)
+
+    def noise_fn(_seed, bx, by, lx, ly):
+        value = key
+        for counter in (bx, by, lx, ly):
+            value = _splitmix64(value ^ counter)
+        return (value >> 11) / 9007199254740992
+
+    return noise_fn
+
+
 def _smooth_grid(grid, road_codes):
     height = len(grid)
     width = len(grid[0]) if height else 0
@@ -193,3 +388,143 @@ def _smooth_grid(grid, road_codes):
             row.append(majority[0] if majority[1] >= 6 else code)
         next_grid.append(row)
     return next_grid
+
+
+def _codes_to_array(rows):
+    return np.array(
+        [np.frombuffer(row.encode("utf-32-le"), dtype="<u4") for row in rows],
+        dtype=np.uint32,
+    ).reshape(len(rows), -1)
+
+
+def _array_to_rows(grid):
+    return [row.astype("<u4").tobytes().decode("utf-32-le") for row in grid]
+
+
+def _splitmix64_array(value):
+    value = value + np.uint64(0x9E3779B97F4A7C15)
+    value = (value ^ (value >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    value = (value ^ (value >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return value ^ (value >> np.uint64(31))
+
+
+def _counter_noise_grid(seed, bx, by, lx, ly):
+    value = np.full(bx.shape, _counter_key(seed), dtype=np.uint64)
+    for counter in (bx, by, lx, ly):
+        value = _splitmix64_array(value ^ counter.astype(np.uint64))
+    return (value >> np.uint64(11)).astype(np.float64) / 9007199254740992.0
+
+
+def _refine_terrain_numpy(intent_rows, legend, base_resolution, target_resolution, seed, noise, band=None):
+    base_width, base_height = base_resolution
+    target_width, target_height = target_resolution
+    scale_x = target_width // base_width
+    scale_y = target_height // base_height
+    base = _codes_to_array(intent_rows)
+    road = np.array(sorted(ord(code) for code in _codes_with_hint(legend, "road_hint", {"path", "road"})), dtype=np.uint32)
+
+    smooth_passes = 1 if max(scale_x, scale_y) >= 3 else 0
+    window_start, window_stop, keep_start, keep_stop = _band_window(band, target_height, smooth_passes)
+    xs = np.arange(target_width)
+    ys = np.arange(window_start, window_stop)
+    bx = np.minimum(base_width - 1, xs // scale_x)[None, :]
+    by = np.minimum(base_height - 1, ys // scale_y)[:, None]
+    lx = (xs % scale_x)[None, :]
+    ly = (ys % scale_y)[:, None]
+    base_code = base[by, bx]
+    grid = base_code
+
+    jitter_band = _resolve_jitter_band(scale_x, scale_y)
+    if jitter_band > 0:
+        grid = _jitter_grid_numpy(base, base_code, road, bx, by, lx, ly, scale_x, scale_y, jitter_band, seed, noise)
+
+    for _ in range(smooth_passes):
+        grid = _smooth_grid_numpy(grid, road)
+    return _array_to_rows(grid[keep_start:keep_stop])
+
+
+def _jitter_grid_numpy(base, base_code, road, bx, by, lx, ly, scale_x, scale_y, band, seed, noise):
+    # Mirrors _jitter_cell: edge rows/columns use their own code so the
+    # "neighbor != base" test drops them, exactly like the bounds checks.
+    north = np.vstack([base[:1], base[:-1]])[by, bx]
+    south = np.vstack([base[1:], base[-1:]])[by, bx]
+    west = np.hstack([base[:, :1], base[:, :-1]])[by, bx]
+    east = np.hstack([base[:, 1:], base[:, -1:]])[by, bx]
+    neighbors = (
+        (north, ly < band, (band - ly) / band),
+        (south, ly >= scale_y - band, (band - ((scale_y - 1) - ly)) / band),
+        (west, lx < band, (band - lx) / band),
+        (east, lx >= scale_x - band, (band - ((scale_x - 1) - lx)) / band),
+    )
+
+    shape = base_code.shape
+    codes = [base_code] + [np.zeros(shape, dtype=np.uint32) for _ in neighbors]
+    weights = [np.ones(shape)] + [np.zeros(shape) for _ in neighbors]
+    count = np.ones(shape, dtype=np.int8)
+    for code, in_band, edge_weight in neighbors:
+        active = in_band & (code != base_code) & ~np.isin(code, road)
+        edge_weight = np.broadcast_to(edge_weight, shape)
+        matched = np.zeros(shape, dtype=bool)
+        for slot in range(1, len(codes)):
+            hit = active & ~matched & (slot < count) & (codes[slot] == code)
+            weights[slot] = np.where(hit, weights[slot] + edge_weight, weights[slot])
+            matched |= hit
+        append = active & ~matched
+        for slot in range(1, len(codes)):
+            place = append & (count == slot)
+            codes[slot] = np.where(place, code, codes[slot])
+            weights[slot] = np.where(place, edge_weight, weights[slot])
+        count = count + append
+
+    jitter = (count > 1) & ~np.isin(base_code, road)
+    noise_grid = np.zeros(shape)
+    if noise == "sha256":
+        bx_full = np.broadcast_to(bx, shape)
+        by_full = np.broadcast_to(by, shape)
+        lx_full = np.broadcast_to(lx, shape)
+        ly_full = np.broadcast_to(ly, shape)
+        for y, x in zip(*np.nonzero(jitter)):
+            noise_grid[y, x] = _noise(
+                seed, int(bx_full[y, x]), int(by_full[y, x]), int(lx_full[y, x]), int(ly_full[y, x])
+            )
+    else:
+        noise_grid = _counter_noise_grid(seed, *np.broadcast_arrays(bx, by, lx, ly))
+
+    total = np.zeros(shape)
+    for weight in weights:
+        total = total + weight
+    pick = noise_grid * total
+    chosen = np.take_along_axis(np.stack(codes), (count - 1)[None].astype(np.intp), axis=0)[0]
+    done = np.zeros(shape, dtype=bool)
+    for slot, (code, weight) in enumerate(zip(codes, weights)):
+        pick = pick - weight
+        hit = (pick <= 0) & ~done & (slot < count)
+        chosen = np.where(hit, code, chosen)
+        done |= hit
+    return np.where(jitter, chosen, base_code)
+
+
+def _smooth_grid_numpy(grid, road):
+    height, width = grid.shape
+    sentinel = np.uint32(0xFFFFFFFF)
+    padded = np.full((height + 2, width + 2), sentinel, dtype=np.uint32)
+    padded[1:-1, 1:-1] = grid
+    shifts = [
+        padded[1 + dy : 1 + dy + height, 1 + dx : 1 + dx + width]
+        for dy in (-1, 0, 1)
+        for dx in (-1, 0, 1)
+        if dx or dy
+    ]
+    best_code = grid.copy()
+    best_count = np.zeros(grid.shape, dtype=np.int8)
+    # Ascending code order + strict ">" keeps the smallest code on ties,
+    # matching the (-count, code) sort in _smooth_grid.
+    for code in np.unique(grid):
+        counts = np.zeros(grid.shape, dtype=np.int8)
+        for shifted in shifts:
+            counts += shifted == code
+        better = counts > best_count
+        best_code = np.where(better, code, best_code)
+        best_count = np.where(better, counts, best_count)
+    keep = np.isin(grid, road) | np.isin(best_code, road) | (best_count < 6)
+    return np.where(keep, grid, best_code)
@@ -0,0 +1,299 @@
+import re
+from array import array
+
+MIN_REGION_AREA = 4
+MIN_DECOR_REGION_AREA = 16
+DECOR_TEMPLATES = {
+    "forest": {"type": "tree_cluster", "density": 0.05, "spacing": "poisson", "avoid": ["roads", "water"]},
+    "mountain": {"type": "ruins", "density": 0.005, "spacing": "sparse", "avoid": ["roads", "water"]},
+    "village": {"type": "camp", "density": 0.005, "spacing": "sparse", "avoid": ["roads", "water"]},
+}
+
+_RUN_PATTERN = re.compile(r"(.)\1*", re.S)
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; rows are then labeled in pure Python.
+    np = None
+
+# Stat columns per label; a root label's column values hold the totals for
+# its whole region.
+_AREA, _MIN_X, _MIN_Y, _MAX_X, _MAX_Y, _SUM_X, _SUM_Y = range(7)
+_STAT_COLUMNS = 7
+
+
+class RegionLabeler:
+    # Connected-region labeling over horizontal runs: each row is split into
+    # same-code runs, and runs that overlap a run of the same code in the row
+    # above take its label. Only runs with no such neighbour open a new label,
+    # and labels that meet are merged in an array union-find, so state grows
+    # with the number of labels (roughly the number of regions), not runs.
+    # Only the previous row's runs are kept, so rows can be fed band by band
+    # while a grid is streamed. With numpy each row is split, matched and
+    # accumulated with array ops; otherwise the same steps run in Python.
+    def __init__(self, legend, masks=False, vectorized=None):
+        self.names = _terrain_names(legend)
+        self.vectorized = np is not None if vectorized is None else bool(vectorized and np is not None)
+        self.codes = []
+        self.runs = [] if masks else None
+        self._count = 0
+        if self.vectorized:
+            self.parent = np.zeros(0, dtype=np.int64)
+            self.stats = np.zeros((_STAT_COLUMNS, 0), dtype=np.int64)
+        else:
+            self.parent = array("q")
+            self.stats = [array("q") for _ in range(_STAT_COLUMNS)]
+        self._previous = None
+        self._y = 0
+
+    def feed(self, rows):
+        feed_row = self._feed_row_vectorized if self.vectorized else self._feed_row
+        for row in rows:
+            feed_row(row)
+
+    def regions(self, min_area=MIN_REGION_AREA):
+        stats = self.stats
+        if self.vectorized:
+            count = self._count
+            is_root = self.parent[:count] == np.arange(count)
+            roots = np.flatnonzero(is_root & (stats[_AREA, :count] >= min_area)).tolist()
+        else:
+            roots = [
+                label
+                for label in range(self._count)
+                if self.parent[label] == label and stats[_AREA][label] >= min_area
+            ]
+        masks = {}
+        if self.runs is not None:
+            for labels, y, starts, lengths in self.runs:
+                for label, x, length in zip(labels, starts, lengths):
+                    masks.setdefault(self._find(label), []).append([y, int(x), int(length)])
+
+        if self.vectorized:
+            columns = zip(roots, *stats[:, roots].tolist())
+        else:
+            columns = ([root, *(stats[column][root] for column in range(_STAT_COLUMNS))] for root in roots)
+
+        counters = {}
+        regions = []
+        for root, area, min_x, min_y, max_x, max_y, sum_x, sum_y in columns:
+            code = self.codes[root]
+            name = self.names.get(code, code)
+            counters[name] = counters.get(name, 0) + 1
+            region = {
+                "id": f"{name}-{counters[name]}",
+                "code": code,
+                "terrain": name,
+                "bounds": {"x": min_x, "y": min_y, "w": max_x - min_x + 1, "h": max_y - min_y + 1},
+                "area": area,
+                "centroid": [round(sum_x / area, 2), round(sum_y / area, 2)],
+            }
+            if self.runs is not None:
+                region["mask"] = masks.get(root, [])
+            regions.append(region)
+        return regions
+
+    def _feed_row(self, row):
+        y = self._y
+        previous = self._previous or []
+        stats = self.stats
+        current = []
+        i = 0
+        for match in _RUN_PATTERN.finditer(row):
+            x0, x1 = match.span()
+            code = match.group(1)
+            while i < len(previous) and previous[i][1] <= x0:
+                i += 1
+            label = -1
+            k = i
+            while k < len(previous) and previous[k][0] < x1:
+                if previous[k][2] == code:
+                    label = self._find(previous[k][3]) if label < 0 else self._union(label, previous[k][3])
+                k += 1
+            if label < 0:
+                label = self._new_labels([code], y)
+            length = x1 - x0
+            stats[_AREA][label] += length
+            stats[_MIN_X][label] = min(stats[_MIN_X][label], x0)
+            stats[_MAX_X][label] = max(stats[_MAX_X][label], x1 - 1)
+            stats[_MAX_Y][label] = y
+            stats[_SUM_X][label] += length * x0 + length * (length - 1) // 2
+            stats[_SUM_Y][label] += length * y
+            current.append([x0, x1, code, label])
+
+        # A later run in this row may have merged labels handed out earlier.
+        for run in current:
+            run[3] = self._find(run[3])
+        if self.runs is not None:
+            self.runs.append(([run[3] for run in current], y, [run[0] for run in current], [run[1] - run[0] for run in current]))
+        self._previous = current
+        self._y += 1
+
+    def _feed_row_vectorized(self, row):
+        y = self._y
+        codes = np.frombuffer(row.encode("utf-32-le"), dtype=np.uint32)
+        width = len(codes)
+        if width:
+            starts = np.flatnonzero(np.concatenate(([True], codes[1:] != codes[:-1])))
+            ends = np.append(starts[1:], width)
+        else:
+            starts = ends = np.zeros(0, dtype=np.int64)
+        run_codes = codes[starts]
+        lengths = ends - starts
+        labels = np.full(len(starts), -1, dtype=np.int64)
+
+        if self._previous is not None and len(starts):
+            prev_starts, prev_ends, prev_codes, prev_labels = self._previous
+            # Previous runs j overlapping current run i: prev_end > start and prev_start < end.
+            lo = np.searchsorted(prev_ends, starts, side="right")
+            hi = np.searchsorted(prev_starts, ends, side="left")
+            counts = np.maximum(hi - lo, 0)
+            cur_idx = np.repeat(np.arange(len(starts)), counts)
+            prev_idx = np.repeat(lo - (np.cumsum(counts) - counts), counts) + np.arange(len(cur_idx))
+            same = prev_codes[prev_idx] == run_codes[cur_idx]
+            cur_idx, pair_labels = cur_idx[same], prev_labels[prev_idx[same]]
+            if len(cur_idx):
+                first = np.flatnonzero(np.concatenate(([True], cur_idx[1:] != cur_idx[:-1])))
+                labels[cur_idx[first]] = pair_labels[first]
+                # A run touching two regions above joins them.
+                keep = np.repeat(pair_labels[first], np.diff(np.append(first, len(cur_idx))))
+                joins = keep != pair_labels
+                if joins.any():
+                    dropped = [
+                        label
+                        for a, b in zip(keep[joins].tolist(), pair_labels[joins].tolist())
+                        if (label := self._link(a, b)) is not None
+                    ]
+                    matched = labels >= 0
+                    labels[matched] = self._roots(labels[matched])
+                    self._fold(np.array(dropped, dtype=np.int64))
+
+        fresh = labels < 0
+        if fresh.any():
+            first_label = self._new_labels([chr(code) for code in run_codes[fresh].tolist()], y)
+            labels[fresh] = np.arange(first_label, self._count)
+
+        stats = self.stats
+        np.add.at(stats[_AREA], labels, lengths)
+        np.minimum.at(stats[_MIN_X], labels, starts)
+        np.maximum.at(stats[_MAX_X], labels, ends - 1)
+        stats[_MAX_Y][labels] = y
+        np.add.at(stats[_SUM_X], labels, lengths * starts + lengths * (lengths - 1) // 2)
+        np.add.at(stats[_SUM_Y], labels, lengths * y)
+        if self.runs is not None:
+            self.runs.append((labels.tolist(), y, starts.tolist(), lengths.tolist()))
+        self._previous = (starts, ends, run_codes, labels)
+        self._y += 1
+
+    def _new_labels(self, codes, y):
+        # Opens len(codes) labels starting on row y and returns the first id.
+        first = self._count
+        count = len(codes)
+        self._count += count
+        self.codes.extend(codes)
+        if self.vectorized:
+            if self._count > len(self.parent):
+                capacity = max(self._count, 2 * len(self.parent), 64)
+                parent = np.arange(capacity, dtype=np.int64)
+                parent[: len(self.parent)] = self.parent
+                stats = np.zeros((_STAT_COLUMNS, capacity), dtype=np.int64)
+                stats[:, : self.stats.shape[1]] = self.stats
+                self.parent, self.stats = parent, stats
+            block = slice(first, self._count)
+            self.stats[:, block] = 0
+            self.stats[_MIN_X, block] = np.iinfo(np.int64).max
+            self.stats[_MIN_Y, block] = y
+            return first
+        for label in range(first, self._count):
+            self.parent.append(label)
+        for column, value in enumerate((0, 1 << 62, y, -1, y, 0, 0)):
+            self.stats[column].extend([value] * count)
+        return first
+
+    def _roots(self, labels):
+        # Vectorized find: follow parents until every label is a root.
+        while True:
+            parents = self.parent[labels]
+            if (parents == labels).all():
+                return labels
+            labels = parents
+
+    def _find(self, label):
+        parent = self.parent
+        while parent[label] != label:
+            parent[label] = parent[parent[label]]
+            label = parent[label]
+        return int(label)
+
+    def _link(self, a, b):
+        # Joins two labels and returns the one that stopped being a root, if any.
+        a = self._find(a)
+        b = self._find(b)
+        if a == b:
+            return None
+        # The earlier label stays root so region order follows scan order.
+        if b < a:
+            a, b = b, a
+        self.parent[b] = a
+        return b
+
+    def _fold(self, dropped):
+        # Adds the stats of labels that were just linked under another root
+        # into that root; each label is folded once, when it stops being a root.
+        if not len(dropped):
+            return
+        stats = self.stats
+        roots = self._roots(dropped)
+        for column in (_AREA, _SUM_X, _SUM_Y):
+            np.add.at(stats[column], roots, stats[column][dropped])
+        for column in (_MIN_X, _MIN_Y):
+            np.minimum.at(stats[column], roots, stats[column][dropped])
+        for column in (_MAX_X, _MAX_Y):
+            np.maximum.at(stats[column], roots, stats[column][dropped])
+
+    def _union(self, a, b):
+        # Python path: merges the stats right away and returns the root.
+        b = self._link(a, b)
+        if b is None:
+            return self._find(a)
+        a = self.parent[b]
+        stats = self.stats
+        stats[_AREA][a] += stats[_AREA][b]
+        stats[_MIN_X][a] = min(stats[_MIN_X][a], stats[_MIN_X][b])
+        stats[_MIN_Y][a] = min(stats[_MIN_Y][a], stats[_MIN_Y][b])
+        stats[_MAX_X][a] = max(stats[_MAX_X][a], stats[_MAX_X][b])
+        stats[_MAX_Y][a] = max(stats[_MAX_Y][a], stats[_MAX_Y][b])
+        stats[_SUM_X][a] += stats[_SUM_X][b]
+        stats[_SUM_Y][a] += stats[_SUM_Y][b]
+        return a
+
+
+def label_regions(terrain_rows, legend, masks=False, min_area=MIN_REGION_AREA, vectorized=None):
+    labeler = RegionLabeler(legend, masks=masks, vectorized=vectorized)
+    labeler.feed(terrain_rows)
+    return labeler.regions(min_area)
+
+
+def build_decor_rules(regions):
+    grouped = {}
+    for region in regions:
+        if region["area"] < MIN_DECOR_REGION_AREA or region["terrain"] not in DECOR_TEMPLATES:
+            continue
+        grouped.setdefault(region["terrain"], []).append(region["id"])
+    rules = []
+    for terrain, region_ids in grouped.items():
+        rule = dict(DECOR_TEMPLATES[terrain])
+        rule["avoid"] = list(rule["avoid"])
+        rule["regions"] = region_ids
+        rules.append(rule)
+    return rules
+
+
+def _terrain_names(legend):
+    names = {}
+    for code, meta in (legend or {}).items():
+        if not isinstance(code, str) or len(code) != 1:
+            continue
+        terrain = str(meta.get("terrain", "")).strip().lower() if isinstance(meta, dict) else ""
+        names[code] = terrain or code
+    return names
@@ -0,0 +1,145 @@
+from pathlib import Path
+
+try:
+    from PIL import Image
+except ImportError:  # pragma: no cover - optional dependency
+    Image = None
+
+from .config import MISSION_ATLAS_FRAME_SCALE, MISSION_ATLAS_MAX_SIZE, MISSION_ATLAS_PADDING, ROOT
+from .io import save_data
+
+ATLAS_INDEX_NAME = "atlas.json"
+ATLAS_DIR_NAME = "atlas"
+ATLAS_VERSION = 1
+ATLAS_WEBP_QUALITY = 90
+
+
+def resolve_asset_file(asset, asset_root):
+    # Mirrors resolveAssetPath() in assets/js/stellacorn/adventure/runtime.js:
+    # /assets/... and other absolute paths are site-root relative, while
+    # /adventures/... and relative paths sit under the mission's assetRoot.
+    if not isinstance(asset, str) or not asset or asset.startswith(("data:", "http")):
+        return None
+    if asset.startswith("/adventures/"):
+        path = Path(asset_root) / asset[len("/adventures/") :]
+    elif asset.startswith("/"):
+        path = ROOT / asset.lstrip("/")
+    else:
+        path = Path(asset_root) / asset
+    return path if path.is_file() else None
+
+
+def _mission_assets(tiles, objects):
+    assets = []
+    seen = set()
+    for entry in [*(tiles or []), *(objects or [])]:
+        asset = entry.get("asset") if isinstance(entry, dict) else None
+        if asset and asset not in seen:
+            seen.add(asset)
+            assets.append(asset)
+    return assets
+
+
+def _load_frame(path, max_frame):
+    with Image.open(path) as image:
+        image = image.convert("RGBA")
+    if max(image.size) > max_frame:
+        image.thumbnail((max_frame, max_frame), getattr(Image, "Resampling", Image).LANCZOS)
+    return image
+
+
+def pack_shelves(sizes, max_size, padding):
+    # Shelf packing, tallest first. Returns ([(page, x, y)] in input order,
+    # [(width, height)] per page) with every frame surrounded by `padding`.
+    placements = [None] * len(sizes)
+    pages = []
+    page = -1
+    x = y = shelf_height = 0
+    order = sorted(range(len(sizes)), key=lambda index: (-sizes[index][1], -sizes[index][0], index))
+    for index in order:
+        width, height = sizes[index]
+        cell_w, cell_h = width + padding * 2, height + padding * 2
+        if cell_w > max_size or cell_h > max_size:
+            raise ValueError(f"Frame {width}x{height} does not fit a {max_size}px atlas.")
+        if page >= 0 and x + cell_w > max_size:
+            x, y, shelf_height = 0, y + shelf_height, 0
+        if page < 0 or y + cell_h > max_size:
+            pages.append([0, 0])
+            page += 1
+            x = y = shelf_height = 0
+        placements[index] = (page, x + padding, y + padding)
+        x += cell_w
+        shelf_height = max(shelf_height, cell_h)
+        pages[page][0] = max(pages[page][0], x)
+        pages[page][1] = max(pages[page][1], y + shelf_height)
+    return placements, [tuple(size) for size in pages]
+
+
+def _paste_extruded(page, frame, x, y, padding):
+    # Repeats the frame's edge pixels into the padding so filtered sampling at
+    # the frame border never picks up a neighbour.
+    page.paste(frame, (x, y))
+    width, height = frame.size
+    for offset in range(1, padding + 1):
+        page.paste(frame.crop((0, 0, width, 1)), (x, y - offset))
+        page.paste(frame.crop((0, height - 1, width, height)), (x, y + height - 1 + offset))
+    column_top, column_bottom = y - padding, y + height + padding
+    left = page.crop((x, column_top, x + 1, column_bottom))
+    right = page.crop((x + width - 1, column_top, x + width, column_bottom))
+    for offset in range(1, padding + 1):
+        page.paste(left, (x - offset, column_top))
+        page.paste(right, (x + width - 1 + offset, column_top))
+
+
+def build_mission_atlas(
+    tiles,
+    objects,
+    out_dir,
+    *,
+    asset_root,
+    tile_size=64,
+    max_size=MISSION_ATLAS_MAX_SIZE,
+    padding=MISSION_ATLAS_PADDING,
+):
+    # Packs every tile/object image a mission references into one or a few
+    # WebP pages under <out_dir>/atlas/ and writes <out_dir>/atlas.json, which
+    # maps each definition's `asset` string to its page and rectangle. Frames
+    # are capped at MISSION_ATLAS_FRAME_SCALE x tileSize (the runtime never
+    # draws them larger). Returns the index, or None when Pillow is missing or
+    # no referenced asset exists on disk.
+    if Image is None:
+        return None
+    out_dir = Path(out_dir)
+    max_frame = max(1, int(tile_size * MISSION_ATLAS_FRAME_SCALE))
+    frames = []
+    for asset in _mission_assets(tiles, objects):
+        path = resolve_asset_file(asset, asset_root)
+        if path is None:
+            continue
+        try:
+            frames.append((asset, _load_frame(path, max_frame)))
+        except OSError:
+            continue
+    if not frames:
+        return None
+
+    placements, page_sizes = pack_shelves([frame.size for _, frame in frames], max_size, padding)
+    pages = [Image.new("RGBA", size, (0, 0, 0, 0)) for size in page_sizes]
+    index = {"version": ATLAS_VERSION, "tileSize": tile_size, "images": [], "frames": {}}
+    for (asset, frame), (page, x, y) in zip(frames, placements):
+        _paste_extruded(pages[page], frame, x, y, padding)
+        index["frames"][asset] = {"image": page, "x": x, "y": y, "w": frame.width, "h": frame.height}
+
+    atlas_dir = out_dir / ATLAS_DIR_NAME
+    atlas_dir.mkdir(parents=True, exist_ok=True)
+    written = set()
+    for number, image in enumerate(pages):
+        name = f"atlas-{number}.webp"
+        image.save(atlas_dir / name, format="WEBP", quality=ATLAS_WEBP_QUALITY, method=6)
+        written.add(name)
+        index["images"].append({"path": f"{ATLAS_DIR_NAME}/{name}", "w": image.width, "h": image.height})
+    for stale in atlas_dir.glob("atlas-*.webp"):
+        if stale.name not in written:
+            stale.unlink(missing_ok=True)
+    save_data(out_dir / ATLAS_INDEX_NAME, index)
+    return index
@@ -0,0 +1,363 @@
+import random
+from collections import deque
+
+from .mission_map import _make_intent_grid, _seed_from_value
+
+FLAT_MAP_LIMIT = 48
+CHUNK_SIZE = 32
+MAX_CHUNKED_MAP_SIZE = 1024
+SAMPLES_PER_CHUNK = 16
+
+
+def requested_map_size(plan):
+    layout = plan.get("layout") or {}
+    size = layout.get("size") or {}
+    width = size.get("w") or 18
+    height = size.get("h") or 14
+    return int(width), int(height)
+
+
+def wants_chunked_map(plan):
+    width, height = requested_map_size(plan)
+    return width > FLAT_MAP_LIMIT or height > FLAT_MAP_LIMIT
+
+
+def is_chunked_map(map_data):
+    return isinstance(map_data, dict) and isinstance(map_data.get("chunks"), list)
+
+
+def _chunk_grid(width, height, chunk_size):
+    cols = (width + chunk_size - 1) // chunk_size
+    rows = (height + chunk_size - 1) // chunk_size
+    return cols, rows
+
+
+def _chunk_bounds(cx, cy, width, height, chunk_size):
+    x0 = cx * chunk_size
+    y0 = cy * chunk_size
+    return x0, y0, min(chunk_size, width - x0), min(chunk_size, height - y0)
+
+
+def _portal_offset(seed_value, axis, cx, cy, span):
+    # Both chunks sharing an edge derive the same offset, so their roads meet.
+    if span < 3:
+        return 0
+    rng = random.Random(f"{seed_value}:portal:{axis}:{cx}:{cy}")
+    return rng.randint(1, span - 2)
+
+
+def _carve_road(grid, start, goal):
+    # Horizontal then vertical so the road stays 4-connected.
+    x, y = start
+    gx, gy = goal
+    grid[y][x] = "road"
+    while x != gx:
+        x += 1 if gx > x else -1
+        grid[y][x] = "road"
+    while y != gy:
+        y += 1 if gy > y else -1
+        grid[y][x] = "road"
+
+
+def generate_chunk(seed, cx, cy, width, height, biome, tiles, chunk_size=CHUNK_SIZE):
+    seed_value = _seed_from_value(seed)
+    cols, rows = _chunk_grid(width, height, chunk_size)
+    x0, y0, w, h = _chunk_bounds(cx, cy, width, height, chunk_size)
+    rng = random.Random(f"{seed_value}:chunk:{cx}:{cy}")
+    grid = _make_intent_grid(w, h, rng, biome)
+
+    hub = (w // 2, h // 2)
+    if cx > 0:
+        _carve_road(grid, hub, (0, _portal_offset(seed_value, "v", cx - 1, cy, h)))
+    if cx < cols - 1:
+        _carve_road(grid, hub, (w - 1, _portal_offset(seed_value, "v", cx, cy, h)))
+    if cy > 0:
+        _carve_road(grid, hub, (_portal_offset(seed_value, "h", cx, cy - 1, w), 0))
+    if cy < rows - 1:
+        _carve_road(grid, hub, (_portal_offset(seed_value, "h", cx, cy, w), h - 1))
+
+    tile_lookup = {tile["name"]: tile for tile in tiles}
+    fallback = tiles[0] if tiles else {"id": 0}
+    tiles_out = []
+    for row in grid:
+        for intent in row:
+            tiles_out.append((tile_lookup.get(intent) or fallback)["id"])
+    return {"cx": cx, "cy": cy, "x": x0, "y": y0, "w": w, "h": h, "tiles": tiles_out}
+
+
+def generate_chunked_map(plan, seed, tiles, chunk_size=CHUNK_SIZE):
+    layout = plan.get("layout") or {}
+    width, height = requested_map_size(plan)
+    width = max(8, min(MAX_CHUNKED_MAP_SIZE, width))
+    height = max(8, min(MAX_CHUNKED_MAP_SIZE, height))
+    biome = (layout.get("biome") or "forest").lower()
+    cols, rows = _chunk_grid(width, height, chunk_size)
+
+    chunks = [
+        generate_chunk(seed, cx, cy, width, height, biome, tiles, chunk_size)
+        for cy in range(rows)
+        for cx in range(cols)
+    ]
+
+    first = chunks[0]
+    spawn = (first["w"] // 2, first["h"] // 2)
+    walkable_ids = _walkable_ids(tiles)
+    if first["tiles"][spawn[1] * first["w"] + spawn[0]] not in walkable_ids:
+        for index, tile_id in enumerate(first["tiles"]):
+            if tile_id in walkable_ids:
+                spawn = (index % first["w"], index // first["w"])
+                break
+
+    return {
+        "width": width,
+        "height": height,
+        "chunkSize": chunk_size,
+        "chunks": chunks,
+        "spawn": {"tx": spawn[0], "ty": spawn[1]},
+        "objects": [],
+    }
+
+
+def _walkable_ids(tile_defs):
+    if isinstance(tile_defs, dict):
+        tile_defs = tile_defs.values()
+    return {tile["id"] for tile in tile_defs if isinstance(tile, dict) and tile.get("walkable")}
+
+
+def _ordered_chunks(map_data):
+    chunks = [chunk for chunk in map_data.get("chunks") or [] if isinstance(chunk, dict)]
+    return sorted(chunks, key=lambda chunk: (chunk.get("cy", 0), chunk.get("cx", 0)))
+
+
+class ChunkedTiles:
+    # Read-only flat view so row-major tile lookups work on chunked maps.
+    def __init__(self, map_data):
+        self.width = map_data.get("width") or 0
+        self.height = map_data.get("height") or 0
+        self.chunk_size = map_data.get("chunkSize") or CHUNK_SIZE
+        self._chunks = {
+            (chunk.get("cx"), chunk.get("cy")): chunk
+            for chunk in map_data.get("chunks") or []
+            if isinstance(chunk, dict)
+        }
+
+    def __len__(self):
+        return self.width * self.height
+
+    def __getitem__(self, index):
+        y, x = divmod(index, self.width)
+        chunk = self._chunks.get((x // self.chunk_size, y // self.chunk_size))
+        if not chunk:
+            return None
+        local = (y - chunk["y"]) * chunk["w"] + (x - chunk["x"])
+        tiles = chunk.get("tiles") or []
+        return tiles[local] if 0 <= local < len(tiles) else None
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+
+def _label_chunk(chunk, walkable_ids):
+    w, h = chunk["w"], chunk["h"]
+    tiles = chunk.get("tiles") or []
+    labels = [-1] * (w * h)
+    next_label = 0
+    for start in range(w * h):
+        if labels[start] >= 0 or start >= len(tiles) or tiles[start] not in walkable_ids:
+            continue
+        labels[start] = next_label
+        queue = deque([start])
+        while queue:
+            index = queue.popleft()
+            ly, lx = divmod(index, w)
+            for nx, ny in ((lx + 1, ly), (lx - 1, ly), (lx, ly + 1), (lx, ly - 1)):
+                if nx < 0 or ny < 0 or nx >= w or ny >= h:
+                    continue
+                neighbor = ny * w + nx
+                if labels[neighbor] >= 0 or neighbor >= len(tiles) or tiles[neighbor] not in walkable_ids:
+                    continue
+                labels[neighbor] = next_label
+                queue.append(neighbor)
+        next_label += 1
+    return labels
+
+
+def scan_chunked_reachability(map_data, tile_defs, points=(), rects=(), sample_per_chunk=0):
+    # Label components per chunk and stitch them across chunk edges; only one row of
+    # chunk edges is kept, so memory is bounded by chunk size and map width.
+    walkable_ids = _walkable_ids(tile_defs)
+    parent = {}
+
+    def find(key):
+        parent.setdefault(key, key)
+        while parent[key] != key:
+            parent[key] = parent[parent[key]]
+            key = parent[key]
+        return key
+
+    def union(a, b):
+        root_a, root_b = find(a), find(b)
+        if root_a != root_b:
+            parent[root_b] = root_a
+
+    spawn = map_data.get("spawn") or {}
+    spawn_pos = (spawn.get("tx"), spawn.get("ty"))
+    wanted = set(points)
+    wanted.add(spawn_pos)
+    point_keys = {}
+    rect_keys = [set() for _ in rects]
+    samples = []
+    south_edges = {}
+    east_edge = None
+    prev = None
+
+    for chunk in _ordered_chunks(map_data):
+        cx, cy = chunk["cx"], chunk["cy"]
+        x0, y0, w, h = chunk["x"], chunk["y"], chunk["w"], chunk["h"]
+        labels = _label_chunk(chunk, walkable_ids)
+
+        def key_at(lx, ly):
+            label = labels[ly * w + lx]
+            return (cx, cy, label) if label >= 0 else None
+
+        if prev == (cx - 1, cy) and east_edge and len(east_edge) == h:
+            for ly in range(h):
+                here = key_at(0, ly)
+                if east_edge[ly] and here:
+                    union(east_edge[ly], here)
+        north = south_edges.get(cx)
+        if north and north[0] == cy - 1 and len(north[1]) == w:
+            for lx in range(w):
+                here = key_at(lx, 0)
+                if north[1][lx] and here:
+                    union(north[1][lx], here)
+        east_edge = [key_at(w - 1, ly) for ly in range(h)]
+        south_edges[cx] = (cy, [key_at(lx, h - 1) for lx in range(w)])
+        prev = (cx, cy)
+
+        for px, py in wanted:
+            if isinstance(px, int) and isinstance(py, int) and x0 <= px < x0 + w and y0 <= py < y0 + h:
+                key = key_at(px - x0, py - y0)
+                if key:
+                    point_keys[(px, py)] = key
+        for idx, (rx, ry, rw, rh) in enumerate(rects):
+            for y in range(max(ry, y0), min(ry + rh + 1, y0 + h)):
+                for x in range(max(rx, x0), min(rx + rw + 1, x0 + w)):
+                    key = key_at(x - x0, y - y0)
+                    if key:
+                        rect_keys[idx].add(key)
+        if sample_per_chunk:
+            candidates = [index for index, label in enumerate(labels) if label >= 0]
+            rng = random.Random(f"sample:{cx}:{cy}")
+            for index in rng.sample(candidates, min(sample_per_chunk, len(candidates))):
+                ly, lx = divmod(index, w)
+                samples.append((x0 + lx, y0 + ly, (cx, cy, labels[index])))
+
+    spawn_key = point_keys.get(spawn_pos)
+    if spawn_key is None:
+        return {
+            "spawn_walkable": False,
+            "points": set(point_keys),
+            "rects": [bool(keys) for keys in rect_keys],
+            "samples": [(x, y) for x, y, _ in samples],
+        }
+    spawn_root = find(spawn_key)
+    return {
+        "spawn_walkable": True,
+        "points": {pos for pos, key in point_keys.items() if find(key) == spawn_root},
+        "rects": [any(find(key) == spawn_root for key in keys) for keys in rect_keys],
+        "samples": [(x, y) for x, y, key in samples if find(key) == spawn_root],
+    }
+
+
+def sample_reachable_positions(map_data, tile_defs, per_chunk=SAMPLES_PER_CHUNK):
+    return scan_chunked_reachability(map_data, tile_defs, sample_per_chunk=per_chunk)["samples"]
+
+
+def is_walkable_at(map_data, tile_defs, x, y):
+    width = map_data.get("width") or 0
+    height = map_data.get("height") or 0
+    if not (0 <= x < width and 0 <= y < height):
+        return False
+    return ChunkedTiles(map_data)[y * width + x] in _walkable_ids(tile_defs)
+
+
+def validate_chunks(map_data, tile_defs, add_error):
+    width = map_data.get("width") or 0
+    height = map_data.get("height") or 0
+    chunk_size = map_data.get("chunkSize")
+    if not isinstance(chunk_size, int) or chunk_size <= 0:
+        add_error("Map chunkSize must be a positive integer.")
+        return
+    cols, rows = _chunk_grid(width, height, chunk_size)
+    seen = set()
+    for idx, chunk in enumerate(map_data.get("chunks") or []):
+        if not isinstance(chunk, dict):
+            add_error(f"Map chunk at index {idx} must be an object.")
+            continue
+        cx, cy = chunk.get("cx"), chunk.get("cy")
+        if not isinstance(cx, int) or not isinstance(cy, int) or not (0 <= cx < cols and 0 <= cy < rows):
+            add_error(f"Map chunk at index {idx} has invalid cx/cy.")
+            continue
+        if (cx, cy) in seen:
+            add_error(f"Duplicate map chunk {cx},{cy}.")
+            continue
+        seen.add((cx, cy))
+        expected = _chunk_bounds(cx, cy, width, height, chunk_size)
+        if tuple(chunk.get(key) for key in ("x", "y", "w", "h")) != expected:
+            add_error(f"Map chunk {cx},{cy} bounds do not match chunkSize.")
+            continue
+        chunk_tiles = chunk.get("tiles")
+        if not isinstance(chunk_tiles, list):
+            add_error(f"Map chunk {cx},{cy} tiles must be a list.")
+            continue
+        if len(chunk_tiles) != expected[2] * expected[3]:
+            add_error(f"Map chunk {cx},{cy} tile array length does not match w*h.")
+        for local, tile_id in enumerate(chunk_tiles):
+            if not isinstance(tile_id, int):
+                add_error(f"Map chunk {cx},{cy} tile index {local} must be an integer.")
+            elif tile_defs and tile_id not in tile_defs:
+                add_error(f"Map chunk {cx},{cy} references undefined tile id {tile_id} at index {local}.")
+    missing = cols * rows - len(seen)
+    if missing > 0:
+        add_error(f"Map is missing {missing} chunk(s).")
+
+
+def validate_chunked_reachability(map_data, tile_defs, map_objects, objectives, zones, add_error):
+    target_ids = set()
+    for obj in objectives:
+        if obj.get("targetId"):
+            target_ids.add(obj.get("targetId"))
+        for entry in obj.get("targetIds") or []:
+            target_ids.add(entry)
+    target_ids.discard(None)
+    targets = {}
+    for target_id in target_ids:
+        entry = next((item for item in map_objects if item.get("id") == target_id), None)
+        if entry:
+            targets[target_id] = (entry.get("x"), entry.get("y"))
+
+    zone_rects = []
+    for zone in zones:
+        rect = zone.get("rect") if isinstance(zone, dict) else None
+        if not isinstance(rect, dict):
+            continue
+        values = (rect.get("x"), rect.get("y"), rect.get("w"), rect.get("h"))
+        if all(isinstance(value, int) for value in values):
+            zone_rects.append((zone, values))
+
+    result = scan_chunked_reachability(
+        map_data,
+        tile_defs,
+        points=list(targets.values()),
+        rects=[values for _, values in zone_rects],
+    )
+    if not result["spawn_walkable"]:
+        return
+    for target_id, pos in targets.items():
+        if pos not in result["points"]:
+            add_error(f"Object {target_id} is not reachable from spawn.")
+    for (zone, _), reachable in zip(zone_rects, result["rects"]):
+        if not reachable:
+            add_error(f"Zone {zone.get('id') or 'unknown'} is not reachable from spawn.")
@@ -1,7 +1,15 @@
 from .mission_assets import build_object_definitions, build_tile_definitions, _tokenize_slug
+from .mission_chunks import (
+    generate_chunked_map,
+    is_chunked_map,
+    is_walkable_at,
+    sample_reachable_positions,
+    wants_chunked_map,
+)
 from .mission_constants import DEFAULT_DIALOG_STATE_VERSION
 from .mission_map import generate_map, _place_objects, _ensure_required_objects, _find_walkable_positions
 from .mission_narrative import _build_checkpoints, _default_interactions, _normalize_narrative
+from .mission_tiles import encode_map_tiles
 
 
 def _normalize_start_by_target(value):
@@ -328,13 +336,18 @@ def _ensure_interactions_for_objectives(objectives, interactions):
     return interactions
 
 
-def generate_mission(plan, seed, manifest):
+def generate_mission(plan, seed, manifest, tile_encoding=None):
     tiles = build_tile_definitions(manifest)
     objects = build_object_definitions(manifest)
-    map_data = generate_map(plan, seed, tiles)
+    if wants_chunked_map(plan):
+        map_data = generate_chunked_map(plan, seed, tiles)
+        positions = sample_reachable_positions(map_data, tiles)
+    else:
+        map_data = generate_map(plan, seed, tiles)
+        positions = None
     plan_objectives = plan.get("objectives") if isinstance(plan.get("objectives"), list) else []
     objectives = [dict(obj) for obj in plan_objectives if isinstance(obj, dict)]
-    map_data["objects"] = _place_objects(map_data, tiles, objects, objectives, seed)
+    map_data["objects"] = _place_objects(map_data, tiles, objects, objectives, seed, positions)
 
     mission_title = plan.get("title") or plan.get("mission", {}).get("title")
     mission_subtitle = plan.get("subtitle") or plan.get("mission", {}).get("subtitle")
@@ -437,25 +450,35 @@ def generate_mission(plan, seed, manifest):
                 }
             )
 
-    _ensure_required_objects(map_data, tiles, objects, required_targets, seed)
+    _ensure_required_objects(map_data, tiles, objects, required_targets, seed, positions)
     _align_objective_categories(objectives, map_data.get("objects", []), objects)
     _ensure_objective_target_ids(objectives, map_data.get("objects", []), objects)
     interactions = _ensure_interactions_for_objectives(objectives, interactions)
 
-    walkable = _find_walkable_positions(map_data, tiles)
-    walkable_set = set(walkable)
-    if walkable_set:
+    if is_chunked_map(map_data):
+        walkable = positions
+
+        def is_walkable(pos):
+            return is_walkable_at(map_data, tiles, *pos)
+    else:
+        walkable = _find_walkable_positions(map_data, tiles)
+        walkable_set = set(walkable)
+
+        def is_walkable(pos):
+            return pos in walkable_set
+
+    if walkable:
         for checkpoint in checkpoints:
             if not isinstance(checkpoint, dict):
                 continue
             if checkpoint.get("targetId"):
                 continue
             tx, ty = checkpoint.get("tx"), checkpoint.get("ty")
-            if isinstance(tx, int) and isinstance(ty, int) and (tx, ty) in walkable_set:
+            if isinstance(tx, int) and isinstance(ty, int) and is_walkable((tx, ty)):
                 continue
             spawn = map_data.get("spawn") or {}
             fallback = (spawn.get("tx"), spawn.get("ty"))
-            if fallback in walkable_set:
+            if all(isinstance(value, int) for value in fallback) and is_walkable(fallback):
                 checkpoint["tx"], checkpoint["ty"] = fallback
             else:
                 checkpoint["tx"], checkpoint["ty"] = walkable[0]
@@ -487,7 +510,7 @@ def generate_mission(plan, seed, manifest):
 
     return {
         "mission": mission,
-        "map": map_data,
+        "map": encode_map_tiles(map_data, tile_encoding),
         "tiles": {"tiles": tiles},
         "objects": {"objects": objects},
         "plan": plan,
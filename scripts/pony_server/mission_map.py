@@ -170,9 +170,11 @@ def _reachable_positions(map_data, tile_defs):
     return list(visited)
 
 
-def _place_objects(map_data, tile_defs, object_defs, objectives, seed):
+def _place_objects(map_data, tile_defs, object_defs, objectives, seed, positions=None):
     rng = random.Random(_seed_from_value(seed))
-    positions = _reachable_positions(map_data, tile_defs) or _find_walkable_positions(map_data, tile_defs)
+    if positions is None:
+        positions = _reachable_positions(map_data, tile_defs) or _find_walkable_positions(map_data, tile_defs)
+    positions = list(positions)
     rng.shuffle(positions)
 
     creatures = [obj for obj in object_defs if obj.get("class") == "creature"]
@@ -327,11 +329,13 @@ def _select_object_type(object_defs, action, category_hint, target_id, rng):
     return rng.choice(pool)["type"] if pool else None
 
 
-def _ensure_required_objects(map_data, tile_defs, object_defs, required_targets, seed):
+def _ensure_required_objects(map_data, tile_defs, object_defs, required_targets, seed, positions=None):
     if not required_targets:
         return
     rng = random.Random(_seed_from_value(seed))
-    positions = _reachable_positions(map_data, tile_defs) or _find_walkable_positions(map_data, tile_defs)
+    if positions is None:
+        positions = _reachable_positions(map_data, tile_defs) or _find_walkable_positions(map_data, tile_defs)
+    positions = list(positions)
     rng.shuffle(positions)
     used = {f"{obj.get('x')},{obj.get('y')}" for obj in map_data.get("objects", []) if obj.get("x") is not None}
     existing = {obj.get("id") for obj in map_data.get("objects", []) if obj.get("id")}
@@ -2,14 +2,14 @@ import hashlib
 import json
 import os
 import time
-import urllib.error
-import urllib.request
 from pathlib import Path
 
 from .config import ROOT
+from .asset_manifest import asset_manifest
 from .io import load_data
 from .utils import sanitize_value
 from .logging_utils import log_event, make_request_id, ensure_dir
+from scripts.openai_http import RequestError, api_url, post_json
 from scripts.sprites import images_api
 from .mission_constants import (
     DEFAULT_MISSION_MODEL,
@@ -19,7 +19,7 @@ from .mission_constants import (
 )
 from .mission_plan_schema import mission_plan_tool_schema
 
-RESPONSES_URL = "https://api.openai.com/v1/responses"
+RESPONSES_PATH = "responses"
 LOG_DIR = ROOT / "logs/mission-generator"
 CACHE_PATH = LOG_DIR / "last-plan.json"
 DEFAULT_PLAN_PATH = ROOT / "specs/mission-plan-default.json"
@@ -46,7 +46,7 @@ def load_manifest(manifest_path=None):
     manifest_path = Path(manifest_path or DEFAULT_ASSET_MANIFEST)
     if not manifest_path.exists():
         raise MissionPlanError("Asset manifest not found.")
-    return load_data(manifest_path)
+    return asset_manifest(manifest_path).snapshot()
 
 
 def _load_cached_plan(cache_path):
@@ -128,25 +128,17 @@ def _hash_manifest_summary(summary):
 
 
 def _request_llm(payload):
-    request = urllib.request.Request(
-        RESPONSES_URL,
-        data=json.dumps(payload).encode("utf-8"),
-        headers={
-            "Authorization": f"Bearer {os.getenv('OPENAI_API_KEY', '')}",
-            "Content-Type": "application/json",
-        },
-        method="POST",
-    )
-
     try:
-        with urllib.request.urlopen(request, timeout=180) as response:
-            body = response.read().decode("utf-8")
-            return json.loads(body)
-    except (urllib.error.HTTPError, urllib.error.URLError) as exc:
-        if isinstance(exc, urllib.error.HTTPError):
-            detail = exc.read().decode("utf-8", errors="replace")
-            raise MissionPlanError(f"LLM request failed: {exc.code} {exc.reason}\n{detail}") from exc
-        raise MissionPlanError(f"LLM request failed: {exc}") from exc
+        response = post_json(
+            api_url(RESPONSES_PATH),
+            payload,
+            os.getenv("OPENAI_API_KEY", ""),
+            timeout=180,
+            label="LLM request",
+        )
+        return response.json()
+    except RequestError as exc:
+        raise MissionPlanError(str(exc)) from exc
 
 
 def _extract_tool_args(response):
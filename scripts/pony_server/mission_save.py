@@ -5,8 +5,11 @@ from pathlib import Path
 from .config import ROOT
 from .io import load_data, save_data
 from .utils import sanitize_value, slugify
+from .mission_atlas import ATLAS_INDEX_NAME, build_mission_atlas
+from .mission_chunks import is_chunked_map
 from .mission_constants import DEFAULT_ADVENTURE_ID, DEFAULT_SAVE_ROOT, DEFAULT_WORLD_MAP, MissionValidationError
 from .mission_plan import load_manifest
+from .mission_tiles import decode_map_tiles, encode_map_tiles
 
 
 def _normalize_adventure_id(adventure_id):
@@ -207,9 +210,10 @@ def save_mission_bundle(
     adventure_actions=None,
     adventure_background=None,
     create_adventure=False,
+    tile_encoding=None,
 ):
     mission_data = bundle.get("mission") or {}
-    map_data = bundle.get("map") or {}
+    map_data = _reencode_map(bundle.get("map") or {}, tile_encoding)
     tiles = bundle.get("tiles") or {}
     objects = bundle.get("objects") or {}
 
@@ -246,10 +250,22 @@ def save_mission_bundle(
     if not force and map_path.exists():
         raise MissionValidationError("Mission map already exists. Use force to overwrite.")
 
-    save_data(map_path, map_data)
+    if is_chunked_map(map_data):
+        save_data(map_path, _save_map_chunks(map_data, map_dir, f"{mission_slug}-chunks"))
+    else:
+        save_data(map_path, map_data)
     save_data(tiles_path, tiles)
     save_data(objects_path, objects)
 
+    tile_size = mission_data.get("tileSize", 64)
+    atlas = build_mission_atlas(
+        tiles.get("tiles"),
+        objects.get("objects"),
+        map_dir,
+        asset_root=ROOT / "adventures",
+        tile_size=tile_size,
+    )
+
     mission_json = {
         "id": mission_id,
         "title": mission_title,
@@ -258,8 +274,9 @@ def save_mission_bundle(
         "tiles": tiles_path.name,
         "objects": objects_path.name,
         "assetRoot": "/adventures",
+        "atlas": ATLAS_INDEX_NAME if atlas else None,
         "logic": "/assets/js/stellacorn/adventure/generic-mission.js",
-        "tileSize": mission_data.get("tileSize", 64),
+        "tileSize": tile_size,
         "spawn": map_data.get("spawn"),
         "objectives": mission_data.get("objectives"),
         "interactions": mission_data.get("interactions"),
@@ -306,6 +323,23 @@ def save_mission_bundle(
     }
 
 
+def _save_map_chunks(map_data, map_dir, chunks_dirname):
+    chunks_dir = Path(map_dir) / chunks_dirname
+    chunks_dir.mkdir(parents=True, exist_ok=True)
+    index = []
+    for chunk in map_data.get("chunks") or []:
+        if not isinstance(chunk, dict):
+            continue
+        chunk_name = f"chunk-{chunk.get('cx')}-{chunk.get('cy')}.json"
+        save_data(chunks_dir / chunk_name, chunk)
+        entry = {key: chunk.get(key) for key in ("cx", "cy", "x", "y", "w", "h")}
+        entry["path"] = f"{chunks_dirname}/{chunk_name}"
+        index.append(entry)
+    payload = dict(map_data)
+    payload["chunks"] = index
+    return payload
+
+
 def _save_asset_prompts(bundle, mission_dir):
     requests = (
         (bundle.get("mission") or {}).get("assetRequests")
@@ -331,14 +365,21 @@ def _save_asset_prompts(bundle, mission_dir):
         prompt_txt_path.write_text("\n".join(lines), encoding="utf-8")
 
 
-def save_draft_bundle(bundle):
+def _reencode_map(map_data, tile_encoding):
+    try:
+        return encode_map_tiles(decode_map_tiles(map_data), tile_encoding)
+    except ValueError as exc:
+        raise MissionValidationError(f"Map tiles could not be encoded: {exc}") from exc
+
+
+def save_draft_bundle(bundle, tile_encoding=None):
     drafts_dir = ROOT / "adventures/maps/_drafts"
     drafts_dir.mkdir(parents=True, exist_ok=True)
     map_path = drafts_dir / "mission-generator-draft.json"
     tiles_path = drafts_dir / "mission-generator-tiles.json"
     objects_path = drafts_dir / "mission-generator-objects.json"
 
-    map_payload = dict(bundle.get("map") or {})
+    map_payload = dict(_reencode_map(bundle.get("map") or {}, tile_encoding))
     mission_meta = bundle.get("mission") or {}
     if mission_meta:
         map_payload["missionMeta"] = mission_meta
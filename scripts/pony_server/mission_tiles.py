@@ -0,0 +1,122 @@
+import base64
+import sys
+from array import array
+
+from .mission_chunks import MAX_CHUNKED_MAP_SIZE
+
+TILE_ENCODINGS = ("rle", "u16-base64")
+# No map or chunk holds more tiles than this; decoding stops before
+# allocating past it.
+MAX_DECODED_TILES = MAX_CHUNKED_MAP_SIZE * MAX_CHUNKED_MAP_SIZE
+
+
+def encode_tiles(tiles, encoding):
+    if not encoding:
+        return list(tiles)
+    if encoding == "rle":
+        runs = []
+        for tile_id in tiles:
+            if runs and runs[-2] == tile_id:
+                runs[-1] += 1
+            else:
+                runs.extend([tile_id, 1])
+        return runs
+    if encoding == "u16-base64":
+        try:
+            packed = array("H", tiles)
+        except (OverflowError, TypeError) as exc:
+            raise ValueError("u16-base64 tiles must be integers in 0..65535.") from exc
+        if sys.byteorder == "big":
+            packed.byteswap()
+        return base64.b64encode(packed.tobytes()).decode("ascii")
+    raise ValueError(f"Unsupported tile encoding: {encoding}.")
+
+
+def decode_tiles(value, encoding, limit=MAX_DECODED_TILES):
+    if not encoding:
+        return value
+    limit = min(limit, MAX_DECODED_TILES)
+    if encoding == "rle":
+        if not isinstance(value, list) or len(value) % 2:
+            raise ValueError("rle tiles must be a flat list of [tileId, count] pairs.")
+        tiles = []
+        for index in range(0, len(value), 2):
+            tile_id, count = value[index], value[index + 1]
+            if not isinstance(count, int) or count <= 0:
+                raise ValueError(f"rle run {index // 2} has an invalid count.")
+            if len(tiles) + count > limit:
+                raise ValueError(f"rle tiles expand past {limit} tiles.")
+            tiles.extend([tile_id] * count)
+        return tiles
+    if encoding == "u16-base64":
+        if not isinstance(value, str):
+            raise ValueError("u16-base64 tiles must be a base64 string.")
+        try:
+            raw = base64.b64decode(value, validate=True)
+        except ValueError as exc:
+            raise ValueError("u16-base64 tiles are not valid base64.") from exc
+        if len(raw) % 2:
+            raise ValueError("u16-base64 tiles have an odd byte length.")
+        if len(raw) // 2 > limit:
+            raise ValueError(f"u16-base64 tiles hold more than {limit} tiles.")
+        packed = array("H")
+        packed.frombytes(raw)
+        if sys.byteorder == "big":
+            packed.byteswap()
+        return packed.tolist()
+    raise ValueError(f"Unsupported tile encoding: {encoding}.")
+
+
+def _encode_block(block, encoding):
+    block = dict(block)
+    if isinstance(block.get("tiles"), list):
+        block["tiles"] = encode_tiles(block["tiles"], encoding)
+        block["encoding"] = encoding
+    return block
+
+
+def _tile_limit(block):
+    # Chunks carry w/h, flat maps width/height; without them only the
+    # global cap applies.
+    width = block.get("w", block.get("width"))
+    height = block.get("h", block.get("height"))
+    if isinstance(width, int) and isinstance(height, int) and width >= 0 and height >= 0:
+        return min(width * height, MAX_DECODED_TILES)
+    return MAX_DECODED_TILES
+
+
+def _decode_block(block):
+    encoding = block.get("encoding")
+    if not encoding:
+        return block
+    block = dict(block)
+    if "tiles" in block:
+        block["tiles"] = decode_tiles(block["tiles"], encoding, _tile_limit(block))
+    block.pop("encoding")
+    return block
+
+
+def encode_map_tiles(map_data, encoding):
+    if not encoding or not isinstance(map_data, dict):
+        return map_data
+    if isinstance(map_data.get("chunks"), list):
+        encoded = dict(map_data)
+        encoded["chunks"] = [
+            _encode_block(chunk, encoding) if isinstance(chunk, dict) else chunk
+            for chunk in map_data["chunks"]
+        ]
+        return encoded
+    return _encode_block(map_data, encoding)
+
+
+def decode_map_tiles(map_data):
+    if not isinstance(map_data, dict):
+        return map_data
+    if isinstance(map_data.get("chunks"), list):
+        decoded = dict(map_data)
+        decoded["chunks"] = [
+            _decode_block(chunk) if isinstance(chunk, dict) else chunk
+            for chunk in map_data["chunks"]
+        ]
+        return decoded
+    return _decode_block(map_data)
@@ -1,4 +1,6 @@
 from .mission_assets import _tokenize_slug
+from .mission_chunks import ChunkedTiles, is_chunked_map, validate_chunked_reachability, validate_chunks
+from .mission_tiles import decode_map_tiles
 from .mission_validate_helpers import (
     validate_checkpoints,
     validate_conditions,
@@ -37,6 +39,11 @@ def validate_mission(bundle):
         objects = []
     if not _require_dict(map_data, "Map data"):
         map_data = {}
+    try:
+        map_data = decode_map_tiles(map_data)
+    except ValueError as exc:
+        add_error(f"Map tiles could not be decoded: {exc}")
+        map_data = {key: value for key, value in map_data.items() if key not in {"tiles", "chunks", "encoding"}}
 
     tile_defs = {}
     for idx, tile in enumerate(tiles):
@@ -79,13 +86,18 @@ def validate_mission(bundle):
         add_error("Map height must be a positive integer.")
         height = 0
 
-    tiles_grid = map_data.get("tiles") or []
-    if not _require_list(tiles_grid, "Map tiles"):
-        tiles_grid = []
-    if width and height and len(tiles_grid) != width * height:
-        add_error("Tile array length does not match width*height.")
+    chunked = is_chunked_map(map_data)
+    if chunked:
+        validate_chunks(map_data, tile_defs, add_error)
+        tiles_grid = ChunkedTiles(map_data) if width and height else []
+    else:
+        tiles_grid = map_data.get("tiles") or []
+        if not _require_list(tiles_grid, "Map tiles"):
+            tiles_grid = []
+        if width and height and len(tiles_grid) != width * height:
+            add_error("Tile array length does not match width*height.")
 
-    if tiles_grid:
+    if tiles_grid and not chunked:
         for idx, tile_id in enumerate(tiles_grid):
             if not isinstance(tile_id, int):
                 add_error(f"Tile index {idx} must be an integer.")
@@ -399,15 +411,18 @@ def validate_mission(bundle):
             entry_nodes.add(node_id)
     validate_dialog_reachability(nodes, all_node_ids, entry_nodes, add_error)
 
-    validate_reachability(
-        map_data,
-        tiles_grid,
-        tile_defs,
-        map_objects,
-        objectives,
-        zones,
-        add_error,
-    )
+    if chunked:
+        validate_chunked_reachability(map_data, tile_defs, map_objects, objectives, zones, add_error)
+    else:
+        validate_reachability(
+            map_data,
+            tiles_grid,
+            tile_defs,
+            map_objects,
+            objectives,
+            zones,
+            add_error,
+        )
 
     mission.setdefault("validation", {})
     mission["validation"]["errors"] = errors
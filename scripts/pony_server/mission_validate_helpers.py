@@ -179,7 +179,7 @@ def validate_dialog_reachability(nodes, node_ids, entry_nodes, add_error):
 def validate_reachability(map_data, tiles_grid, tile_defs, map_objects, objectives, zones, add_error):
     width = map_data.get("width")
     height = map_data.get("height")
-    if not width or not height:
+    if not width or not height or len(tiles_grid) != width * height:
         return
     spawn = map_data.get("spawn") or {}
     start = (spawn.get("tx"), spawn.get("ty"))
@@ -1,12 +1,10 @@
-import json
 import os
-import time
-import urllib.error
-import urllib.request
 
+from scripts.openai_http import api_url, post_json
 
-CHAT_COMPLETIONS_URL = "https://api.openai.com/v1/chat/completions"
-RESPONSES_URL = "https://api.openai.com/v1/responses"
+
+CHAT_COMPLETIONS_PATH = "chat/completions"
+RESPONSES_PATH = "responses"
 
 DEFAULT_TIMEOUT = 60
 DEFAULT_RETRIES = 2
@@ -59,14 +57,14 @@ def chat_response(
             "text": {"format": {"type": "text"}},
             "reasoning": {"effort": "low"},
         }
-        return _request_json(RESPONSES_URL, payload, api_key, timeout=timeout)
+        return _request_json(RESPONSES_PATH, payload, api_key, timeout=timeout)
     payload = {
         "model": model,
         "messages": _messages_to_chat_messages(messages),
         "temperature": temperature,
         "max_tokens": max_tokens,
     }
-    return _request_json(CHAT_COMPLETIONS_URL, payload, api_key, timeout=timeout)
+    return _request_json(CHAT_COMPLETIONS_PATH, payload, api_key, timeout=timeout)
 
 
 def _uses_responses(model):
@@ -99,29 +97,6 @@ def _messages_to_responses_input(messages):
     return output
 
 
-def _request_json(url, payload, api_key, timeout=DEFAULT_TIMEOUT):
-    data = json.dumps(payload).encode("utf-8")
-    for attempt in range(1, DEFAULT_RETRIES + 1):
-        request = urllib.request.Request(
-            url,
-            data=data,
-            headers={
-                "Authorization": f"Bearer {api_key}",
-                "Content-Type": "application/json",
-            },
-            method="POST",
-        )
-        try:
-            with urllib.request.urlopen(request, timeout=timeout) as response:
-                body = response.read().decode("utf-8")
-                return json.loads(body)
-        except (urllib.error.HTTPError, urllib.error.URLError) as exc:
-            if attempt == DEFAULT_RETRIES:
-                if isinstance(exc, urllib.error.HTTPError):
-                    detail = exc.read().decode("utf-8", errors="replace")
-                    raise RuntimeError(
-                        f"OpenAI request failed: {exc.code} {exc.reason}\n{detail}"
-                    ) from exc
-                raise RuntimeError(f"OpenAI request failed: {exc}") from exc
-            time.sleep(2 ** (attempt - 1))
-    raise RuntimeError("OpenAI request failed after retries.")
+def _request_json(path, payload, api_key, timeout=DEFAULT_TIMEOUT):
+    response = post_json(api_url(path), payload, api_key, timeout=timeout, attempts=DEFAULT_RETRIES)
+    return response.json()
@@ -0,0 +1,130 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from .config import (
+    DEFAULT_REFINE_CACHE_DIR,
+    REFINE_CACHE_DISK_BYTES,
+    REFINE_CACHE_MEMORY_BYTES,
+    ROOT,
+)
+
+# Bump when refine_map or the output normalization changes so stale entries miss.
+CACHE_VERSION = 2
+
+
+def refine_cache_key(
+    rows, legend, base_resolution, target_resolution, seed, notes, noise, mode="direct", region_masks=False
+):
+    payload = {
+        "version": CACHE_VERSION,
+        "mode": mode,
+        "region_masks": bool(region_masks),
+        "rows": list(rows),
+        "legend": legend,
+        "base": list(base_resolution),
+        "target": list(target_resolution),
+        "seed": seed,
+        "notes": notes or [],
+        "noise": noise,
+    }
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class RefineCache:
+    def __init__(self, cache_dir=None, memory_bytes=REFINE_CACHE_MEMORY_BYTES, disk_bytes=REFINE_CACHE_DISK_BYTES):
+        self.cache_dir = Path(cache_dir) if cache_dir else ROOT / DEFAULT_REFINE_CACHE_DIR
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self._memory = OrderedDict()
+        self._memory_size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        # Returns (value, tier) with tier "memory" or "disk", or (None, None) on a miss.
+        with self._lock:
+            body = self._memory.get(key)
+            if body is not None:
+                self._memory.move_to_end(key)
+                return json.loads(body), "memory"
+        path = self._path(key)
+        try:
+            body = path.read_bytes()
+            value = json.loads(body)
+        except (OSError, ValueError):
+            return None, None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        with self._lock:
+            self._remember(key, body)
+        return value, "disk"
+
+    def put(self, key, value):
+        body = json.dumps(value, separators=(",", ":")).encode("utf-8")
+        with self._lock:
+            self._remember(key, body)
+        if self.disk_bytes <= 0:
+            return
+        path = self._path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp_path.write_bytes(body)
+            os.replace(tmp_path, path)
+        except OSError:
+            return
+        self._evict_disk()
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._memory_size = 0
+        for path in self.cache_dir.glob("*.json"):
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+    def _path(self, key):
+        return self.cache_dir / f"{key}.json"
+
+    def _remember(self, key, body):
+        if len(body) > self.memory_bytes:
+            return
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_size -= len(previous)
+        self._memory[key] = body
+        self._memory_size += len(body)
+        while self._memory_size > self.memory_bytes and self._memory:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_size -= len(evicted)
+
+    def _evict_disk(self):
+        entries = []
+        total = 0
+        for path in self.cache_dir.glob("*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+        # Least recently written/read first; get() touches mtime on disk hits.
+        for _, size, path in sorted(entries):
+            if total <= self.disk_bytes:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+
+
+REFINE_CACHE = RefineCache()
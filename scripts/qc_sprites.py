@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from scripts.sprites import frame_qc  # noqa: E402
+
+DEFAULT_PONY_ROOT = Path("assets") / "ponies"
+DEFAULT_SUBDIRS = ("frames", "frames_dense")
+DEFAULT_REPORT = ROOT / "data" / "_generated" / "sprite-qc.json"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Run sprite QC over every pony's frame directories and write one JSON report."
+    )
+    parser.add_argument(
+        "--pony",
+        default="",
+        help="Comma-separated pony IDs (slugs) to check (default: all).",
+    )
+    parser.add_argument(
+        "--subdirs",
+        default=",".join(DEFAULT_SUBDIRS),
+        help=f"Frame subdirectories to check (default: {','.join(DEFAULT_SUBDIRS)}).",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=int,
+        default=frame_qc.DEFAULT_KEY_TOLERANCE,
+        help=(
+            "Colour distance counted as keyable background "
+            f"(default: {frame_qc.DEFAULT_KEY_TOLERANCE})."
+        ),
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Worker processes (default: CPU count; 1 checks in-process).",
+    )
+    parser.add_argument(
+        "--report",
+        default=str(DEFAULT_REPORT),
+        help=f"Report path (default: {DEFAULT_REPORT}).",
+    )
+    return parser.parse_args()
+
+
+def _split(value):
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def profile_for(subdir):
+    # Unknown subdirectories get the keyframe thresholds.
+    return subdir if subdir in frame_qc.PROFILES else "frames"
+
+
+def collect_tasks(pony_root, pony_ids, subdirs, tolerance):
+    tasks = []
+    for pony_id in sorted(pony_ids):
+        for subdir in subdirs:
+            for path in sorted((pony_root / pony_id / subdir).glob("*.png")):
+                tasks.append(
+                    {
+                        "pony": pony_id,
+                        "subdir": subdir,
+                        "path": str(path),
+                        "profile": profile_for(subdir),
+                        "tolerance": tolerance,
+                    }
+                )
+    return tasks
+
+
+def check_one(task):
+    # Runs in a worker process; the parent assembles the report.
+    report = frame_qc.check_frame(task["path"], task["profile"], task["tolerance"])
+    report["pony"] = task["pony"]
+    report["subdir"] = task["subdir"]
+    return report
+
+
+def run_tasks(tasks, jobs):
+    if jobs <= 1 or len(tasks) <= 1:
+        return [check_one(task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        return list(executor.map(check_one, tasks, chunksize=max(1, len(tasks) // (jobs * 4))))
+
+
+def _relative(path):
+    try:
+        return Path(path).resolve().relative_to(ROOT.resolve()).as_posix()
+    except ValueError:
+        return str(path)
+
+
+def build_report(results):
+    summary = {"frames": len(results), "passed": 0, "failed": 0, "needs_flip": 0, "by_reason": {}}
+    ponies = {}
+    for result in results:
+        result["path"] = _relative(result["path"])
+        pony = ponies.setdefault(result.pop("pony"), {"passed": 0, "failed": 0, "frames": []})
+        pony["frames"].append(result)
+        if result["ok"]:
+            summary["passed"] += 1
+            pony["passed"] += 1
+        else:
+            summary["failed"] += 1
+            pony["failed"] += 1
+            reason = result["reason"]
+            summary["by_reason"][reason] = summary["by_reason"].get(reason, 0) + 1
+        if result.get("needs_flip"):
+            summary["needs_flip"] += 1
+    return {"summary": summary, "ponies": ponies}
+
+
+def save_report(path, report):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as handle:
+        json.dump(report, handle, indent=2)
+        handle.write("\n")
+    os.replace(tmp_path, path)
+
+
+def main():
+    args = parse_args()
+    pony_root = ROOT / DEFAULT_PONY_ROOT
+    if not pony_root.exists():
+        print(f"Pony assets not found: {pony_root}")
+        return 1
+    pony_ids = _split(args.pony) or [path.name for path in pony_root.iterdir() if path.is_dir()]
+    subdirs = _split(args.subdirs)
+
+    started = time.time()
+    tasks = collect_tasks(pony_root, pony_ids, subdirs, args.tolerance)
+    results = run_tasks(tasks, max(1, args.jobs))
+    report = build_report(results)
+    report["summary"].update(
+        {
+            "jobs": max(1, args.jobs),
+            "subdirs": subdirs,
+            "tolerance": args.tolerance,
+            "seconds": round(time.time() - started, 2),
+        }
+    )
+    report_path = Path(args.report)
+    save_report(report_path, report)
+
+    for pony in report["ponies"].values():
+        for frame in pony["frames"]:
+            if not frame["ok"]:
+                print(f"Failed: {frame['path']} ({frame['reason']})")
+    summary = report["summary"]
+    print(
+        f"Checked {summary['frames']} frames: {summary['passed']} passed, "
+        f"{summary['failed']} failed, {summary['needs_flip']} facing left. "
+        f"Report: {report_path}"
+    )
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,279 @@
+import email.utils
+import json
+import os
+import re
+import threading
+import time
+
+DEFAULT_MAX_CONCURRENCY = 8
+# Requests are allowed to burst over this many seconds' worth of budget; the
+# API enforces per-minute limits in sub-minute slices, so a full minute's
+# burst would still 429.
+BURST_SECONDS = 10.0
+_ENV_LIMITS = {
+    "text": ("OPENAI_RPM", "OPENAI_TPM"),
+    "images": ("OPENAI_IMAGES_RPM", None),
+    "audio": ("OPENAI_AUDIO_RPM", None),
+}
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_DURATION_SECONDS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def limit_key(url):
+    if "/images/" in url:
+        return "images"
+    if "/audio/" in url:
+        return "audio"
+    return "text"
+
+
+def estimate_tokens(payload):
+    # Rough prompt size (~4 bytes per token) plus the output cap.
+    encoded = json.dumps(payload, ensure_ascii=False)
+    output = 0
+    for field in ("max_output_tokens", "max_completion_tokens", "max_tokens"):
+        value = payload.get(field) if isinstance(payload, dict) else None
+        if isinstance(value, int):
+            output = value
+            break
+    return len(encoded) // 4 + output
+
+
+def parse_duration(value):
+    # OpenAI reset headers look like "1s", "6m0s" or "20ms".
+    if not value:
+        return None
+    value = str(value).strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * _DURATION_SECONDS[unit] for amount, unit in parts)
+
+
+def retry_after(headers):
+    if not headers:
+        return None
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return max(0.0, float(value) / 1000)
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+class TokenBucket:
+    # `limit` units per minute, refilled continuously. None means unlimited.
+    def __init__(self, limit=None, now=None):
+        self.limit = None
+        self.level = 0.0
+        self.updated = time.monotonic() if now is None else now
+        self.set_limit(limit)
+
+    def set_limit(self, limit):
+        previous = self.capacity
+        self.limit = limit if limit and limit > 0 else None
+        if self.limit and previous is None:
+            self.level = self.capacity
+        elif self.limit:
+            self.level = min(self.level, self.capacity)
+
+    @property
+    def capacity(self):
+        if not self.limit:
+            return None
+        return max(1.0, self.limit * BURST_SECONDS / 60.0)
+
+    def delay(self, amount, now):
+        # Seconds until `amount` can be taken. Requests larger than the burst
+        # only wait for a full bucket and then drive the level negative.
+        if not self.limit or amount <= 0:
+            return 0.0
+        self._refill(now)
+        needed = min(amount, self.capacity)
+        if self.level >= needed:
+            return 0.0
+        return (needed - self.level) * 60.0 / self.limit
+
+    def take(self, amount, now):
+        if not self.limit or amount <= 0:
+            return
+        self._refill(now)
+        self.level -= amount
+
+    def sync(self, limit, remaining, reset_seconds, now):
+        # Trust the server's view when it has less budget left than we think.
+        if limit:
+            self.set_limit(limit)
+        if not self.limit or remaining is None:
+            return
+        self._refill(now)
+        if remaining < self.level:
+            self.level = float(remaining)
+        if remaining <= 0 and reset_seconds:
+            self.level = min(self.level, -reset_seconds * self.limit / 60.0)
+
+    def _refill(self, now):
+        elapsed = max(0.0, now - self.updated)
+        self.updated = now
+        if self.limit:
+            self.level = min(self.capacity, self.level + elapsed * self.limit / 60.0)
+
+
+class RateLimiter:
+    # Process-wide budget shared by every thread that talks to the API. Each
+    # key (text, images, audio) has request and token buckets plus an AIMD
+    # concurrency limit: halved on a 429, +1 after a window of successes.
+    def __init__(self, limits=None, max_concurrency=DEFAULT_MAX_CONCURRENCY, clock=time.monotonic):
+        self.max_concurrency = max(1, int(max_concurrency))
+        self._clock = clock
+        self._changed = threading.Condition()
+        self._keys = {}
+        self._stats = {"requests": 0, "throttled": 0, "waited_seconds": 0.0}
+        for key, values in (limits or {}).items():
+            self.configure(key, **values)
+
+    @classmethod
+    def from_env(cls):
+        limits = {}
+        for key, (rpm_name, tpm_name) in _ENV_LIMITS.items():
+            limits[key] = {
+                "rpm": _env_int(rpm_name),
+                "tpm": _env_int(tpm_name) if tpm_name else None,
+            }
+        return cls(limits, max_concurrency=_env_int("OPENAI_MAX_CONCURRENCY") or DEFAULT_MAX_CONCURRENCY)
+
+    def configure(self, key, rpm=None, tpm=None, max_concurrency=None):
+        with self._changed:
+            state = self._state(key)
+            if rpm is not None:
+                state["requests"].set_limit(rpm)
+                state["pinned_rpm"] = bool(rpm)
+            if tpm is not None:
+                state["tokens"].set_limit(tpm)
+                state["pinned_tpm"] = bool(tpm)
+            if max_concurrency is not None:
+                state["max"] = max(1, int(max_concurrency))
+                state["limit"] = min(state["limit"], state["max"])
+            self._changed.notify_all()
+
+    def acquire(self, key, tokens=0):
+        start = self._clock()
+        with self._changed:
+            state = self._state(key)
+            while True:
+                now = self._clock()
+                wait = max(
+                    state["paused_until"] - now,
+                    state["requests"].delay(1, now),
+                    state["tokens"].delay(tokens, now),
+                )
+                if wait <= 0 and state["in_flight"] < state["limit"]:
+                    break
+                self._changed.wait(wait if wait > 0 else None)
+            state["requests"].take(1, now)
+            state["tokens"].take(tokens, now)
+            state["in_flight"] += 1
+            self._stats["requests"] += 1
+            self._stats["waited_seconds"] += now - start
+
+    def release(self, key, status=None, headers=None):
+        with self._changed:
+            state = self._state(key)
+            now = self._clock()
+            state["in_flight"] = max(0, state["in_flight"] - 1)
+            if headers:
+                self._sync(state, headers, now)
+            if status == 429:
+                self._stats["throttled"] += 1
+                state["limit"] = max(1, state["limit"] // 2)
+                state["successes"] = 0
+                pause = retry_after(headers)
+                if pause:
+                    state["paused_until"] = max(state["paused_until"], now + pause)
+            elif status is not None and status < 400:
+                state["successes"] += 1
+                if state["successes"] >= state["limit"] and state["limit"] < state["max"]:
+                    state["limit"] += 1
+                    state["successes"] = 0
+            self._changed.notify_all()
+
+    def concurrency(self, key):
+        with self._changed:
+            return self._state(key)["limit"]
+
+    def stats(self):
+        with self._changed:
+            stats = dict(self._stats)
+            stats["waited_seconds"] = round(stats["waited_seconds"], 3)
+            stats["concurrency"] = {key: state["limit"] for key, state in self._keys.items()}
+            return stats
+
+    def _state(self, key):
+        state = self._keys.get(key)
+        if state is None:
+            now = self._clock()
+            state = {
+                "requests": TokenBucket(now=now),
+                "tokens": TokenBucket(now=now),
+                "pinned_rpm": False,
+                "pinned_tpm": False,
+                "max": self.max_concurrency,
+                "limit": self.max_concurrency,
+                "in_flight": 0,
+                "successes": 0,
+                "paused_until": 0.0,
+            }
+            self._keys[key] = state
+        return state
+
+    def _sync(self, state, headers, now):
+        for name, bucket, pinned in (
+            ("requests", state["requests"], state["pinned_rpm"]),
+            ("tokens", state["tokens"], state["pinned_tpm"]),
+        ):
+            remaining = _header_int(headers, f"x-ratelimit-remaining-{name}")
+            if remaining is None:
+                continue
+            # A limit set explicitly by the caller wins over the server's.
+            limit = None if pinned else _header_int(headers, f"x-ratelimit-limit-{name}")
+            reset = parse_duration(headers.get(f"x-ratelimit-reset-{name}"))
+            bucket.sync(limit, remaining, reset, now)
+
+
+def _header_int(headers, name):
+    value = headers.get(name)
+    if value is None:
+        return None
+    try:
+        return int(float(value))
+    except ValueError:
+        return None
+
+
+def _env_int(name):
+    value = os.getenv(name, "").strip()
+    if not value:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        return None
+
+
+RATE_LIMITER = RateLimiter.from_env()
@@ -2,15 +2,16 @@ import base64
 import json
 import os
 import time
-import urllib.error
-import urllib.request
+
+from scripts.openai_http import api_url, iter_sse, post_json, request, stream
+from scripts.rate_limits import estimate_tokens
 
 from .utils import load_env_value
 
-AUDIO_TRANSCRIPTIONS_URL = "https://api.openai.com/v1/audio/transcriptions"
-CHAT_COMPLETIONS_URL = "https://api.openai.com/v1/chat/completions"
-RESPONSES_URL = "https://api.openai.com/v1/responses"
-TTS_URL = "https://api.openai.com/v1/audio/speech"
+AUDIO_TRANSCRIPTIONS_PATH = "audio/transcriptions"
+CHAT_COMPLETIONS_PATH = "chat/completions"
+RESPONSES_PATH = "responses"
+TTS_PATH = "audio/speech"
 
 DEFAULT_TIMEOUT = 60
 DEFAULT_RETRIES = 2
@@ -55,136 +56,49 @@ def _encode_multipart(fields, files):
     return boundary, bytes(body)
 
 
-def _request_json(url, payload, api_key, timeout=DEFAULT_TIMEOUT):
-    data = json.dumps(payload).encode("utf-8")
-    for attempt in range(1, DEFAULT_RETRIES + 1):
-        request = urllib.request.Request(
-            url,
-            data=data,
-            headers={
-                "Authorization": f"Bearer {api_key}",
-                "Content-Type": "application/json",
-            },
-            method="POST",
-        )
-        try:
-            with urllib.request.urlopen(request, timeout=timeout) as response:
-                body = response.read().decode("utf-8")
-                return json.loads(body)
-        except (urllib.error.HTTPError, urllib.error.URLError) as exc:
-            if attempt == DEFAULT_RETRIES:
-                if isinstance(exc, urllib.error.HTTPError):
-                    detail = exc.read().decode("utf-8", errors="replace")
-                    raise RuntimeError(
-                        f"OpenAI request failed: {exc.code} {exc.reason}\n{detail}"
-                    ) from exc
-                raise RuntimeError(f"OpenAI request failed: {exc}") from exc
-            time.sleep(2 ** (attempt - 1))
-    raise RuntimeError("OpenAI request failed after retries.")
-
-
-def _request_bytes(url, payload, api_key, timeout=DEFAULT_TIMEOUT):
-    data = json.dumps(payload).encode("utf-8")
-    for attempt in range(1, DEFAULT_RETRIES + 1):
-        request = urllib.request.Request(
-            url,
-            data=data,
-            headers={
-                "Authorization": f"Bearer {api_key}",
-                "Content-Type": "application/json",
-            },
-            method="POST",
-        )
-        try:
-            with urllib.request.urlopen(request, timeout=timeout) as response:
-                return response.read()
-        except (urllib.error.HTTPError, urllib.error.URLError) as exc:
-            if attempt == DEFAULT_RETRIES:
-                if isinstance(exc, urllib.error.HTTPError):
-                    detail = exc.read().decode("utf-8", errors="replace")
-                    raise RuntimeError(
-                        f"OpenAI request failed: {exc.code} {exc.reason}\n{detail}"
-                    ) from exc
-                raise RuntimeError(f"OpenAI request failed: {exc}") from exc
-            time.sleep(2 ** (attempt - 1))
-    raise RuntimeError("OpenAI request failed after retries.")
+def _json_headers(api_key, **extra):
+    return {
+        "Authorization": f"Bearer {api_key}",
+        "Content-Type": "application/json",
+        **extra,
+    }
+
+
+def _request_json(path, payload, api_key, timeout=DEFAULT_TIMEOUT):
+    response = post_json(api_url(path), payload, api_key, timeout=timeout, attempts=DEFAULT_RETRIES)
+    return response.json()
+
+
+def _request_bytes(path, payload, api_key, timeout=DEFAULT_TIMEOUT):
+    response = post_json(api_url(path), payload, api_key, timeout=timeout, attempts=DEFAULT_RETRIES)
+    return response.body
 
 
 def _request_bytes_stream(
-    url, payload, api_key, *, timeout=DEFAULT_TIMEOUT, chunk_size=16000
+    path, payload, api_key, *, timeout=DEFAULT_TIMEOUT, chunk_size=16000
 ):
-    data = json.dumps(payload).encode("utf-8")
-    for attempt in range(1, DEFAULT_RETRIES + 1):
-        request = urllib.request.Request(
-            url,
-            data=data,
-            headers={
-                "Authorization": f"Bearer {api_key}",
-                "Content-Type": "application/json",
-            },
-            method="POST",
-        )
-        sent_any = False
-        try:
-            with urllib.request.urlopen(request, timeout=timeout) as response:
-                while True:
-                    chunk = response.read(chunk_size)
-                    if not chunk:
-                        break
-                    sent_any = True
-                    yield chunk
-            return
-        except (urllib.error.HTTPError, urllib.error.URLError) as exc:
-            if attempt == DEFAULT_RETRIES or sent_any:
-                if isinstance(exc, urllib.error.HTTPError):
-                    detail = exc.read().decode("utf-8", errors="replace")
-                    raise RuntimeError(
-                        f"OpenAI request failed: {exc.code} {exc.reason}\n{detail}"
-                    ) from exc
-                raise RuntimeError(f"OpenAI request failed: {exc}") from exc
-            time.sleep(2 ** (attempt - 1))
-    raise RuntimeError("OpenAI request failed after retries.")
-
-
-def _request_stream(url, payload, api_key, timeout=DEFAULT_TIMEOUT):
-    data = json.dumps(payload).encode("utf-8")
-    for attempt in range(1, DEFAULT_RETRIES + 1):
-        request = urllib.request.Request(
-            url,
-            data=data,
-            headers={
-                "Authorization": f"Bearer {api_key}",
-                "Content-Type": "application/json",
-                "Accept": "text/event-stream",
-            },
-            method="POST",
-        )
-        try:
-            with urllib.request.urlopen(request, timeout=timeout) as response:
-                for raw_line in response:
-                    line = raw_line.decode("utf-8", errors="replace").strip()
-                    if not line:
-                        continue
-                    if not line.startswith("data:"):
-                        continue
-                    payload_line = line[len("data:") :].strip()
-                    if payload_line == "[DONE]":
-                        return
-                    try:
-                        yield json.loads(payload_line)
-                    except json.JSONDecodeError:
-                        continue
-            return
-        except (urllib.error.HTTPError, urllib.error.URLError) as exc:
-            if attempt == DEFAULT_RETRIES:
-                if isinstance(exc, urllib.error.HTTPError):
-                    detail = exc.read().decode("utf-8", errors="replace")
-                    raise RuntimeError(
-                        f"OpenAI request failed: {exc.code} {exc.reason}\n{detail}"
-                    ) from exc
-                raise RuntimeError(f"OpenAI request failed: {exc}") from exc
-            time.sleep(2 ** (attempt - 1))
-    raise RuntimeError("OpenAI request failed after retries.")
+    return stream(
+        "POST",
+        api_url(path),
+        json.dumps(payload).encode("utf-8"),
+        _json_headers(api_key),
+        timeout=timeout,
+        attempts=DEFAULT_RETRIES,
+        chunk_size=chunk_size,
+    )
+
+
+def _request_stream(path, payload, api_key, timeout=DEFAULT_TIMEOUT):
+    lines = stream(
+        "POST",
+        api_url(path),
+        json.dumps(payload).encode("utf-8"),
+        _json_headers(api_key, Accept="text/event-stream"),
+        timeout=timeout,
+        attempts=DEFAULT_RETRIES,
+        tokens=estimate_tokens(payload),
+    )
+    return iter_sse(lines)
 
 
 def transcribe_audio(audio_bytes, *, filename, content_type, model, api_key):
@@ -194,30 +108,19 @@ def transcribe_audio(audio_bytes, *, filename, content_type, model, api_key):
     }
     files = [("file", filename, content_type, audio_bytes)]
     boundary, body = _encode_multipart(fields, files)
-    request = urllib.request.Request(
-        AUDIO_TRANSCRIPTIONS_URL,
-        data=body,
-        headers={
+    response = request(
+        "POST",
+        api_url(AUDIO_TRANSCRIPTIONS_PATH),
+        body,
+        {
             "Authorization": f"Bearer {api_key}",
             "Content-Type": f"multipart/form-data; boundary={boundary}",
         },
-        method="POST",
+        timeout=DEFAULT_TIMEOUT,
+        attempts=DEFAULT_RETRIES,
+        label="STT request",
     )
-    for attempt in range(1, DEFAULT_RETRIES + 1):
-        try:
-            with urllib.request.urlopen(request, timeout=DEFAULT_TIMEOUT) as response:
-                body = response.read().decode("utf-8")
-                return json.loads(body)
-        except (urllib.error.HTTPError, urllib.error.URLError) as exc:
-            if attempt == DEFAULT_RETRIES:
-                if isinstance(exc, urllib.error.HTTPError):
-                    detail = exc.read().decode("utf-8", errors="replace")
-                    raise RuntimeError(
-                        f"STT request failed: {exc.code} {exc.reason}\n{detail}"
-                    ) from exc
-                raise RuntimeError(f"STT request failed: {exc}") from exc
-            time.sleep(2 ** (attempt - 1))
-    raise RuntimeError("STT request failed after retries.")
+    return response.json()
 
 
 def _uses_max_completion_tokens(model):
@@ -296,7 +199,7 @@ def responses_create(
         payload["tools"] = tools
     if tool_choice:
         payload["tool_choice"] = tool_choice
-    return _request_json(RESPONSES_URL, payload, api_key)
+    return _request_json(RESPONSES_PATH, payload, api_key)
 
 
 def responses_create_stream(
@@ -314,7 +217,7 @@ def responses_create_stream(
         payload["tools"] = tools
     if tool_choice:
         payload["tool_choice"] = tool_choice
-    return _request_stream(RESPONSES_URL, payload, api_key)
+    return _request_stream(RESPONSES_PATH, payload, api_key)
 
 def chat_response(
     messages,
@@ -345,7 +248,7 @@ def chat_response(
         payload["tools"] = tools
     if tool_choice:
         payload["tool_choice"] = tool_choice
-    return _request_json(CHAT_COMPLETIONS_URL, payload, api_key)
+    return _request_json(CHAT_COMPLETIONS_PATH, payload, api_key)
 
 
 def chat_response_stream(
@@ -378,7 +281,7 @@ def chat_response_stream(
         payload["tools"] = tools
     if tool_choice:
         payload["tool_choice"] = tool_choice
-    return _request_stream(CHAT_COMPLETIONS_URL, payload, api_key)
+    return _request_stream(CHAT_COMPLETIONS_PATH, payload, api_key)
 
 
 def synthesize_speech(text, *, model, voice, response_format, api_key):
@@ -388,7 +291,7 @@ def synthesize_speech(text, *, model, voice, response_format, api_key):
         "voice": voice,
         "response_format": response_format,
     }
-    return _request_bytes(TTS_URL, payload, api_key)
+    return _request_bytes(TTS_PATH, payload, api_key)
 
 
 def synthesize_speech_stream(
@@ -401,7 +304,7 @@ def synthesize_speech_stream(
         "response_format": response_format,
     }
     return _request_bytes_stream(
-        TTS_URL, payload, api_key, chunk_size=chunk_size
+        TTS_PATH, payload, api_key, chunk_size=chunk_size
     )
 
 
@@ -0,0 +1,143 @@
+from pathlib import Path
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; the stats fall back to Pillow/pure Python.
+    np = None
+
+DEFAULT_KEY_TOLERANCE = 12
+
+# Thresholds per frame set: "frames" are generated keyframes (qc.qc_image),
+# "frames_dense" are interpolated frames (interpolate_pony_sprites).
+PROFILES = {
+    "frames": {"min_area": 0.12, "max_area": 0.9, "min_padding": 6, "padding_ratio": 0.012},
+    "frames_dense": {"min_area": 0.12, "max_area": 0.85, "min_padding": 8, "padding_ratio": 0.0},
+}
+
+
+def alpha_column_sums(alpha):
+    # Total alpha per column of an "L" image, which is all the facing check needs.
+    if np is not None:
+        return np.asarray(alpha, dtype=np.uint8).sum(axis=0, dtype=np.int64)
+    width = alpha.width
+    data = alpha.tobytes()
+    return [sum(data[x::width]) for x in range(width)]
+
+
+def needs_flip_from_columns(columns, threshold=0.02, balance_threshold=0.08):
+    # Alpha-weighted centroid left of centre (beyond `threshold` of the width),
+    # or noticeably more alpha on the left half, means the subject faces left.
+    width = len(columns)
+    half = (width + 1) // 2  # columns with x < width * 0.5
+    if np is not None:
+        columns = np.asarray(columns, dtype=np.int64)
+        total = int(columns.sum())
+        sum_x = int(columns @ np.arange(width, dtype=np.int64))
+        left_sum = int(columns[:half].sum())
+    else:
+        total = sum(columns)
+        sum_x = sum(x * value for x, value in enumerate(columns))
+        left_sum = sum(columns[:half])
+    right_sum = total - left_sum
+
+    if total == 0:
+        return False
+
+    center_x = sum_x / total
+    margin = width * threshold
+    if center_x < (width * 0.5 - margin):
+        return True
+    if right_sum == 0:
+        return False
+    return left_sum > right_sum * (1 + balance_threshold)
+
+
+def background_mask(pixels, tolerance=DEFAULT_KEY_TOLERANCE):
+    # Visible pixels within `tolerance` (summed RGB distance) of the average
+    # corner colour, for an (h, w, 4) uint8 array. Requires numpy.
+    corners = pixels[[0, 0, -1, -1], [0, -1, 0, -1], :3].astype(np.int64)
+    background = corners.sum(axis=0) // len(corners)
+    distance = np.abs(pixels[..., :3].astype(np.int64) - background).sum(axis=2)
+    return (pixels[..., 3] != 0) & (distance <= tolerance)
+
+
+def frame_stats(image, tolerance=DEFAULT_KEY_TOLERANCE):
+    # Everything the checks need, computed from one decoded frame.
+    mode = image.mode
+    rgba = image if mode == "RGBA" else image.convert("RGBA")
+    width, height = rgba.size
+    if np is not None:
+        pixels = np.asarray(rgba)
+        alpha = pixels[..., 3]
+        alpha_min, alpha_max = int(alpha.min()), int(alpha.max())
+        rows = np.flatnonzero(alpha.any(axis=1))
+        cols = np.flatnonzero(alpha.any(axis=0))
+        bbox = [int(cols[0]), int(rows[0]), int(cols[-1]) + 1, int(rows[-1]) + 1] if rows.size else None
+        columns = alpha.sum(axis=0, dtype=np.int64)
+        keyable = int(background_mask(pixels, tolerance).sum())
+    else:
+        alpha = rgba.getchannel("A")
+        alpha_min, alpha_max = alpha.getextrema()
+        bbox = alpha.getbbox()
+        bbox = list(bbox) if bbox else None
+        columns = alpha_column_sums(alpha)
+        keyable = None
+    return {
+        "mode": mode,
+        "size": [width, height],
+        "alpha": [alpha_min, alpha_max],
+        "bbox": bbox,
+        "needs_flip": needs_flip_from_columns(columns),
+        "keyable_pixels": keyable,
+    }
+
+
+def evaluate(stats, profile="frames"):
+    # Returns (ok, reason) with the messages generate_pony_sprites matches on.
+    limits = PROFILES[profile]
+    if stats["mode"] != "RGBA":
+        return False, f"Expected RGBA, got {stats['mode']}."
+    alpha_min, alpha_max = stats["alpha"]
+    if alpha_max == 0 or stats["bbox"] is None:
+        return False, "Empty frame (all transparent)."
+    if alpha_min == 255:
+        return False, "No transparent pixels detected."
+
+    width, height = stats["size"]
+    left, upper, right, lower = stats["bbox"]
+    area = (right - left) * (lower - upper)
+    total_area = width * height
+    if area < limits["min_area"] * total_area:
+        return False, "Subject area too small."
+    if area > limits["max_area"] * total_area:
+        return False, "Subject area too large."
+
+    padding = max(limits["min_padding"], int(width * limits["padding_ratio"]))
+    if left < padding or upper < padding:
+        return False, "Subject too close to top/left edge."
+    if (width - right) < padding or (height - lower) < padding:
+        return False, "Subject too close to bottom/right edge."
+    return True, "ok"
+
+
+def check_frame(path, profile="frames", tolerance=DEFAULT_KEY_TOLERANCE):
+    # Decodes the frame once and returns a JSON-ready report.
+    from PIL import Image
+
+    path = Path(path)
+    report = {"path": str(path), "profile": profile}
+    try:
+        with Image.open(path) as image:
+            image.load()
+            stats = frame_stats(image, tolerance)
+    except OSError as exc:
+        report.update({"ok": False, "reason": f"Unreadable frame: {exc}"})
+        return report
+    ok, reason = evaluate(stats, profile)
+    report.update({"ok": ok, "reason": reason}, **stats)
+    return report
+
+
+def qc_frame(path, profile="frames"):
+    report = check_frame(path, profile)
+    return report["ok"], report["reason"]
@@ -0,0 +1,97 @@
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+DEFAULT_CACHE_DIR = ROOT.parent / "pony_generated_assets" / "image_cache"
+DEFAULT_CACHE_MAX_BYTES = 2 * 1024 * 1024 * 1024
+
+
+def _env_enabled():
+    return os.getenv("IMAGES_API_CACHE", "1").strip().lower() not in ("0", "off", "false", "no")
+
+
+def cache_key(endpoint, fields, source_bytes=None):
+    payload = {"endpoint": endpoint, "fields": fields}
+    if source_bytes is not None:
+        payload["source_sha256"] = hashlib.sha256(source_bytes).hexdigest()
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class ImageCache:
+    # Content-addressed store for raw Images API output. Entries live in
+    # <dir>/<key[:2]>/<key>.png; reads touch mtime so eviction is LRU-ish.
+    def __init__(self, cache_dir=None, max_bytes=None, enabled=None):
+        self.cache_dir = Path(cache_dir or os.getenv("IMAGES_API_CACHE_DIR") or DEFAULT_CACHE_DIR)
+        self.max_bytes = int(max_bytes or os.getenv("IMAGES_API_CACHE_MAX_BYTES") or DEFAULT_CACHE_MAX_BYTES)
+        self.enabled = _env_enabled() if enabled is None else enabled
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "bypassed": 0, "stores": 0, "evictions": 0}
+
+    def get(self, key, use_cache=True):
+        if not self.enabled or not use_cache:
+            self._count("bypassed")
+            return None
+        path = self._path(key)
+        try:
+            data = path.read_bytes()
+        except OSError:
+            self._count("misses")
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self._count("hits")
+        return data
+
+    def put(self, key, data):
+        if not self.enabled:
+            return
+        path = self._path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            return
+        self._count("stores")
+        self._evict()
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats)
+
+    def _path(self, key):
+        return self.cache_dir / key[:2] / f"{key}.png"
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._stats[name] += amount
+
+    def _evict(self):
+        entries = []
+        total = 0
+        for path in self.cache_dir.glob("*/*.png"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+        evicted = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+            evicted += 1
+        if evicted:
+            self._count("evictions", evicted)
@@ -1,20 +1,27 @@
 import base64
-import json
 import os
 import time
-import urllib.error
-import urllib.request
+from io import BytesIO
 from pathlib import Path
 
+from scripts.openai_http import api_url, post_json, request
+
+from . import qc
+from .image_cache import ImageCache, cache_key
+
 ROOT = Path(__file__).resolve().parents[2]
 DEFAULT_ENV_PATH = ROOT / ".env"
-DEFAULT_API_URL = "https://api.openai.com/v1/images/generations"
-DEFAULT_EDIT_URL = "https://api.openai.com/v1/images/edits"
+GENERATIONS_PATH = "images/generations"
+EDITS_PATH = "images/edits"
 DEFAULT_MODEL = os.getenv("OPENAI_SPRITE_MODEL", "gpt-image-1")
 DEFAULT_TIMEOUT = 120
 DEFAULT_RETRIES = 3
 DEFAULT_WEBP_QUALITY = 85
 DEFAULT_WEBP_METHOD = 6
+DEFAULT_VARIANT_SIZES = (64, 128, 256, 512)
+VARIANT_SEPARATOR = "@"
+
+IMAGE_CACHE = ImageCache()
 
 
 def load_env_value(path, key):
@@ -98,6 +105,98 @@ def resize_image(path, target_size):
     _resize_image(path, target_size)
 
 
+def variant_path(path, size):
+    path = Path(path)
+    return path.with_name(f"{path.stem}{VARIANT_SEPARATOR}{size}.webp")
+
+
+def is_variant_path(path):
+    stem = Path(path).stem
+    base, separator, size = stem.rpartition(VARIANT_SEPARATOR)
+    return bool(base and separator and size.isdigit())
+
+
+def existing_variants(path):
+    # Variants already on disk for an asset, smallest first.
+    path = Path(path)
+    variants = []
+    for candidate in path.parent.glob(f"{path.stem}{VARIANT_SEPARATOR}*.webp"):
+        size = candidate.stem.rpartition(VARIANT_SEPARATOR)[2]
+        if size.isdigit():
+            variants.append({"size": int(size), "path": candidate})
+    return sorted(variants, key=lambda item: item["size"])
+
+
+def _webp_save_kwargs(quality, method, lossless):
+    save_kwargs = {
+        "format": "WEBP",
+        "quality": quality,
+        "method": method,
+    }
+    if lossless:
+        save_kwargs["lossless"] = True
+    return save_kwargs
+
+
+def save_webp(
+    image,
+    output_path,
+    *,
+    quality=DEFAULT_WEBP_QUALITY,
+    method=DEFAULT_WEBP_METHOD,
+    lossless=False,
+):
+    # Encodes an in-memory image straight to WebP (no intermediate PNG).
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+    image.save(output_path, **_webp_save_kwargs(quality, method, lossless))
+    return output_path
+
+
+def write_variants(
+    image,
+    output_path,
+    sizes=DEFAULT_VARIANT_SIZES,
+    *,
+    quality=DEFAULT_WEBP_QUALITY,
+    method=DEFAULT_WEBP_METHOD,
+    lossless=False,
+):
+    # Writes <stem>@<size>.webp for each ladder size smaller than the decoded
+    # image's longest side, resizing from the same in-memory image so the
+    # source is only decoded once. Returns [{"size", "path"}], smallest first.
+    from PIL import Image
+
+    resample = getattr(Image, "Resampling", Image).LANCZOS
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+    longest = max(image.size)
+    save_kwargs = _webp_save_kwargs(quality, method, lossless)
+    variants = []
+    for size in sorted({int(size) for size in sizes or ()}):
+        if size <= 0 or size >= longest:
+            continue
+        scale = size / longest
+        dimensions = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+        path = variant_path(output_path, size)
+        image.resize(dimensions, resample=resample).save(path, **save_kwargs)
+        variants.append({"size": size, "path": path})
+    return variants
+
+
+def generate_variants(path, sizes=DEFAULT_VARIANT_SIZES, **kwargs):
+    try:
+        from PIL import Image
+    except ImportError as exc:
+        raise RuntimeError("Pillow is required for WebP conversion.") from exc
+
+    with Image.open(path) as image:
+        image.load()
+        return write_variants(image, path, sizes, **kwargs)
+
+
 def convert_to_webp(
     source_path,
     output_path=None,
@@ -107,6 +206,7 @@ def convert_to_webp(
     method=DEFAULT_WEBP_METHOD,
     lossless=False,
     remove_source=True,
+    variants=None,
 ):
     try:
         from PIL import Image
@@ -128,53 +228,74 @@ def convert_to_webp(
         elif image.mode not in ("RGB", "RGBA"):
             has_alpha = "A" in image.getbands()
             image = image.convert("RGBA" if has_alpha else "RGB")
-        save_kwargs = {
-            "format": "WEBP",
-            "quality": quality,
-            "method": method,
-        }
-        if lossless:
-            save_kwargs["lossless"] = True
-        image.save(output_path, **save_kwargs)
+        image.save(output_path, **_webp_save_kwargs(quality, method, lossless))
+        if variants:
+            write_variants(image, output_path, variants, quality=quality, method=method, lossless=lossless)
 
     if remove_source:
         source_path.unlink(missing_ok=True)
     return output_path
 
 
+def process_image_bytes(
+    image_bytes,
+    output_path,
+    *,
+    target_size=None,
+    fix_transparency=False,
+    face_right=False,
+    png_path=None,
+    quality=DEFAULT_WEBP_QUALITY,
+    method=DEFAULT_WEBP_METHOD,
+    lossless=False,
+    variants=None,
+):
+    # Single-pass pipeline for API output: the bytes are decoded once, resized,
+    # fixed up and flip-checked in memory, then encoded straight to WebP (plus
+    # the variant ladder). The original PNG is written only when png_path is
+    # given, and then verbatim without a re-encode.
+    try:
+        from PIL import Image
+    except ImportError as exc:
+        raise RuntimeError("Pillow is required for WebP conversion.") from exc
+
+    output_path = Path(output_path)
+    if png_path:
+        png_path = Path(png_path)
+        png_path.parent.mkdir(parents=True, exist_ok=True)
+        png_path.write_bytes(image_bytes)
+
+    with Image.open(BytesIO(image_bytes)) as image:
+        image = image.convert("RGBA")
+    if target_size and image.size != (target_size, target_size):
+        resample = getattr(Image, "Resampling", Image).LANCZOS
+        image = image.resize((target_size, target_size), resample=resample)
+    if fix_transparency:
+        image, _ = qc.fix_transparency(image)
+    if face_right and qc.image_needs_horizontal_flip(image):
+        image = image.transpose(Image.FLIP_LEFT_RIGHT)
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    image.save(output_path, **_webp_save_kwargs(quality, method, lossless))
+    if variants:
+        write_variants(image, output_path, variants, quality=quality, method=method, lossless=lossless)
+    return output_path
+
+
 def _log(message):
     print(message, flush=True)
 
 
 def _request_images(payload, api_key):
-    request = urllib.request.Request(
-        DEFAULT_API_URL,
-        data=json.dumps(payload).encode("utf-8"),
-        headers={
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json",
-        },
-        method="POST",
+    response = post_json(
+        api_url(GENERATIONS_PATH),
+        payload,
+        api_key,
+        timeout=DEFAULT_TIMEOUT,
+        attempts=DEFAULT_RETRIES,
+        label="Images API request",
     )
-
-    for attempt in range(1, DEFAULT_RETRIES + 1):
-        try:
-            with urllib.request.urlopen(request, timeout=DEFAULT_TIMEOUT) as response:
-                body = response.read().decode("utf-8")
-                data = json.loads(body)
-                request_id = response.headers.get("x-request-id")
-                return data, request_id
-        except (urllib.error.HTTPError, urllib.error.URLError) as exc:
-            if attempt == DEFAULT_RETRIES:
-                if isinstance(exc, urllib.error.HTTPError):
-                    detail = exc.read().decode("utf-8", errors="replace")
-                    raise RuntimeError(
-                        f"Images API request failed: {exc.code} {exc.reason}\n{detail}"
-                    ) from exc
-                raise RuntimeError(f"Images API request failed: {exc}") from exc
-            time.sleep(2 ** (attempt - 1))
-
-    raise RuntimeError("Images API request failed after retries.")
+    return response.json(), response.headers.get("x-request-id")
 
 
 def _encode_multipart(fields, files):
@@ -218,41 +339,46 @@ def _guess_mime_type(path):
 
 def _request_edit(fields, files, api_key):
     boundary, body = _encode_multipart(fields, files)
-    request = urllib.request.Request(
-        DEFAULT_EDIT_URL,
-        data=body,
-        headers={
+    response = request(
+        "POST",
+        api_url(EDITS_PATH),
+        body,
+        {
             "Authorization": f"Bearer {api_key}",
             "Content-Type": f"multipart/form-data; boundary={boundary}",
         },
-        method="POST",
+        timeout=DEFAULT_TIMEOUT,
+        attempts=DEFAULT_RETRIES,
+        label="Images API edit",
     )
+    return response.json(), response.headers.get("x-request-id")
 
-    for attempt in range(1, DEFAULT_RETRIES + 1):
-        try:
-            with urllib.request.urlopen(request, timeout=DEFAULT_TIMEOUT) as response:
-                payload = response.read().decode("utf-8")
-                data = json.loads(payload)
-                request_id = response.headers.get("x-request-id")
-                return data, request_id
-        except (urllib.error.HTTPError, urllib.error.URLError) as exc:
-            if attempt == DEFAULT_RETRIES:
-                if isinstance(exc, urllib.error.HTTPError):
-                    detail = exc.read().decode("utf-8", errors="replace")
-                    raise RuntimeError(
-                        f"Images API edit failed: {exc.code} {exc.reason}\n{detail}"
-                    ) from exc
-                raise RuntimeError(f"Images API edit failed: {exc}") from exc
-            time.sleep(2 ** (attempt - 1))
-
-    raise RuntimeError("Images API edit failed after retries.")
-
-
-def generate_png(prompt, size, out_path):
-    api_key = ensure_api_key()
-    model = DEFAULT_MODEL
 
-    target_size = _parse_target_size(size)
+def cache_stats():
+    return IMAGE_CACHE.stats()
+
+
+def _write_png(out_path, image_bytes, target_size, model):
+    out_path = Path(out_path)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    out_path.write_bytes(image_bytes)
+    if target_size and is_gpt_image_model(model):
+        _resize_image(out_path, target_size)
+
+
+def _decode_image_data(data):
+    image_data = data.get("data", [])
+    if not image_data:
+        raise RuntimeError("Images API returned no image data.")
+
+    b64_json = image_data[0].get("b64_json")
+    if not b64_json:
+        raise RuntimeError("Images API response missing b64_json.")
+    return base64.b64decode(b64_json)
+
+
+def _generate_image_bytes(prompt, size, *, use_cache=True):
+    model = DEFAULT_MODEL
     size_value = _resolve_request_size(model, size)
 
     payload = {
@@ -267,28 +393,37 @@ def generate_png(prompt, size, out_path):
     else:
         payload["response_format"] = "b64_json"
 
-    data, request_id = _request_images(payload, api_key)
-    response_id = data.get("id")
     short_prompt = prompt if len(prompt) <= 140 else f"{prompt[:137]}..."
+    key = cache_key(api_url(GENERATIONS_PATH), payload)
+    image_bytes = IMAGE_CACHE.get(key, use_cache)
+    if image_bytes is not None:
+        _log(f"Images API cache hit key={key[:12]} prompt=\"{short_prompt}\"")
+        return image_bytes
+
+    data, request_id = _request_images(payload, ensure_api_key())
+    response_id = data.get("id")
     _log(f"Images API ok request_id={request_id} response_id={response_id} prompt=\"{short_prompt}\"")
 
-    image_data = data.get("data", [])
-    if not image_data:
-        raise RuntimeError("Images API returned no image data.")
+    image_bytes = _decode_image_data(data)
+    IMAGE_CACHE.put(key, image_bytes)
+    return image_bytes
 
-    b64_json = image_data[0].get("b64_json")
-    if not b64_json:
-        raise RuntimeError("Images API response missing b64_json.")
 
-    out_path = Path(out_path)
-    out_path.parent.mkdir(parents=True, exist_ok=True)
-    out_path.write_bytes(base64.b64decode(b64_json))
-    if target_size and is_gpt_image_model(model):
-        _resize_image(out_path, target_size)
+def generate_png(prompt, size, out_path, *, use_cache=True):
+    image_bytes = _generate_image_bytes(prompt, size, use_cache=use_cache)
+    _write_png(out_path, image_bytes, _parse_target_size(size), DEFAULT_MODEL)
+
+
+def generate_webp(prompt, size, output_path, *, target_size=None, use_cache=True, **options):
+    # Like generate_png() followed by convert_to_webp(), without the PNG
+    # round-trips; see process_image_bytes() for the options.
+    image_bytes = _generate_image_bytes(prompt, size, use_cache=use_cache)
+    if target_size is None and is_gpt_image_model(DEFAULT_MODEL):
+        target_size = _parse_target_size(size)
+    return process_image_bytes(image_bytes, output_path, target_size=target_size, **options)
 
 
-def generate_png_from_image(prompt, size, out_path, image_path):
-    api_key = ensure_api_key()
+def generate_png_from_image(prompt, size, out_path, image_path, *, use_cache=True):
     model = DEFAULT_MODEL
 
     target_size = _parse_target_size(size)
@@ -310,26 +445,24 @@ def generate_png_from_image(prompt, size, out_path, image_path):
         fields["response_format"] = "b64_json"
 
     mime_type = _guess_mime_type(image_path)
-    files = [("image", image_path.name, mime_type, image_path.read_bytes())]
+    source_bytes = image_path.read_bytes()
+    files = [("image", image_path.name, mime_type, source_bytes)]
 
-    data, request_id = _request_edit(fields, files, api_key)
-    response_id = data.get("id")
     short_prompt = prompt if len(prompt) <= 140 else f"{prompt[:137]}..."
+    key = cache_key(api_url(EDITS_PATH), dict(fields, mime_type=mime_type), source_bytes)
+    image_bytes = IMAGE_CACHE.get(key, use_cache)
+    if image_bytes is not None:
+        _log(f"Images API edit cache hit key={key[:12]} prompt=\"{short_prompt}\"")
+        _write_png(out_path, image_bytes, target_size, model)
+        return
+
+    data, request_id = _request_edit(fields, files, ensure_api_key())
+    response_id = data.get("id")
     _log(
         f"Images API edit ok request_id={request_id} response_id={response_id} "
         f"prompt=\"{short_prompt}\""
     )
 
-    image_data = data.get("data", [])
-    if not image_data:
-        raise RuntimeError("Images API returned no image data.")
-
-    b64_json = image_data[0].get("b64_json")
-    if not b64_json:
-        raise RuntimeError("Images API response missing b64_json.")
-
-    out_path = Path(out_path)
-    out_path.parent.mkdir(parents=True, exist_ok=True)
-    out_path.write_bytes(base64.b64decode(b64_json))
-    if target_size and is_gpt_image_model(model):
-        _resize_image(out_path, target_size)
+    image_bytes = _decode_image_data(data)
+    IMAGE_CACHE.put(key, image_bytes)
+    _write_png(out_path, image_bytes, target_size, model)
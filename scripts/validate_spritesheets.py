@@ -53,6 +53,10 @@ def main():
         if meta_image not in {"spritesheet.png", "spritesheet.webp"}:
             warnings.append(f"[{slug}] meta.image is {meta_image!r}")
 
+        for page in (meta.get("meta", {}).get("images") or [])[1:]:
+            if not (sheets_dir / page).exists():
+                errors.append(f"[{slug}] Missing spritesheet page {page}")
+
         frames = meta.get("frames", {})
         animations = meta.get("animations", {})
         idle_frames = animations.get("idle") or []
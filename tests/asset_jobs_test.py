@@ -0,0 +1,89 @@
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from scripts.pony_server.asset_jobs import AssetJobQueue
+from scripts.pony_server.asset_manifest import asset_manifest
+from scripts.pony_server.io import load_data, save_data
+
+
+class AssetJobQueueTest(unittest.TestCase):
+    def test_identical_in_flight_payloads_share_one_job(self):
+        release = threading.Event()
+        calls = []
+
+        def fake_generate(payload, progress=None):
+            calls.append(payload)
+            progress("requesting_image")
+            release.wait(5)
+            return {"id": "asset-1"}
+
+        queue = AssetJobQueue(workers=2, generate=fake_generate)
+        payload = {"type": "tile", "prompt": "mossy stone", "title": "Stone"}
+        first, first_dedup = queue.submit(payload)
+        second, second_dedup = queue.submit(dict(payload))
+        other, _ = queue.submit(dict(payload, prompt="sandy path"))
+        # Same prompt, different destination: a separate asset, so a separate job.
+        staged, staged_dedup = queue.submit(dict(payload, stage="approved"))
+        renamed, renamed_dedup = queue.submit(dict(payload, title="Other title"))
+        # keep_source changes what gets written (raw PNG + "source").
+        sourced, sourced_dedup = queue.submit(dict(payload, keep_source=True))
+        self.assertFalse(first_dedup)
+        self.assertTrue(second_dedup)
+        self.assertFalse(staged_dedup or renamed_dedup or sourced_dedup)
+        self.assertEqual(first["id"], second["id"])
+        self.assertEqual(len({first["id"], other["id"], staged["id"], renamed["id"], sourced["id"]}), 5)
+        release.set()
+        done = queue.wait(first["id"], timeout=5)
+        self.assertEqual(done["status"], "done")
+        self.assertEqual(done["requests"], 2)
+        self.assertEqual(done["asset"], {"id": "asset-1"})
+        self.assertEqual([event["stage"] for event in done["events"]], ["queued", "running", "requesting_image", "done"])
+        for job in (other, staged, renamed, sourced):
+            queue.wait(job["id"], timeout=5)
+        self.assertEqual(len(calls), 5)
+
+        records = list(queue.events(first["id"]))
+        self.assertEqual(records[-1]["type"], "status")
+        # Finished jobs stop coalescing, so a resubmit generates again.
+        _, dedup = queue.submit(payload)
+        self.assertFalse(dedup)
+
+    def test_validation_errors_are_reported_as_bad_request(self):
+        def fake_generate(payload, progress=None):
+            raise ValueError("Prompt text is required.")
+
+        queue = AssetJobQueue(workers=1, generate=fake_generate)
+        job, _ = queue.submit({"type": "tile", "prompt": ""})
+        job = queue.wait(job["id"], timeout=5)
+        self.assertEqual(job["status"], "failed")
+        self.assertEqual(job["error_kind"], "bad_request")
+
+    def test_concurrent_dry_runs_keep_every_manifest_entry(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            manifest_path = root / "manifest.json"
+            save_data(manifest_path, {"assets": []})
+            queue = AssetJobQueue(workers=4)
+            kwargs = {
+                "manifest_path": manifest_path,
+                "library_root": root / "library",
+                "generated_root": root / "generated",
+            }
+            jobs = [
+                queue.submit({"type": "tile", "prompt": f"tile {index}", "title": "Tile", "dry_run": True}, **kwargs)[0]
+                for index in range(6)
+            ]
+            for job in jobs:
+                self.assertEqual(queue.wait(job["id"], timeout=10)["status"], "done")
+            asset_manifest(manifest_path).compact()
+            slugs = sorted(entry["meta"]["slug"] for entry in load_data(manifest_path)["assets"])
+            self.assertEqual(slugs, sorted(["tile"] + [f"tile-{index}" for index in range(1, 6)]))
+
+
+if __name__ == "__main__":
+    unittest.main()
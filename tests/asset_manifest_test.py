@@ -0,0 +1,100 @@
+import json
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from scripts.pony_server.asset_manifest import AssetManifest, journal_path_for
+from scripts.pony_server.io import load_data, save_data
+
+
+def _entry(slug):
+    return {"id": f"adventure_map-tile-{slug}", "type": "tile", "meta": {"slug": slug}}
+
+
+class AssetManifestTest(unittest.TestCase):
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.path = Path(self._tmpdir.name) / "manifest.json"
+        save_data(self.path, {"schema_version": 2, "assets": [_entry("tile")]})
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def test_append_journals_without_rewriting_manifest(self):
+        manifest = AssetManifest(self.path)
+        before = self.path.read_bytes()
+        slug = manifest.reserve_slug("tile")
+        self.assertEqual(slug, "tile-1")
+        self.assertEqual(manifest.reserve_slug("tile"), "tile-2")
+        manifest.append(_entry(slug))
+        self.assertEqual(self.path.read_bytes(), before)
+        lines = [json.loads(line) for line in journal_path_for(self.path).read_text().splitlines()]
+        self.assertEqual([line.get("id") for line in lines if "id" in line], ["adventure_map-tile-tile-1"])
+        self.assertEqual([entry["meta"]["slug"] for entry in manifest.snapshot()["assets"]], ["tile", "tile-1"])
+
+    def test_compaction_folds_journal_into_manifest(self):
+        manifest = AssetManifest(self.path, compact_every=3)
+        for slug in ("a", "b", "c"):
+            manifest.append(_entry(slug))
+        self.assertEqual(journal_path_for(self.path).stat().st_size, 0)
+        data = load_data(self.path)
+        self.assertEqual(data["schema_version"], 2)
+        self.assertEqual([entry["meta"]["slug"] for entry in data["assets"]], ["tile", "a", "b", "c"])
+        self.assertFalse(manifest.compact())
+
+    def test_instances_sharing_a_manifest_lose_nothing(self):
+        first = AssetManifest(self.path, compact_every=7)
+        second = AssetManifest(self.path, compact_every=5)
+
+        def worker(manifest, prefix):
+            for index in range(20):
+                manifest.append(_entry(f"{prefix}-{index}"))
+
+        threads = [threading.Thread(target=worker, args=(m, p)) for m, p in ((first, "x"), (second, "y"))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        ids = [entry["id"] for entry in first.snapshot()["assets"]]
+        self.assertEqual(len(ids), 41)
+        self.assertEqual(len(set(ids)), 41)
+        self.assertEqual(sorted(ids), sorted(entry["id"] for entry in second.snapshot()["assets"]))
+        # The other instance's entries block slug reuse as well.
+        self.assertEqual(first.reserve_slug("y-0"), "y-0-1")
+
+    def test_reservations_are_shared_between_instances(self):
+        first = AssetManifest(self.path, compact_every=1)
+        second = AssetManifest(self.path)
+        self.assertEqual(first.reserve_slug("tree"), "tree")
+        self.assertEqual(second.reserve_slug("tree"), "tree-1")
+        # A compaction elsewhere keeps reservations that are still in flight.
+        first.append(_entry("rock"))
+        self.assertEqual(second.reserve_slug("tree"), "tree-2")
+        first.append(_entry("tree"))
+        with self.assertRaises(ValueError):
+            second.append(_entry("tree"))
+        second.append(_entry("tree-1"))
+        second.release_slug("tree-2")
+        self.assertEqual(first.reserve_slug("tree-2"), "tree-2")
+        ids = [entry["id"] for entry in AssetManifest(self.path).snapshot()["assets"]]
+        self.assertEqual(ids[1:], ["adventure_map-tile-rock", "adventure_map-tile-tree", "adventure_map-tile-tree-1"])
+
+    def test_reservations_from_dead_processes_expire(self):
+        AssetManifest(self.path).reserve_slug("tree")
+        self.assertEqual(AssetManifest(self.path).reserve_slug("tree"), "tree-1")
+        self.assertEqual(AssetManifest(self.path, reservation_seconds=-1).reserve_slug("tree"), "tree")
+
+    def test_entries_already_compacted_are_not_duplicated(self):
+        # Simulates a crash after manifest.json was replaced but before the
+        # journal was truncated.
+        journal_path_for(self.path).write_text('{"id": "adventure_map-tile-tile", "meta": {"slug": "tile"}}\n')
+        manifest = AssetManifest(self.path)
+        self.assertEqual(len(manifest.snapshot()["assets"]), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from scripts import build_asset_manifest
+from scripts.build_asset_manifest import ManifestCache, build_manifest
+
+
+class BuildAssetManifestTest(unittest.TestCase):
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmpdir.name)
+        self.library = self.root / "assets" / "library" / "maps"
+        self.tiles = self.library / "tilesets" / "packed" / "base"
+        self.sprites = self.library / "sprites" / "packed" / "base"
+        for directory, names in ((self.tiles, ("grass", "water")), (self.sprites, ("lantern",))):
+            directory.mkdir(parents=True)
+            for name in names:
+                (directory / f"{name}.webp").write_bytes(name.encode("utf-8"))
+        self.cache_path = self.root / "cache.json"
+        patcher = mock.patch.object(build_asset_manifest, "ROOT", self.root)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def _build(self):
+        cache = ManifestCache(self.cache_path)
+        manifest = build_manifest(self.library, cache)
+        cache.save()
+        return manifest, cache.stats
+
+    def test_cached_build_matches_full_scan(self):
+        cached, _ = self._build()
+        self.assertEqual(cached, build_manifest(self.library))
+        ids = [asset["id"] for asset in cached["assets"]]
+        self.assertIn("adventure_base-tile-grass", ids)
+        self.assertIn("adventure_base-sprite-lantern", ids)
+
+    def test_unchanged_library_reuses_every_group(self):
+        first, stats = self._build()
+        self.assertEqual(stats["hashed"], 3)
+        second, stats = self._build()
+        self.assertEqual(second, first)
+        self.assertEqual((stats["hashed"], stats["groups_rebuilt"]), (0, 0))
+
+    def test_only_the_affected_group_is_rebuilt(self):
+        self._build()
+        # Touching a file re-hashes it but keeps the group.
+        os.utime(self.tiles / "grass.webp", ns=(1, 1))
+        _, stats = self._build()
+        self.assertEqual((stats["hashed"], stats["groups_rebuilt"]), (1, 0))
+
+        (self.sprites / "bell.webp").write_bytes(b"bell")
+        manifest, stats = self._build()
+        self.assertEqual((stats["hashed"], stats["groups_rebuilt"]), (1, 1))
+        self.assertIn("adventure_base-sprite-bell", [asset["id"] for asset in manifest["assets"]])
+
+        (self.sprites / "bell.webp").unlink()
+        manifest, _ = self._build()
+        self.assertNotIn("adventure_base-sprite-bell", [asset["id"] for asset in manifest["assets"]])
+        files = json.loads(self.cache_path.read_text())["files"]
+        self.assertNotIn("/assets/library/maps/sprites/packed/base/bell.webp", files)
+
+    def test_variants_attach_to_their_asset(self):
+        (self.tiles / "grass@32.webp").write_bytes(b"small")
+        manifest, _ = self._build()
+        ids = [asset["id"] for asset in manifest["assets"]]
+        self.assertNotIn("adventure_base-tile-grass@32", ids)
+        grass = next(asset for asset in manifest["assets"] if asset["id"] == "adventure_base-tile-grass")
+        self.assertEqual(
+            grass["files"][0]["variants"],
+            [{"size": 32, "path": "/assets/library/maps/tilesets/packed/base/grass@32.webp"}],
+        )
+        water = next(asset for asset in manifest["assets"] if asset["id"] == "adventure_base-tile-water")
+        self.assertNotIn("variants", water["files"][0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,182 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from scripts import build_public
+
+
+class BuildPublicTest(unittest.TestCase):
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmpdir.name)
+        self.output = self.root / "public"
+        self.src = self.root / "src"
+        self.src.mkdir()
+        for name, text in (("a.json", "{}"), ("b.css", "body {}"), ("nested/c.js", "export {};")):
+            path = self.src / name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(text)
+        patcher = mock.patch.object(build_public, "ROOT", self.root)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def _plan(self):
+        plan = {}
+        build_public.add_tree(plan, self.src, "site")
+        return plan
+
+    def _sync(self, previous, link=False):
+        return build_public.sync_outputs(self._plan(), self.output, previous, jobs=4, link=link)
+
+    def test_second_build_rewrites_only_changed_files(self):
+        files, counts = self._sync({})
+        self.assertEqual(counts["copied"], 3)
+        untouched = self.output / "site" / "a.json"
+        mtime = untouched.stat().st_mtime_ns
+
+        (self.src / "b.css").write_text("body { color: red; }")
+        # Touching without changing content hashes but does not recopy.
+        os.utime(self.src / "nested" / "c.js", ns=(1, 1))
+        files, counts = self._sync(files)
+        self.assertEqual((counts["copied"], counts["unchanged"]), (1, 2))
+        self.assertEqual((self.output / "site" / "b.css").read_text(), "body { color: red; }")
+        self.assertEqual(untouched.stat().st_mtime_ns, mtime)
+
+        _, counts = self._sync(files)
+        self.assertEqual(counts["unchanged"], 3)
+
+    def test_existing_outputs_are_adopted_without_a_manifest(self):
+        self._sync({})
+        mtime = (self.output / "site" / "b.css").stat().st_mtime_ns
+        _, counts = self._sync({})
+        self.assertEqual(counts["unchanged"], 3)
+        self.assertEqual((self.output / "site" / "b.css").stat().st_mtime_ns, mtime)
+
+    def test_orphaned_outputs_are_removed(self):
+        files, _ = self._sync({})
+        (self.src / "nested" / "c.js").unlink()
+        (self.src / "nested").rmdir()
+        files, counts = self._sync(files)
+        self.assertEqual(counts["removed"], 1)
+        self.assertNotIn("site/nested/c.js", files)
+        self.assertFalse((self.output / "site" / "nested").exists())
+
+    def test_link_mode_hardlinks_outputs(self):
+        _, counts = self._sync({}, link=True)
+        self.assertEqual(counts["linked"], 3)
+        self.assertTrue((self.output / "site" / "a.json").samefile(self.src / "a.json"))
+
+    def test_manifest_is_ignored_for_another_output(self):
+        manifest = self.root / "build.json"
+        files, _ = self._sync({})
+        build_public.save_manifest(manifest, self.output, files)
+        self.assertEqual(build_public.load_manifest(manifest, self.output), files)
+        self.assertEqual(build_public.load_manifest(manifest, self.root / "elsewhere"), {})
+
+
+class FingerprintTest(unittest.TestCase):
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmpdir.name)
+        sheets = self.root / "assets" / "ponies" / "pip" / "sheets"
+        sheets.mkdir(parents=True)
+        (sheets / "spritesheet.webp").write_bytes(b"webp-v1")
+        (sheets / "spritesheet.json").write_text(
+            json.dumps({"meta": {"image": "spritesheet.png", "images": ["spritesheet.png"]}, "frames": {"idle_01": {}}})
+        )
+        (self.root / "data").mkdir()
+        (self.root / "data" / "ponies.json").write_text(
+            json.dumps(
+                {
+                    "ponies": [
+                        {
+                            "slug": "pip",
+                            "sprites": {
+                                "sheet": "assets/ponies/pip/sheets/spritesheet.webp",
+                                "meta": "/assets/ponies/pip/sheets/spritesheet.json",
+                            },
+                        }
+                    ]
+                }
+            )
+        )
+        (self.root / "_headers").write_text("/assets/js/*\n  Cache-Control: no-store\n")
+        patcher = mock.patch.object(build_public, "ROOT", self.root)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def _build(self):
+        plan, _ = build_public.build_plan()
+        hashed = build_public.apply_fingerprints(plan, {})
+        return plan, hashed
+
+    def test_references_point_at_hashed_copies(self):
+        plan, hashed = self._build()
+        sheet = hashed["assets/ponies/pip/sheets/spritesheet.webp"]
+        meta = hashed["assets/ponies/pip/sheets/spritesheet.json"]
+        self.assertRegex(sheet, r"^immutable/assets/ponies/pip/sheets/spritesheet\.[0-9a-f]{10}\.webp$")
+        self.assertEqual(plan[sheet], self.root / "assets" / "ponies" / "pip" / "sheets" / "spritesheet.webp")
+
+        sprites = json.loads(plan["data/ponies.json"])["ponies"][0]["sprites"]
+        self.assertEqual(sprites, {"sheet": sheet, "meta": f"/{meta}"})
+        sheet_meta = json.loads(plan[meta])["meta"]
+        # The PNG reference follows the WebP the bundle actually ships.
+        self.assertEqual(sheet_meta["images"], [sheet.rsplit("/", 1)[1]])
+        self.assertEqual(json.loads(plan["asset-manifest.json"])["files"], hashed)
+
+        headers = plan["_headers"].decode("utf-8")
+        self.assertTrue(headers.startswith("/assets/js/*\n  Cache-Control: no-store\n"))
+        self.assertIn("/immutable/*\n  Cache-Control: public, max-age=31536000, immutable\n", headers)
+        # Stable names stay in the bundle for paths the JS builds itself.
+        self.assertIn("assets/ponies/pip/sheets/spritesheet.webp", plan)
+
+    def test_extra_sheet_pages_ship_and_are_fingerprinted(self):
+        sheets = self.root / "assets" / "ponies" / "pip" / "sheets"
+        (sheets / "spritesheet-1.webp").write_bytes(b"page-1")
+        (sheets / "spritesheet.json").write_text(
+            json.dumps({"meta": {"image": "spritesheet.webp", "images": ["spritesheet.webp", "spritesheet-1.webp"]}})
+        )
+        plan, hashed = self._build()
+        self.assertIn("assets/ponies/pip/sheets/spritesheet-1.webp", plan)
+        page = hashed["assets/ponies/pip/sheets/spritesheet-1.webp"]
+        meta = json.loads(plan[hashed["assets/ponies/pip/sheets/spritesheet.json"]])["meta"]
+        self.assertEqual(meta["images"][1], page.rsplit("/", 1)[1])
+
+    def test_portrait_variants_ship_and_are_fingerprinted(self):
+        ponies = self.root / "assets" / "ponies"
+        (ponies / "pip.webp").write_bytes(b"portrait")
+        (ponies / "pip@64.webp").write_bytes(b"portrait-64")
+        data_path = self.root / "data" / "ponies.json"
+        data = json.loads(data_path.read_text())
+        data["ponies"][0]["portrait"] = {
+            "path": "assets/ponies/pip.webp",
+            "variants": [{"size": 64, "path": "assets/ponies/pip@64.webp"}],
+        }
+        data_path.write_text(json.dumps(data))
+        plan, hashed = self._build()
+        self.assertIn("assets/ponies/pip@64.webp", plan)
+        portrait = json.loads(plan["data/ponies.json"])["ponies"][0]["portrait"]
+        self.assertEqual(portrait["variants"][0]["path"], hashed["assets/ponies/pip@64.webp"])
+
+    def test_changed_image_changes_every_hash_that_embeds_it(self):
+        _, before = self._build()
+        (self.root / "assets" / "ponies" / "pip" / "sheets" / "spritesheet.webp").write_bytes(b"webp-v2")
+        _, after = self._build()
+        for key in before:
+            self.assertNotEqual(before[key], after[key])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+try:
+    from PIL import Image
+    from scripts import convert_assets_webp
+except (ImportError, SystemExit):
+    convert_assets_webp = None
+
+
+@unittest.skipIf(convert_assets_webp is None, "Pillow is not installed")
+class ConvertAssetsWebpTest(unittest.TestCase):
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.tmp = Path(self._tmpdir.name)
+        self.root = self.tmp / "assets"
+        (self.root / "icons").mkdir(parents=True)
+        for index, color in enumerate(("red", "green", "blue")):
+            Image.new("RGBA", (16, 16), color).save(self.root / "icons" / f"icon-{index}.png")
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def run_convert(self, *extra):
+        summary_path = self.tmp / "summary.json"
+        argv = [
+            "convert_assets_webp.py",
+            "--root", str(self.root),
+            "--manifest", str(self.tmp / "manifest.json"),
+            "--summary", str(summary_path),
+            "--jobs", "2",
+            *extra,
+        ]
+        with mock.patch.object(sys, "argv", argv), mock.patch("builtins.print"):
+            self.assertEqual(convert_assets_webp.main(), 0)
+        return json.loads(summary_path.read_text())
+
+    def test_reconverts_only_changed_sources_or_settings(self):
+        first = self.run_convert()
+        self.assertEqual((first["converted"], first["skipped"]), (3, 0))
+        self.assertTrue((self.root / "icons" / "icon-0.webp").exists())
+
+        second = self.run_convert()
+        self.assertEqual((second["converted"], second["skipped"]), (0, 3))
+
+        Image.new("RGBA", (16, 16), "white").save(self.root / "icons" / "icon-1.png")
+        third = self.run_convert()
+        self.assertEqual((third["converted"], third["skipped"]), (1, 2))
+
+        fourth = self.run_convert("--quality", "60")
+        self.assertEqual(fourth["converted"], 3)
+        self.assertEqual(fourth["settings"]["quality"], 60)
+
+    def test_touched_source_is_rehashed_not_reencoded(self):
+        self.run_convert("--jobs", "1")
+        source = self.root / "icons" / "icon-0.png"
+        source.write_bytes(source.read_bytes())
+        summary = self.run_convert("--jobs", "1")
+        self.assertEqual((summary["converted"], summary["skipped"]), (0, 3))
+        self.assertEqual(summary["planned"], 1)
+
+    def test_existing_webp_without_manifest_is_adopted(self):
+        Image.new("RGBA", (16, 16), "red").save(self.root / "icons" / "icon-0.webp", format="WEBP")
+        summary = self.run_convert()
+        self.assertEqual((summary["converted"], summary["adopted"]), (2, 1))
+        forced = self.run_convert("--force")
+        self.assertEqual(forced["converted"], 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
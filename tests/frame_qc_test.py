@@ -0,0 +1,130 @@
+import json
+import random
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+try:
+    from PIL import Image
+except ImportError:  # pragma: no cover - optional dependency
+    Image = None
+
+from scripts.sprites import frame_qc, qc
+
+if Image is not None:
+    from scripts import qc_sprites
+
+
+def _frame(box, size=(128, 128), color=(200, 80, 40, 255)):
+    image = Image.new("RGBA", size, (0, 0, 0, 0))
+    if box:
+        image.paste(color, box)
+    return image
+
+
+@unittest.skipIf(Image is None, "Pillow is not installed")
+class FrameQcTest(unittest.TestCase):
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.tmp = Path(self._tmpdir.name)
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def _save(self, image, name):
+        path = self.tmp / name
+        image.save(path)
+        return path
+
+    def test_verdicts_per_profile(self):
+        cases = {
+            "ok.png": (_frame((30, 30, 100, 110)), True, "ok"),
+            "empty.png": (_frame(None), False, "Empty frame (all transparent)."),
+            "opaque.png": (_frame((0, 0, 128, 128)), False, "No transparent pixels detected."),
+            "small.png": (_frame((40, 40, 50, 50)), False, "Subject area too small."),
+            "large.png": (_frame((2, 2, 126, 126)), False, "Subject area too large."),
+            "left.png": (_frame((3, 30, 80, 110)), False, "Subject too close to top/left edge."),
+            "rgb.png": (Image.new("RGB", (128, 128)), False, "Expected RGBA, got RGB."),
+        }
+        for name, (image, ok, reason) in cases.items():
+            path = self._save(image, name)
+            self.assertEqual(qc.qc_image(path), (ok, reason), name)
+        # 7px of padding passes for keyframes but not interpolated frames.
+        path = self._save(_frame((7, 30, 90, 110)), "tight.png")
+        self.assertEqual(frame_qc.qc_frame(path, "frames"), (True, "ok"))
+        self.assertEqual(frame_qc.qc_frame(path, "frames_dense"), (False, "Subject too close to top/left edge."))
+        report = frame_qc.check_frame(self.tmp / "missing.png")
+        self.assertFalse(report["ok"])
+        self.assertTrue(report["reason"].startswith("Unreadable frame"))
+
+    def test_numpy_and_fallback_stats_agree(self):
+        if frame_qc.np is None:
+            self.skipTest("numpy is not installed")
+        rng = random.Random(7)
+        for _ in range(40):
+            image = _frame(None, (rng.choice([9, 64]), rng.choice([9, 48])))
+            for _ in range(rng.randint(0, 4)):
+                x0, y0 = rng.randrange(image.width), rng.randrange(image.height)
+                box = (x0, y0, min(image.width, x0 + rng.randint(1, 30)), min(image.height, y0 + rng.randint(1, 30)))
+                image.paste((rng.randint(0, 255), 20, 30, rng.randint(1, 255)), box)
+            stats = frame_qc.frame_stats(image)
+            with mock.patch.object(frame_qc, "np", None):
+                fallback = frame_qc.frame_stats(image)
+            self.assertIsNone(fallback.pop("keyable_pixels"))
+            stats.pop("keyable_pixels")
+            self.assertEqual(stats, fallback)
+
+    def test_vectorized_keying_matches_the_pixel_loop(self):
+        if frame_qc.np is None:
+            self.skipTest("numpy is not installed")
+        image = Image.new("RGBA", (40, 30), (250, 250, 250, 255))
+        image.paste((246, 252, 249, 255), (0, 0, 10, 10))
+        image.paste((30, 60, 200, 255), (12, 8, 30, 25))
+        image.paste((250, 250, 250, 0), (32, 0, 40, 5))
+        keyed, changed = qc.fix_transparency(image.copy())
+        with mock.patch.object(frame_qc, "np", None):
+            expected, expected_changed = qc.fix_transparency(image.copy())
+        self.assertEqual((changed, keyed.tobytes()), (expected_changed, expected.tobytes()))
+        stats = frame_qc.frame_stats(image)
+        self.assertEqual(stats["keyable_pixels"], 40 * 30 - 18 * 17 - 8 * 5)
+
+
+@unittest.skipIf(Image is None, "Pillow is not installed")
+class QcSpritesCliTest(unittest.TestCase):
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmpdir.name)
+        patcher = mock.patch.object(qc_sprites, "ROOT", self.root)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        pony = self.root / "assets" / "ponies" / "pip"
+        (pony / "frames").mkdir(parents=True)
+        (pony / "frames_dense").mkdir()
+        _frame((30, 30, 100, 110)).save(pony / "frames" / "idle_01.png")
+        _frame((5, 30, 60, 110)).save(pony / "frames" / "idle_02.png")
+        _frame((7, 30, 90, 110)).save(pony / "frames_dense" / "idle_01.png")
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def test_writes_one_report_for_every_frame(self):
+        report_path = self.root / "report.json"
+        argv = ["qc_sprites.py", "--jobs", "1", "--report", str(report_path)]
+        with mock.patch.object(sys, "argv", argv), mock.patch("builtins.print"):
+            self.assertEqual(qc_sprites.main(), 1)
+        report = json.loads(report_path.read_text())
+        summary = report["summary"]
+        self.assertEqual((summary["frames"], summary["passed"], summary["failed"]), (3, 1, 2))
+        self.assertEqual(summary["needs_flip"], 2)
+        self.assertEqual(summary["by_reason"], {"Subject too close to top/left edge.": 2})
+        frames = {frame["path"]: frame for frame in report["ponies"]["pip"]["frames"]}
+        self.assertEqual(frames["assets/ponies/pip/frames_dense/idle_01.png"]["profile"], "frames_dense")
+        self.assertEqual(frames["assets/ponies/pip/frames/idle_01.png"]["bbox"], [30, 30, 100, 110])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,20 @@
+import test from "node:test";
+import assert from "node:assert/strict";
+
+import { pickImageVariant } from "../assets/js/utils.js";
+
+const portrait = {
+  path: "assets/ponies/pip.webp",
+  variants: [
+    { size: 128, path: "assets/ponies/pip@128.webp" },
+    { size: 64, path: "assets/ponies/pip@64.webp" },
+  ],
+};
+
+test("pickImageVariant returns the smallest variant covering the display size", () => {
+  assert.equal(pickImageVariant(portrait, 46), "assets/ponies/pip@64.webp");
+  assert.equal(pickImageVariant(portrait, 46, 2), "assets/ponies/pip@128.webp");
+  assert.equal(pickImageVariant(portrait, 46, 3), "assets/ponies/pip.webp");
+  assert.equal(pickImageVariant({ path: "a.webp" }, 46), "a.webp");
+  assert.equal(pickImageVariant(null, 46), "");
+});
@@ -0,0 +1,58 @@
+import base64
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from scripts.sprites import images_api
+from scripts.sprites.image_cache import ImageCache, cache_key
+
+
+class ImageCacheTest(unittest.TestCase):
+    def test_key_covers_fields_and_source_bytes(self):
+        fields = {"model": "gpt-image-1", "prompt": "pony", "size": "1024x1024"}
+        key = cache_key("generations", fields)
+        self.assertEqual(key, cache_key("generations", dict(fields)))
+        self.assertNotEqual(key, cache_key("generations", dict(fields, prompt="pony!")))
+        self.assertNotEqual(cache_key("edits", fields, b"a"), cache_key("edits", fields, b"b"))
+
+    def test_hits_misses_bypass_and_eviction(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache = ImageCache(tmpdir, max_bytes=10, enabled=True)
+            self.assertIsNone(cache.get("aa11"))
+            cache.put("aa11", b"123456")
+            self.assertEqual(cache.get("aa11"), b"123456")
+            self.assertIsNone(cache.get("aa11", use_cache=False))
+            cache.put("bb22", b"789012")
+            self.assertIsNone(cache.get("aa11"))
+            self.assertEqual(
+                cache.stats(),
+                {"hits": 1, "misses": 2, "bypassed": 1, "stores": 2, "evictions": 1},
+            )
+
+    def test_generate_png_reuses_cached_response(self):
+        png = base64.b64decode(
+            "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAQAAAC1HAwCAAAAC0lEQVR4nGNgYAAAAAMAASsJTYQAAAAASUVORK5CYII="
+        )
+        response = ({"data": [{"b64_json": base64.b64encode(png).decode("ascii")}]}, "req-1")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache = ImageCache(Path(tmpdir) / "cache", enabled=True)
+            out_path = Path(tmpdir) / "out.png"
+            with mock.patch.object(images_api, "IMAGE_CACHE", cache), mock.patch.object(
+                images_api, "_request_images", return_value=response
+            ) as request, mock.patch.object(images_api, "ensure_api_key", return_value="key"), mock.patch.object(
+                images_api, "_resize_image"
+            ):
+                images_api.generate_png("a pony", 64, out_path)
+                images_api.generate_png("a pony", 64, out_path)
+                images_api.generate_png("a pony", 64, out_path, use_cache=False)
+            self.assertEqual(request.call_count, 2)
+            self.assertEqual(out_path.read_bytes(), png)
+            self.assertEqual(cache.stats()["hits"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+import json
+import sys
+from io import BytesIO
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+try:
+    from PIL import Image
+except ImportError:  # pragma: no cover - optional dependency
+    Image = None
+
+if Image is not None:
+    from scripts import generate_image_variants
+    from scripts.sprites import images_api
+
+
+@unittest.skipIf(Image is None, "Pillow is not installed")
+class ImageVariantsTest(unittest.TestCase):
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmpdir.name)
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def test_convert_writes_ladder_from_one_decode(self):
+        source = self.root / "pip.png"
+        Image.new("RGBA", (300, 150), (200, 100, 50, 255)).save(source)
+        output = self.root / "pip.webp"
+        with mock.patch.object(Image, "open", wraps=Image.open) as opened:
+            images_api.convert_to_webp(source, output, variants=(64, 128, 256, 512), remove_source=False)
+        self.assertEqual(opened.call_count, 1)
+
+        variants = images_api.existing_variants(output)
+        # Sizes at or above the longest side are skipped; aspect is kept.
+        self.assertEqual([variant["size"] for variant in variants], [64, 128, 256])
+        with Image.open(variants[0]["path"]) as image:
+            self.assertEqual(image.size, (64, 32))
+        self.assertTrue(images_api.is_variant_path(variants[0]["path"]))
+        self.assertFalse(images_api.is_variant_path(output))
+
+    def test_pipeline_writes_webp_from_response_bytes(self):
+        # A left-facing subject on a flat background.
+        image = Image.new("RGB", (256, 256), (240, 240, 240))
+        image.paste((20, 40, 200), (10, 60, 100, 200))
+        buffer = BytesIO()
+        image.save(buffer, format="PNG")
+        output = self.root / "lib" / "pip.webp"
+        with mock.patch.object(Image, "open", wraps=Image.open) as opened:
+            images_api.process_image_bytes(
+                buffer.getvalue(),
+                output,
+                target_size=128,
+                fix_transparency=True,
+                face_right=True,
+                variants=(64,),
+            )
+        self.assertEqual(opened.call_count, 1)
+        self.assertEqual(list(self.root.rglob("*.png")), [])
+        with Image.open(output) as result:
+            self.assertEqual(result.size, (128, 128))
+            result = result.convert("RGBA")
+            self.assertEqual(result.getpixel((2, 2))[3], 0)
+            # Flipped: the subject now sits on the right half.
+            self.assertGreater(result.getpixel((100, 64))[3], 200)
+            self.assertEqual(result.getpixel((20, 64))[3], 0)
+        self.assertEqual([variant["size"] for variant in images_api.existing_variants(output)], [64])
+
+        source = self.root / "raw" / "pip.png"
+        images_api.process_image_bytes(buffer.getvalue(), output, png_path=source)
+        self.assertEqual(source.read_bytes(), buffer.getvalue())
+
+    def test_stage_regenerates_stale_ladders_and_records_portraits(self):
+        portraits = self.root / "ponies"
+        portraits.mkdir()
+        portrait = portraits / "pip.webp"
+        Image.new("RGB", (256, 256), (10, 20, 30)).save(portrait, format="WEBP")
+        images_api.generate_variants(portrait, (64, 512))
+        self.assertTrue(generate_image_variants.is_current(portrait, [64, 512]))
+        self.assertFalse(generate_image_variants.is_current(portrait, [64, 128]))
+
+        result = generate_image_variants.build_variants(
+            {"path": str(portrait), "sizes": [64, 128], "quality": 80, "method": 4, "lossless": False}
+        )
+        self.assertEqual(result["sizes"], [64, 128])
+        self.assertTrue(generate_image_variants.is_current(portrait, [64, 128]))
+        self.assertEqual(generate_image_variants.collect_assets(portraits, self.root / "missing", []), [portrait])
+
+        ponies_path = self.root / "ponies.json"
+        ponies_path.write_text(json.dumps({"ponies": [{"slug": "pip"}, {"slug": "nobody"}]}))
+        with mock.patch.object(generate_image_variants, "ROOT", self.root):
+            self.assertTrue(generate_image_variants.record_portraits(ponies_path, portraits))
+            self.assertFalse(generate_image_variants.record_portraits(ponies_path, portraits))
+        ponies = json.loads(ponies_path.read_text())["ponies"]
+        self.assertEqual(
+            ponies[0]["portrait"],
+            {
+                "path": "ponies/pip.webp",
+                "variants": [
+                    {"size": 64, "path": "ponies/pip@64.webp"},
+                    {"size": 128, "path": "ponies/pip@128.webp"},
+                ],
+            },
+        )
+        self.assertNotIn("portrait", ponies[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+import hashlib
+import random
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from scripts.pony_server import map_refine
+from scripts.pony_server.map_refine import iter_refine_rows, pyramid_levels, refine_map, refine_pyramid
+from scripts.pony_server.refine_cache import RefineCache, refine_cache_key
+
+LEGEND = {
+    "G": {"terrain": "grass"},
+    "W": {"terrain": "water"},
+    "F": {"terrain": "forest"},
+    "R": {"terrain": "road"},
+    "M": {"terrain": "mountain"},
+}
+
+
+def random_intent(rng, width, height):
+    return ["".join(rng.choice("GWFRM") for _ in range(width)) for _ in range(height)]
+
+
+def legacy_noise(seed, bx, by, lx, ly):
+    digest = hashlib.sha256(f"{seed}:{bx}:{by}:{lx}:{ly}".encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") / 18446744073709551616
+
+
+class MapRefineTest(unittest.TestCase):
+    def test_sha256_mode_uses_legacy_noise(self):
+        self.assertEqual(map_refine._noise("seed", 1, 2, 3, 4), legacy_noise("seed", 1, 2, 3, 4))
+        rows = random_intent(random.Random(3), 6, 5)
+        strict = refine_map(rows, LEGEND, (6, 5), (36, 30), "seed", noise="sha256", vectorized=False)
+        counter = refine_map(rows, LEGEND, (6, 5), (36, 30), "seed", vectorized=False)
+        self.assertEqual(len(strict["layers"]["terrain"]), 30)
+        self.assertNotEqual(strict["layers"]["terrain"], counter["layers"]["terrain"])
+
+    def test_rejects_unknown_noise_mode(self):
+        with self.assertRaises(ValueError):
+            refine_map(["G"], LEGEND, (1, 1), (2, 2), "seed", noise="xorshift")
+
+    @unittest.skipIf(map_refine.np is None, "numpy not installed")
+    def test_vectorized_matches_python(self):
+        rng = random.Random(11)
+        for _ in range(20):
+            width, height = rng.randint(1, 9), rng.randint(1, 9)
+            scale_x, scale_y = rng.randint(1, 6), rng.randint(1, 6)
+            rows = random_intent(rng, width, height)
+            target = (width * scale_x, height * scale_y)
+            for noise in map_refine.NOISE_MODES:
+                expected = refine_map(rows, LEGEND, (width, height), target, "s", noise=noise, vectorized=False)
+                actual = refine_map(rows, LEGEND, (width, height), target, "s", noise=noise, vectorized=True)
+                self.assertEqual(actual, expected)
+
+    def test_banded_workers_match_serial(self):
+        rows = random_intent(random.Random(5), 8, 8)
+        original = map_refine.MIN_BAND_ROWS
+        map_refine.MIN_BAND_ROWS = 8
+        try:
+            serial = refine_map(rows, LEGEND, (8, 8), (32, 40), "band", vectorized=False)
+            banded = refine_map(rows, LEGEND, (8, 8), (32, 40), "band", vectorized=False, workers=3)
+        finally:
+            map_refine.MIN_BAND_ROWS = original
+        self.assertEqual(banded, serial)
+
+    def test_streamed_bands_match_full_refinement(self):
+        rows = random_intent(random.Random(13), 6, 6)
+        full = refine_map(rows, LEGEND, (6, 6), (30, 42), "stream", vectorized=False)
+        bands = list(iter_refine_rows(rows, LEGEND, (6, 6), (30, 42), "stream", vectorized=False, band_rows=8))
+        self.assertEqual([start for start, _ in bands], [0, 8, 16, 24, 32, 40])
+        self.assertEqual([row for _, band in bands for row in band], full["layers"]["terrain"])
+
+    def test_pyramid_levels_step_by_two(self):
+        self.assertEqual(pyramid_levels((4, 4), (32, 32)), [(8, 8), (16, 16), (32, 32)])
+        self.assertEqual(pyramid_levels((4, 4), (48, 24)), [(8, 8), (16, 8), (48, 24)])
+        self.assertEqual(pyramid_levels((4, 4), (4, 4)), [])
+
+    def test_pyramid_resumes_from_intermediate_level(self):
+        rows = random_intent(random.Random(9), 4, 4)
+        levels = {}
+        full = refine_pyramid(rows, LEGEND, (4, 4), (64, 64), "p", on_level=lambda level, result: levels.update({level: result}))
+        self.assertEqual(sorted(levels), [(8, 8), (16, 16), (32, 32), (64, 64)])
+        start = ((16, 16), levels[(16, 16)]["layers"]["terrain"])
+        resumed = refine_pyramid(rows, LEGEND, (4, 4), (64, 64), "p", start=start)
+        self.assertEqual(resumed, full)
+        sibling = refine_pyramid(rows, LEGEND, (4, 4), (32, 32), "p")
+        self.assertEqual(sibling, levels[(32, 32)])
+
+
+class RefineCacheTest(unittest.TestCase):
+    def test_key_covers_every_input(self):
+        args = (["GG"], LEGEND, (2, 1), (4, 2), "seed", [], "counter")
+        key = refine_cache_key(*args)
+        self.assertEqual(key, refine_cache_key(*args))
+        self.assertNotEqual(key, refine_cache_key(["GW"], *args[1:]))
+        self.assertNotEqual(key, refine_cache_key(*args[:4], "other", *args[5:]))
+        self.assertNotEqual(key, refine_cache_key(*args[:5], [{"text": "lake"}], "counter"))
+        self.assertNotEqual(key, refine_cache_key(*args[:6], "sha256"))
+
+    def test_memory_and_disk_tiers(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = RefineCache(tmp, memory_bytes=1024, disk_bytes=1024)
+            cache.put("a", {"rows": ["GG"]})
+            self.assertEqual(cache.get("a"), ({"rows": ["GG"]}, "memory"))
+            self.assertEqual(RefineCache(tmp).get("a"), ({"rows": ["GG"]}, "disk"))
+            self.assertEqual(cache.get("missing"), (None, None))
+
+    def test_evicts_oldest_entries_past_size_bound(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = RefineCache(tmp, memory_bytes=60, disk_bytes=60)
+            for key in ("a", "b", "c"):
+                cache.put(key, {"rows": ["G" * 16]})
+            self.assertNotIn("a", cache._memory)
+            self.assertFalse((Path(tmp) / "a.json").exists())
+            self.assertEqual(cache.get("c")[1], "memory")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import random
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from scripts.pony_server import map_regions
+from scripts.pony_server.map_regions import RegionLabeler, build_decor_rules, label_regions
+
+def _flood_fill_areas(rows):
+    seen = set()
+    areas = []
+    for y, row in enumerate(rows):
+        for x in range(len(row)):
+            if (x, y) in seen:
+                continue
+            seen.add((x, y))
+            stack, area = [(x, y)], 0
+            while stack:
+                cx, cy = stack.pop()
+                area += 1
+                for nx, ny in ((cx + 1, cy), (cx - 1, cy), (cx, cy + 1), (cx, cy - 1)):
+                    if 0 <= ny < len(rows) and 0 <= nx < len(rows[ny]) and (nx, ny) not in seen and rows[ny][nx] == row[x]:
+                        seen.add((nx, ny))
+                        stack.append((nx, ny))
+            areas.append(area)
+    return areas
+
+
+LEGEND = {"G": {"terrain": "grass"}, "F": {"terrain": "forest"}, "W": {"terrain": "water"}}
+
+
+class MapRegionsTest(unittest.TestCase):
+    def test_labels_connected_regions_with_stats(self):
+        rows = [
+            "FFGW",
+            "GFGW",
+            "FFGG",
+            "GGGW",
+        ]
+        regions = label_regions(rows, LEGEND, masks=True, min_area=1)
+        by_id = {region["id"]: region for region in regions}
+        self.assertEqual([region["id"] for region in regions], ["forest-1", "grass-1", "water-1", "grass-2", "water-2"])
+        forest = by_id["forest-1"]
+        self.assertEqual(forest["area"], 5)
+        self.assertEqual(forest["bounds"], {"x": 0, "y": 0, "w": 2, "h": 3})
+        self.assertEqual(forest["centroid"], [0.6, 1.0])
+        self.assertEqual(forest["mask"], [[0, 0, 2], [1, 1, 1], [2, 0, 2]])
+        # The grass column joins the bottom row; the grass cell walled in by forest stays separate.
+        self.assertEqual(by_id["grass-1"]["area"], 7)
+        self.assertEqual(by_id["grass-1"]["bounds"], {"x": 0, "y": 0, "w": 4, "h": 4})
+        self.assertEqual(by_id["grass-2"]["area"], 1)
+
+    def test_incremental_feed_matches_full_grid(self):
+        rows = ["FGFGFG", "FFFGGG", "WWFGWW", "FWWWWF", "FFFFFF"]
+        labeler = RegionLabeler(LEGEND)
+        for start in range(0, len(rows), 2):
+            labeler.feed(rows[start : start + 2])
+        self.assertEqual(labeler.regions(min_area=1), label_regions(rows, LEGEND, min_area=1))
+
+    def test_vectorized_and_python_labeling_agree(self):
+        rng = random.Random(5)
+        for _ in range(30):
+            width, height = rng.randint(1, 24), rng.randint(1, 24)
+            rows = ["".join(rng.choice("GGFW") for _ in range(width)) for _ in range(height)]
+            expected = label_regions(rows, LEGEND, masks=True, min_area=1, vectorized=False)
+            self.assertEqual(sorted(region["area"] for region in expected), sorted(_flood_fill_areas(rows)))
+            if map_regions.np is not None:
+                self.assertEqual(label_regions(rows, LEGEND, masks=True, min_area=1, vectorized=True), expected)
+
+    def test_labels_grow_with_regions_not_runs(self):
+        # 200 rows of 32 stripes: 6400 runs, but only 32 labels.
+        rows = ["GF" * 16] * 200
+        for vectorized in (False, True):
+            labeler = RegionLabeler(LEGEND, vectorized=vectorized)
+            labeler.feed(rows)
+            self.assertEqual(labeler._count, 32)
+            self.assertEqual(len(labeler.regions()), 32)
+
+    def test_decor_rules_group_large_regions(self):
+        rows = ["F" * 8] * 4 + ["G" * 8]
+        regions = label_regions(rows, LEGEND)
+        rules = build_decor_rules(regions)
+        self.assertEqual(len(rules), 1)
+        self.assertEqual(rules[0]["type"], "tree_cluster")
+        self.assertEqual(rules[0]["regions"], ["forest-1"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+try:
+    from PIL import Image
+except ImportError:  # pragma: no cover - optional dependency
+    Image = None
+
+from scripts.pony_server.mission_atlas import build_mission_atlas, pack_shelves
+
+
+class PackShelvesTest(unittest.TestCase):
+    def test_frames_never_overlap_and_spill_onto_new_pages(self):
+        sizes = [(30, 30), (60, 20), (30, 40), (50, 50), (10, 10)]
+        placements, pages = pack_shelves(sizes, 64, 2)
+        self.assertGreater(len(pages), 1)
+        boxes = {}
+        for (width, height), (page, x, y) in zip(sizes, placements):
+            page_w, page_h = pages[page]
+            self.assertGreaterEqual(min(x, y), 2)
+            self.assertLessEqual(x + width + 2, page_w)
+            self.assertLessEqual(y + height + 2, page_h)
+            for other in boxes.get(page, []):
+                ox, oy, ow, oh = other
+                overlaps = x < ox + ow and ox < x + width and y < oy + oh and oy < y + height
+                self.assertFalse(overlaps)
+            boxes.setdefault(page, []).append((x, y, width, height))
+
+    def test_oversized_frame_is_rejected(self):
+        with self.assertRaises(ValueError):
+            pack_shelves([(63, 10)], 64, 1)
+
+
+@unittest.skipIf(Image is None, "Pillow is not installed")
+class BuildMissionAtlasTest(unittest.TestCase):
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmpdir.name)
+        self.assets = self.root / "adventures"
+        (self.assets / "tiles").mkdir(parents=True)
+        Image.new("RGBA", (64, 64), (0, 200, 0, 255)).save(self.assets / "tiles" / "grass.png")
+        Image.new("RGBA", (512, 256), (200, 0, 0, 255)).save(self.assets / "tiles" / "barn.png")
+        self.out_dir = self.root / "mission"
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def test_writes_pages_and_index(self):
+        tiles = [{"id": 1, "asset": "tiles/grass.png"}, {"id": 2, "asset": "/adventures/tiles/grass.png"}]
+        objects = [{"type": "barn", "asset": "tiles/barn.png"}, {"type": "ghost", "asset": "tiles/none.png"}]
+        stale = self.out_dir / "atlas" / "atlas-7.webp"
+        stale.parent.mkdir(parents=True)
+        stale.write_bytes(b"old")
+
+        index = build_mission_atlas(tiles, objects, self.out_dir, asset_root=self.assets, tile_size=32)
+        self.assertEqual(json.loads((self.out_dir / "atlas.json").read_text()), index)
+        self.assertEqual(
+            sorted(index["frames"]),
+            ["/adventures/tiles/grass.png", "tiles/barn.png", "tiles/grass.png"],
+        )
+        # Frames are capped at twice the tile size, keeping their aspect.
+        barn = index["frames"]["tiles/barn.png"]
+        self.assertEqual((barn["w"], barn["h"]), (64, 32))
+        self.assertEqual([page["path"] for page in index["images"]], ["atlas/atlas-0.webp"])
+        self.assertFalse(stale.exists())
+        with Image.open(self.out_dir / "atlas" / "atlas-0.webp") as page:
+            page = page.convert("RGBA")
+            pixel = page.getpixel((barn["x"] + 5, barn["y"] + 5))
+        self.assertGreater(pixel[0], 150)
+        self.assertLess(pixel[1], 60)
+
+    def test_missing_assets_skip_the_atlas(self):
+        index = build_mission_atlas([{"asset": "tiles/none.png"}], [], self.out_dir, asset_root=self.assets)
+        self.assertIsNone(index)
+        self.assertFalse((self.out_dir / "atlas.json").exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -6,6 +6,8 @@ sys.path.append(str(Path(__file__).resolve().parents[1]))
 
 from scripts.pony_server.mission_generator import validate_mission
 from scripts.pony_server.mission_core import generate_mission
+from scripts.pony_server.mission_chunks import generate_chunk
+from scripts.pony_server.mission_tiles import decode_tiles, encode_map_tiles, encode_tiles
 
 
 def build_bundle():
@@ -282,6 +284,116 @@ class MissionGeneratorValidationTests(unittest.TestCase):
         errors = validate_mission(bundle)
         self.assertFalse(any("not reachable" in err for err in errors))
 
+    def test_large_map_is_chunked_and_reachable(self):
+        manifest = {
+            "assets": [
+                {
+                    "type": "tile",
+                    "id": "tile-grass",
+                    "title": "Grass",
+                    "files": [{"path": "grass.webp", "label": "grass"}],
+                    "meta": {"tileset": "adventure_base", "slug": "grass"},
+                },
+                {
+                    "type": "tile",
+                    "id": "tile-road",
+                    "title": "Road",
+                    "files": [{"path": "road.webp", "label": "road"}],
+                    "meta": {"tileset": "adventure_base", "slug": "road"},
+                },
+                {
+                    "type": "tile",
+                    "id": "tile-water",
+                    "title": "Water",
+                    "files": [{"path": "water.webp", "label": "water"}],
+                    "meta": {"tileset": "adventure_base", "slug": "water"},
+                },
+                {
+                    "type": "sprite",
+                    "id": "sprite-owl",
+                    "title": "Owl",
+                    "files": [{"path": "owl.webp", "label": "owl"}],
+                    "meta": {"collection": "adventure_base", "slug": "owl", "class": "creature"},
+                },
+            ]
+        }
+        plan = {
+            "vibe": "test",
+            "title": "Large",
+            "layout": {"biome": "forest", "size": {"w": 150, "h": 90}},
+            "objectives": [
+                {"type": "talk_count", "label": "Talk", "targetCount": 3, "targetIds": ["owl_1", "owl_2", "owl_3"]}
+            ],
+            "zones": [{"id": "far_corner", "rect": {"x": 140, "y": 80, "w": 4, "h": 4}}],
+            "triggers": {"onEnterZones": []},
+            "dialog": {"nodes": [], "startByTarget": [], "entry": None},
+            "flags": {"local": [], "global": []},
+            "checkpoints": [{"id": "start", "tx": 0, "ty": 0}],
+        }
+        bundle = generate_mission(plan, seed=99, manifest=manifest)
+        map_data = bundle["map"]
+        self.assertNotIn("tiles", map_data)
+        self.assertEqual((map_data["width"], map_data["height"]), (150, 90))
+        self.assertEqual(len(map_data["chunks"]), 5 * 3)
+        self.assertEqual(validate_mission(bundle), [])
+
+        chunk = map_data["chunks"][7]
+        regenerated = generate_chunk(
+            99, chunk["cx"], chunk["cy"], 150, 90, "forest", bundle["tiles"]["tiles"]
+        )
+        self.assertEqual(regenerated, chunk)
+
+    def test_chunked_map_reports_bad_chunk_tiles(self):
+        bundle = build_bundle()
+        map_data = bundle["map"]
+        map_data["chunkSize"] = 2
+        map_data["chunks"] = [
+            {"cx": 0, "cy": 0, "x": 0, "y": 0, "w": 2, "h": 2, "tiles": [0, 0, 0, 0]},
+            {"cx": 1, "cy": 0, "x": 2, "y": 0, "w": 1, "h": 2, "tiles": [0, 0]},
+            {"cx": 0, "cy": 1, "x": 0, "y": 2, "w": 2, "h": 1, "tiles": [0, 0]},
+            {"cx": 1, "cy": 1, "x": 2, "y": 2, "w": 1, "h": 1, "tiles": [0]},
+        ]
+        map_data.pop("tiles")
+        self.assertEqual(validate_mission(bundle), [])
+
+        map_data["chunks"][3]["tiles"] = [5]
+        errors = validate_mission(bundle)
+        self.assertTrue(any("undefined tile id 5" in err for err in errors))
+
+    def test_tile_encodings_round_trip(self):
+        tiles = [0, 0, 0, 3, 3, 1, 0, 0, 512]
+        for encoding in ("rle", "u16-base64"):
+            encoded = encode_tiles(tiles, encoding)
+            self.assertEqual(decode_tiles(encoded, encoding), tiles)
+        self.assertEqual(encode_tiles(tiles, "rle"), [0, 3, 3, 2, 1, 1, 0, 2, 512, 1])
+
+    def test_encoded_bundle_validates(self):
+        for encoding in ("rle", "u16-base64"):
+            bundle = build_bundle()
+            bundle["map"] = encode_map_tiles(bundle["map"], encoding)
+            self.assertEqual(bundle["map"]["encoding"], encoding)
+            self.assertEqual(validate_mission(bundle), [])
+
+        bundle = build_bundle()
+        bundle["map"]["encoding"] = "rle"
+        bundle["map"]["tiles"] = [0, 0]
+        errors = validate_mission(bundle)
+        self.assertTrue(any("could not be decoded" in err for err in errors))
+
+    def test_oversized_rle_is_rejected_before_expanding(self):
+        with self.assertRaises(ValueError):
+            decode_tiles([0, 5, 1, 4], "rle", limit=8)
+        with self.assertRaises(ValueError):
+            decode_tiles(encode_tiles([0] * 9, "u16-base64"), "u16-base64", limit=8)
+        bundle = build_bundle()
+        bundle["map"]["encoding"] = "rle"
+        bundle["map"]["tiles"] = [0, 2000000000]
+        errors = validate_mission(bundle)
+        self.assertTrue(any("expand past" in err for err in errors))
+        bundle["map"]["width"] = bundle["map"]["height"] = 10**6
+        errors = validate_mission(bundle)
+        self.assertTrue(any(f"expand past {1024 * 1024}" in err for err in errors))
+
 
 if __name__ == "__main__":
     unittest.main()
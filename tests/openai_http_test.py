@@ -0,0 +1,126 @@
+import json
+import os
+import sys
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest import mock
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from scripts import openai_http
+from scripts.openai_http import HTTPTransport, RequestError, iter_sse
+from scripts.rate_limits import RateLimiter
+from scripts.pony_server import openai_client
+from scripts.speech_helper import openai_client as speech_client
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        server = self.server
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"{}")
+        with server.lock:
+            server.paths.append(self.path)
+            server.peers.add(self.client_address)
+            status = server.statuses.pop(0) if server.statuses else 200
+        extra = {}
+        if isinstance(status, tuple):
+            status, extra = status
+        if status != 200:
+            self._send(status, b'{"error":"busy"}', "application/json", extra)
+        elif body.get("stream"):
+            events = b"".join(
+                f"data: {json.dumps({'delta': part})}\n\n".encode("utf-8") for part in ("he", "llo")
+            )
+            self._send(200, events + b"data: [DONE]\n\n", "text/event-stream")
+        else:
+            self._send(200, json.dumps({"path": self.path, "echo": body}).encode("utf-8"), "application/json")
+
+    def _send(self, status, payload, content_type, extra=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (extra or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+class OpenAIHttpTest(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+        self.server.daemon_threads = True
+        self.server.lock = threading.Lock()
+        self.server.paths = []
+        self.server.peers = set()
+        self.server.statuses = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}/v1"
+        self.transport = HTTPTransport(sleep=lambda seconds: None)
+
+    def tearDown(self):
+        self.transport.close()
+        openai_http.TRANSPORT.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_requests_reuse_one_keep_alive_connection(self):
+        for index in range(3):
+            response = self.transport.request("POST", f"{self.base_url}/responses", json.dumps({"n": index}).encode())
+            self.assertEqual(response.json()["echo"], {"n": index})
+        self.assertEqual(len(self.server.peers), 1)
+        self.assertEqual(self.transport.stats(), {"connections": 1, "reused": 2, "retries": 0})
+
+    def test_retries_retryable_status_but_not_client_errors(self):
+        self.server.statuses = [503, 429]
+        response = self.transport.request("POST", f"{self.base_url}/responses", b"{}", attempts=3)
+        self.assertEqual(response.status, 200)
+        self.assertEqual(self.transport.stats()["retries"], 2)
+
+        self.server.statuses = [400]
+        with self.assertRaises(RequestError) as caught:
+            self.transport.request("POST", f"{self.base_url}/responses", b"{}", attempts=3, label="Images API request")
+        self.assertEqual(caught.exception.status, 400)
+        self.assertTrue(str(caught.exception).startswith("Images API request failed: 400"))
+        self.assertEqual(self.transport.stats()["retries"], 2)
+
+    def test_retry_after_drives_backoff_and_limiter(self):
+        sleeps = []
+        limiter = RateLimiter(max_concurrency=4)
+        transport = HTTPTransport(sleep=sleeps.append, limiter=limiter)
+        self.server.statuses = [(429, {"Retry-After": "0.05"})]
+        try:
+            response = transport.request("POST", f"{self.base_url}/images/generations", b"{}", attempts=2)
+        finally:
+            transport.close()
+        self.assertEqual(response.status, 200)
+        self.assertEqual(sleeps, [0.05])
+        self.assertEqual(limiter.stats()["throttled"], 1)
+        self.assertEqual(limiter.concurrency("images"), 2)
+
+    def test_stream_drains_sse_and_keeps_connection(self):
+        url = f"{self.base_url}/chat/completions"
+        events = list(iter_sse(self.transport.stream("POST", url, b'{"stream": true}')))
+        self.assertEqual([event["delta"] for event in events], ["he", "llo"])
+        chunks = list(self.transport.stream("POST", url, b"{}", chunk_size=4))
+        self.assertTrue(all(len(chunk) <= 4 for chunk in chunks))
+        self.assertEqual(len(self.server.peers), 1)
+
+    def test_base_url_routes_clients_to_stand_in(self):
+        messages = [{"role": "user", "content": "hi"}]
+        with mock.patch.dict(os.environ, {"OPENAI_BASE_URL": self.base_url}):
+            data = openai_client.chat_response(messages, model="gpt-4o-mini", api_key="test")
+            deltas = list(speech_client.chat_response_stream(messages, model="gpt-4o-mini", api_key="test"))
+        self.assertEqual(data["path"], "/v1/chat/completions")
+        self.assertEqual([event["delta"] for event in deltas], ["he", "llo"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,164 @@
+import json
+import random
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+try:
+    from PIL import Image
+except ImportError:  # pragma: no cover - optional dependency
+    Image = None
+
+if Image is not None:
+    from scripts import pack_spritesheet
+
+
+@unittest.skipIf(Image is None, "Pillow is not installed")
+class PackSpritesheetTest(unittest.TestCase):
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmpdir.name)
+        patcher = mock.patch.object(pack_spritesheet, "ROOT", self.root)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.frames_dir = self.root / "assets" / "ponies" / "pip" / "frames"
+        self.frames_dir.mkdir(parents=True)
+        self.originals = {}
+        for index, box in enumerate([(10, 20, 40, 60), (5, 5, 30, 62), (20, 30, 50, 50)], start=1):
+            frame = Image.new("RGBA", (64, 64), (0, 0, 0, 0))
+            frame.paste((index * 60, 100, 200, 255), box)
+            name = f"idle_{index:02d}"
+            frame.save(self.frames_dir / f"{name}.png")
+            self.originals[name] = frame
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def _pack(self, packing):
+        action_data = {"actions": [{"id": "idle", "fps": 2, "frames": 3}]}
+        self.assertTrue(
+            pack_spritesheet.pack_spritesheet(
+                "pip", 64, 8, action_data, False, "frames", True, 8192, "frames_dense", True, 60, packing
+            )
+        )
+        sheets = self.root / "assets" / "ponies" / "pip" / "sheets"
+        return json.loads((sheets / "spritesheet.json").read_text()), sheets / "spritesheet.webp"
+
+    def test_pack_rects_never_overlap(self):
+        rng = random.Random(3)
+        sizes = [(rng.randint(5, 90), rng.randint(5, 90)) for _ in range(60)]
+        placements, (width, height) = pack_spritesheet.pack_rects(sizes, 1024, 2)
+        for index, ((x, y), (w, h)) in enumerate(zip(placements, sizes)):
+            self.assertLessEqual(x + w, width)
+            self.assertLessEqual(y + h, height)
+            for (ox, oy), (ow, oh) in zip(placements[:index], sizes[:index]):
+                apart = x + w + 2 <= ox or ox + ow + 2 <= x or y + h + 2 <= oy or oy + oh + 2 <= y
+                self.assertTrue(apart)
+        self.assertIsNone(pack_spritesheet.pack_rects([(100, 100)], 64, 2))
+
+    def test_overflow_spills_onto_pages_keeping_animations_together(self):
+        for index in range(1, 3):
+            frame = Image.new("RGBA", (64, 64), (0, 0, 0, 0))
+            frame.paste((250, index * 80, 10, 255), (16, 16, 48, 48))
+            frame.save(self.frames_dir / f"walk_{index:02d}.png")
+        action_data = {"actions": [{"id": "idle", "fps": 2, "frames": 3}, {"id": "walk", "fps": 4, "frames": 2}]}
+        sheets = self.root / "assets" / "ponies" / "pip" / "sheets"
+        sheets.mkdir(parents=True)
+        (sheets / "spritesheet-5.webp").write_bytes(b"stale")
+        for packing, max_size in (("grid", 140), ("trim", 80)):
+            self.assertTrue(
+                pack_spritesheet.pack_spritesheet(
+                    "pip", 64, 2, action_data, False, "frames", True, max_size, "frames_dense", True, 60, packing
+                )
+            )
+            data = json.loads((sheets / "spritesheet.json").read_text())
+            images = data["meta"]["images"]
+            self.assertGreater(len(images), 1)
+            self.assertEqual(images[:2], ["spritesheet.webp", "spritesheet-1.webp"])
+            self.assertFalse((sheets / "spritesheet-5.webp").exists())
+            for sheet in data["meta"]["sheets"]:
+                self.assertLessEqual(max(sheet["size"].values()), max_size)
+                with Image.open(sheets / sheet["image"]) as image:
+                    self.assertEqual(image.size, (sheet["size"]["w"], sheet["size"]["h"]))
+            walk_pages = {data["frames"][name]["sheet"] for name in data["animations"]["walk"]}
+            self.assertEqual(len(walk_pages), 1)
+
+    def test_duplicate_frames_share_one_region(self):
+        self.originals["idle_01"].save(self.frames_dir / "idle_04.png")
+        # Visually identical: one pixel nudged by a single level.
+        near = self.originals["idle_02"].copy()
+        near.putpixel((10, 10), (121, 100, 200, 255))
+        near.save(self.frames_dir / "idle_05.png")
+        action_data = {"actions": [{"id": "idle", "fps": 2, "frames": 5}]}
+        sheets = self.root / "assets" / "ponies" / "pip" / "sheets"
+        expected = {"off": 5, "exact": 4, "near": 3}
+        for packing in ("grid", "trim"):
+            for dedupe, regions in expected.items():
+                pack_spritesheet.pack_spritesheet(
+                    "pip", 64, 8, action_data, False, "frames", True, 8192, "frames_dense", True, 60, packing, dedupe
+                )
+                frames = json.loads((sheets / "spritesheet.json").read_text())["frames"]
+                self.assertEqual(len(frames), 5)
+                rects = {json.dumps(entry["frame"], sort_keys=True) for entry in frames.values()}
+                self.assertEqual(len(rects), regions, (packing, dedupe))
+                if dedupe != "off":
+                    self.assertEqual(frames["idle_04"], frames["idle_01"])
+
+    def test_near_dedupe_keeps_moved_limbs_and_tints(self):
+        def pony(leg_x, body=(200, 120, 60, 255)):
+            frame = Image.new("RGBA", (512, 512), (0, 0, 0, 0))
+            frame.paste(body, (150, 150, 330, 300))
+            frame.paste((170, 110, 55, 255), (leg_x, 300, leg_x + 30, 390))
+            return frame
+
+        base = pony(180)
+        self.assertTrue(pack_spritesheet._is_near_duplicate(base, base.copy()))
+        variants = [pony(180 + shift) for shift in (6, 12, 18)] + [pony(180, body=(228, 120, 60, 255))]
+        for variant in variants:
+            # Close enough for the dHash gate; the pixel check has to tell them apart.
+            distance = bin(pack_spritesheet.frame_dhash(base) ^ pack_spritesheet.frame_dhash(variant)).count("1")
+            self.assertLessEqual(distance, pack_spritesheet.NEAR_DUPLICATE_DISTANCE)
+            self.assertFalse(pack_spritesheet._is_near_duplicate(base, variant))
+
+    def test_auto_flip_runs_in_the_frame_pool(self):
+        left = Image.new("RGBA", (64, 64), (0, 0, 0, 0))
+        left.paste((10, 200, 10, 255), (2, 10, 20, 60))
+        left.save(self.frames_dir / "idle_04.png")
+        action_data = {"actions": [{"id": "idle", "fps": 2, "frames": 4}]}
+        pack_spritesheet.pack_spritesheet(
+            "pip", 64, 8, action_data, True, "frames", True, 8192, "frames_dense", True, 60, "trim", "exact", 3
+        )
+        with Image.open(self.frames_dir / "idle_04.png") as frame:
+            self.assertEqual(frame.getchannel("A").getbbox(), (44, 10, 62, 60))
+        frames = json.loads((self.root / "assets" / "ponies" / "pip" / "sheets" / "spritesheet.json").read_text())["frames"]
+        self.assertEqual(frames["idle_04"]["spriteSourceSize"]["x"], 44)
+
+    def test_trimmed_sheet_reconstructs_every_frame(self):
+        grid, _ = self._pack("grid")
+        trimmed, sheet_path = self._pack("trim")
+        self.assertEqual(trimmed["animations"], grid["animations"])
+        grid_size = grid["meta"]["size"]
+        trimmed_size = trimmed["meta"]["size"]
+        self.assertLess(trimmed_size["w"] * trimmed_size["h"], grid_size["w"] * grid_size["h"] / 2)
+
+        with Image.open(sheet_path) as sheet:
+            sheet = sheet.convert("RGBA")
+        for name, original in self.originals.items():
+            entry = trimmed["frames"][name]
+            frame, source = entry["frame"], entry["spriteSourceSize"]
+            self.assertEqual(entry["sourceSize"], {"w": 64, "h": 64})
+            # The anchor still points at the same source pixel.
+            self.assertEqual(entry["anchor"]["x"] + source["x"], grid["frames"][name]["anchor"]["x"])
+            self.assertEqual(entry["anchor"]["y"] + source["y"], grid["frames"][name]["anchor"]["y"])
+            rebuilt = Image.new("RGBA", (64, 64), (0, 0, 0, 0))
+            crop = sheet.crop((frame["x"], frame["y"], frame["x"] + frame["w"], frame["y"] + frame["h"]))
+            rebuilt.paste(crop, (source["x"], source["y"]))
+            self.assertEqual(rebuilt.getchannel("A").getbbox(), original.getchannel("A").getbbox())
+
+
+if __name__ == "__main__":
+    unittest.main()
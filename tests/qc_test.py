@@ -0,0 +1,55 @@
+import random
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+try:
+    from PIL import Image
+except ImportError:  # pragma: no cover - optional dependency
+    Image = None
+
+from scripts.sprites import frame_qc, qc
+
+
+def _random_frame(rng):
+    width, height = rng.choice([7, 8, 33, 64, 65]), rng.choice([5, 40])
+    image = Image.new("RGBA", (width, height), (0, 0, 0, 0))
+    for _ in range(rng.randint(0, 6)):
+        x0, y0 = rng.randrange(width), rng.randrange(height)
+        box = (x0, y0, min(width, x0 + rng.randint(1, width)), min(height, y0 + rng.randint(1, height)))
+        image.paste((10, 20, 30, rng.randint(1, 255)), box)
+    return image
+
+
+@unittest.skipIf(Image is None, "Pillow is not installed")
+class FacingTest(unittest.TestCase):
+    def test_numpy_and_python_paths_agree(self):
+        if frame_qc.np is None:
+            self.skipTest("numpy is not installed")
+        rng = random.Random(4)
+        for _ in range(100):
+            image = _random_frame(rng)
+            expected = qc.image_needs_horizontal_flip(image)
+            with mock.patch.object(frame_qc, "np", None):
+                self.assertEqual(qc.image_needs_horizontal_flip(image), expected)
+
+    def test_left_facing_frame_is_flipped_in_place(self):
+        image = Image.new("RGBA", (64, 64), (0, 0, 0, 0))
+        image.paste((200, 0, 0, 255), (2, 10, 30, 60))
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "idle_01.png"
+            image.save(path)
+            self.assertTrue(qc.needs_horizontal_flip(path))
+            self.assertTrue(qc.enforce_facing_right(path))
+            self.assertFalse(qc.enforce_facing_right(path))
+            with Image.open(path) as flipped:
+                self.assertEqual(flipped.getchannel("A").getbbox(), (34, 10, 62, 60))
+            self.assertFalse(qc.enforce_facing_right(Path(tmpdir) / "missing.png"))
+
+
+if __name__ == "__main__":
+    unittest.main()
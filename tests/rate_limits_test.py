@@ -0,0 +1,89 @@
+import sys
+import threading
+import time
+import unittest
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from scripts.rate_limits import RateLimiter, TokenBucket, limit_key, parse_duration, retry_after
+
+
+class RateLimitsTest(unittest.TestCase):
+    def test_bucket_refills_continuously(self):
+        bucket = TokenBucket(60, now=0.0)
+        # 60/min bursts over 10s: ten requests, then one per second.
+        for _ in range(10):
+            self.assertEqual(bucket.delay(1, 0.0), 0.0)
+            bucket.take(1, 0.0)
+        self.assertAlmostEqual(bucket.delay(1, 0.0), 1.0)
+        self.assertEqual(bucket.delay(1, 1.0), 0.0)
+
+    def test_bucket_follows_server_headers(self):
+        limiter = RateLimiter(clock=lambda: 100.0)
+        limiter.acquire("text", tokens=50)
+        limiter.release(
+            "text",
+            200,
+            {
+                "x-ratelimit-limit-requests": "600",
+                "x-ratelimit-remaining-requests": "0",
+                "x-ratelimit-reset-requests": "2s",
+                "x-ratelimit-limit-tokens": "60000",
+                "x-ratelimit-remaining-tokens": "59000",
+            },
+        )
+        state = limiter._keys["text"]
+        self.assertEqual(state["requests"].limit, 600)
+        self.assertAlmostEqual(state["requests"].delay(1, 100.0), 2.1)
+        self.assertEqual(state["tokens"].delay(1000, 100.0), 0.0)
+
+    def test_concurrency_halves_on_429_and_recovers(self):
+        limiter = RateLimiter(max_concurrency=8)
+        limiter.acquire("images")
+        limiter.release("images", 429, {"retry-after": "0"})
+        self.assertEqual(limiter.concurrency("images"), 4)
+        for _ in range(4):
+            limiter.acquire("images")
+            limiter.release("images", 200)
+        self.assertEqual(limiter.concurrency("images"), 5)
+        self.assertEqual(limiter.stats()["throttled"], 1)
+
+    def test_acquire_blocks_until_a_slot_frees(self):
+        limiter = RateLimiter(max_concurrency=1)
+        limiter.acquire("text")
+        acquired = threading.Event()
+
+        def worker():
+            limiter.acquire("text")
+            acquired.set()
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        self.assertFalse(acquired.wait(0.1))
+        limiter.release("text", 200)
+        self.assertTrue(acquired.wait(1.0))
+        thread.join()
+
+    def test_pause_from_retry_after_delays_other_threads(self):
+        limiter = RateLimiter()
+        limiter.acquire("images")
+        limiter.release("images", 429, {"retry-after-ms": "150"})
+        start = time.monotonic()
+        limiter.acquire("images")
+        self.assertGreaterEqual(time.monotonic() - start, 0.1)
+
+    def test_header_parsing(self):
+        self.assertEqual(parse_duration("6m0s"), 360.0)
+        self.assertAlmostEqual(parse_duration("1m30.5s"), 90.5)
+        self.assertAlmostEqual(parse_duration("20ms"), 0.02)
+        self.assertEqual(retry_after({"retry-after": "3"}), 3.0)
+        self.assertEqual(retry_after({"retry-after-ms": "250", "retry-after": "3"}), 0.25)
+        self.assertEqual(retry_after({"retry-after": "Wed, 21 Oct 2015 07:28:00 GMT"}), 0.0)
+        self.assertIsNone(retry_after({}))
+        self.assertEqual(limit_key("https://api.openai.com/v1/images/edits"), "images")
+        self.assertEqual(limit_key("https://api.openai.com/v1/responses"), "text")
+
+
+if __name__ == "__main__":
+    unittest.main()
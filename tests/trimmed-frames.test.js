@@ -0,0 +1,78 @@
+import test from "node:test";
+import assert from "node:assert/strict";
+
+import { createActorDrawer } from "../assets/js/map/actors/draw.js";
+
+const createContext = () => {
+  const calls = [];
+  const ctx = {
+    save() {},
+    restore() {},
+    translate(x) {
+      calls.push({ translate: x });
+    },
+    scale() {},
+    drawImage(...args) {
+      calls.push({ drawImage: args });
+    },
+  };
+  const drawer = createActorDrawer({
+    ctx,
+    mapData: { meta: { tileSize: 64 } },
+    ASSET_SCALE: 1,
+    VFX_REGISTRY: [],
+    vfxVideos: new Map(),
+  });
+  return { calls, drawer };
+};
+
+const drawFrame = (entry, facing) => {
+  const { calls, drawer } = createContext();
+  const actor = {
+    sprite: {
+      meta: { frames: { idle_01: entry }, animations: { walk: ["idle_01"] }, fps: {} },
+      moveType: "walk",
+      moveFrames: ["idle_01"],
+      sheet: {},
+      pony: { slug: "pip" },
+    },
+    segment: {},
+    position: { x: 100, y: 200 },
+    facing,
+    lastFrame: 0,
+    frameIndex: 0,
+  };
+  drawer.drawActor(actor, 0, 0, 1, null, false);
+  const [, , , , , destX, destY, drawW, drawH] = calls.find((call) => call.drawImage).drawImage;
+  const translate = calls.find((call) => "translate" in call);
+  // Flipped draws land in [translate - drawW, translate].
+  const left = translate ? translate.translate - drawW : destX;
+  return { left, top: destY, width: drawW, height: drawH, bounds: actor.bounds };
+};
+
+const gridEntry = {
+  frame: { x: 0, y: 0, w: 512, h: 512 },
+  anchor: { x: 256, y: 480 },
+};
+// The same frame trimmed to the opaque 200x300 box at (100, 150).
+const trimmedEntry = {
+  frame: { x: 4, y: 4, w: 200, h: 300 },
+  anchor: { x: 156, y: 330 },
+  trimmed: true,
+  spriteSourceSize: { x: 100, y: 150, w: 200, h: 300 },
+  sourceSize: { w: 512, h: 512 },
+};
+
+test("trimmed frames draw where the untrimmed frame's pixels were", () => {
+  const scale = 64 / 512;
+  for (const facing of [1, -1]) {
+    const grid = drawFrame(gridEntry, facing);
+    const trimmed = drawFrame(trimmedEntry, facing);
+    const offsetX = facing === -1 ? 512 - 100 - 200 : 100;
+    assert.ok(Math.abs(trimmed.left - (grid.left + offsetX * scale)) < 1e-9);
+    assert.ok(Math.abs(trimmed.top - (grid.top + 150 * scale)) < 1e-9);
+    assert.equal(trimmed.width, 200 * scale);
+    assert.equal(trimmed.height, 300 * scale);
+    assert.deepEqual(trimmed.bounds, grid.bounds);
+  }
+});
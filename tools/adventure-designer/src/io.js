@@ -1,5 +1,6 @@
 import { normalizeNotes } from "./notes.js";
 import { createUndoStack } from "./undo.js";
+import { decodeTiles } from "./utils.js";
 
 export function exportDraft(context) {
   const map = context.store.getState();
@@ -58,7 +59,13 @@ export function normalizeImportedMap(data) {
   if (!Number.isInteger(data.width) || !Number.isInteger(data.height)) {
     return null;
   }
-  if (!Array.isArray(data.tiles) || data.tiles.length !== data.width * data.height) {
+  let tiles;
+  try {
+    tiles = decodeTiles(data.tiles, data.encoding);
+  } catch (error) {
+    return null;
+  }
+  if (tiles.length !== data.width * data.height) {
     return null;
   }
   const sketchTiles =
@@ -75,7 +82,7 @@ export function normalizeImportedMap(data) {
     status: data.status === "deployed" ? "deployed" : "draft",
     width: data.width,
     height: data.height,
-    tiles: data.tiles,
+    tiles,
     sketchTiles,
     objects: Array.isArray(data.objects) ? data.objects : [],
     roads: Array.isArray(data.roads) ? data.roads : [],
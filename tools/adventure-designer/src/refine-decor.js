@@ -113,7 +113,8 @@ function buildRegionBounds(regions) {
     }
     const bounds = normalizeBounds(region.bounds);
     if (bounds) {
-      regionBounds[region.id] = bounds;
+      // Server regions may carry an exact [y, x, length] run mask.
+      regionBounds[region.id] = Array.isArray(region.mask) ? { ...bounds, mask: region.mask } : bounds;
     }
   });
   return regionBounds;
@@ -148,6 +149,16 @@ function buildCandidateCells(rule, terrainGrid, regionBounds, width, height, nor
 
   if (regionBoundsList.length > 0) {
     regionBoundsList.forEach((bounds) => {
+      if (bounds.mask) {
+        bounds.mask.forEach(([y, x, length]) => {
+          for (let dx = 0; dx < length; dx += 1) {
+            if (x + dx < width && y < height) {
+              cells.push({ x: x + dx, y });
+            }
+          }
+        });
+        return;
+      }
       const xMax = Math.min(width, bounds.x + bounds.w);
       const yMax = Math.min(height, bounds.y + bounds.h);
       for (let y = Math.max(0, bounds.y); y < yMax; y += 1) {
@@ -2,6 +2,25 @@ export function clamp(value, min, max) {
   return Math.max(min, Math.min(max, value));
 }
 
+export function decodeTiles(value, encoding) {
+  if (!encoding) return Array.isArray(value) ? value : [];
+  if (encoding === "rle") {
+    const tiles = [];
+    for (let i = 0; i + 1 < value.length; i += 2) {
+      for (let n = 0; n < value[i + 1]; n += 1) tiles.push(value[i]);
+    }
+    return tiles;
+  }
+  if (encoding === "u16-base64") {
+    const bytes = Uint8Array.from(atob(value), (ch) => ch.charCodeAt(0));
+    const view = new DataView(bytes.buffer);
+    const tiles = new Array(bytes.length >> 1);
+    for (let i = 0; i < tiles.length; i += 1) tiles[i] = view.getUint16(i * 2, true);
+    return tiles;
+  }
+  throw new Error(`Unsupported tile encoding: ${encoding}`);
+}
+
 export function isTypingTarget(target) {
   if (!target) {
     return false;
@@ -593,6 +593,30 @@ const resetGenerator = () => {
   setWorkingSprite(false, "Ready to generate.");
 };
 
+const JOB_STAGE_LABELS = {
+  queued: "Queued...",
+  running: "Starting...",
+  reserving: "Reserving a slug...",
+  requesting_image: "Contacting the API...",
+  converting: "Converting to WebP...",
+  saving_manifest: "Saving to the manifest..."
+};
+
+const waitForAssetJob = async (jobId) => {
+  for (;;) {
+    const response = await fetch(`/api/assets/jobs/${jobId}`, { cache: "no-store" });
+    const data = await response.json().catch(() => ({}));
+    if (!response.ok || !data.job) {
+      throw new Error(data.error || `Job lookup failed (${response.status}).`);
+    }
+    const { job } = data;
+    if (job.status === "done") return job;
+    if (job.status === "failed") throw new Error(job.error || "Generation failed.");
+    setGenerateStatus("Generating", JOB_STAGE_LABELS[job.stage] || "Working...");
+    await new Promise((resolve) => setTimeout(resolve, 1000));
+  }
+};
+
 const handleGenerateSubmit = async (event) => {
   event.preventDefault();
   if (window.location.protocol === "file:") {
@@ -616,7 +640,7 @@ const handleGenerateSubmit = async (event) => {
     const response = await fetch("/api/assets/generate", {
       method: "POST",
       headers: { "Content-Type": "application/json" },
-      body: JSON.stringify(payload)
+      body: JSON.stringify({ ...payload, async: true })
     });
     if (!response.ok) {
       const errorPayload = await response.json().catch(() => ({}));
@@ -624,11 +648,12 @@ const handleGenerateSubmit = async (event) => {
       throw new Error(message);
     }
     const data = await response.json();
-    if (!data.ok) {
+    if (!data.ok || !data.job) {
       throw new Error(data.error || "Generation failed.");
     }
-    if (data.asset?.preview && dom.workingSpriteImg) {
-      dom.workingSpriteImg.src = data.asset.preview;
+    const job = await waitForAssetJob(data.job.id);
+    if (job.asset?.preview && dom.workingSpriteImg) {
+      dom.workingSpriteImg.src = job.asset.preview;
     }
     setGenerateStatus("Complete", "Asset generated.");
     setWorkingSprite(false, "Asset generated and added to the library.");
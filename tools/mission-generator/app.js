@@ -1,6 +1,6 @@
 import { state } from "./state.js";
 import { els } from "./dom.js";
-import { slugify, isTimeoutError, parseBatchList } from "./utils.js";
+import { decodeMapTiles, slugify, isTimeoutError, parseBatchList } from "./utils.js";
 import { showError, hideError, copyError } from "./errors.js";
 import {
   renderMap,
@@ -56,6 +56,16 @@ async function apiGet(path) {
   return data;
 }
 
+async function waitForAssetJob(jobId, onProgress) {
+  for (;;) {
+    const { job } = await apiGet(`/api/assets/jobs/${jobId}`);
+    if (job.status === "done") return job;
+    if (job.status === "failed") throw new Error(job.error || "Asset generation failed.");
+    onProgress?.(job);
+    await new Promise((resolve) => setTimeout(resolve, 1000));
+  }
+}
+
 function setBusy(active, label = "Working...") {
   if (!els.busyOverlay) return;
   if (active) {
@@ -257,8 +267,10 @@ async function handleGenerate() {
     const response = await apiPost("/api/missions/generate", {
       plan: state.plan,
       seed: readSeed(),
+      tileEncoding: "rle",
     });
     state.bundle = response.bundle;
+    decodeMapTiles(state.bundle?.map);
     state.interactions = buildInteractionMap(state.bundle);
     state.checkpoints = state.bundle.mission?.checkpoints || [];
     setMissionSummary(state.bundle.mission?.summary || state.plan.summary || "Mission generated.");
@@ -346,12 +358,23 @@ async function handleGenerateAssets() {
   if (!confirm("Generate assets with OpenAI (costs credits)?")) return;
   setBusy(true, "Generating assets...");
   try {
-    for (const asset of selected) {
-      const response = await apiPost("/api/assets/generate", asset);
-      if (response.asset?.id) {
-        setMissionSummary(`Generated asset: ${response.asset.id}`);
-      }
-    }
+    // Submit everything up front; the server runs jobs in parallel and
+    // coalesces identical prompts.
+    const submitted = await Promise.all(
+      selected.map((asset) => apiPost("/api/assets/generate", { ...asset, async: true }))
+    );
+    const jobIds = [...new Set(submitted.map((response) => response.job.id))];
+    let finished = 0;
+    await Promise.all(
+      jobIds.map(async (jobId) => {
+        const job = await waitForAssetJob(jobId);
+        finished += 1;
+        setBusy(true, `Generating assets... (${finished}/${jobIds.length})`);
+        if (job.asset?.id) {
+          setMissionSummary(`Generated asset: ${job.asset.id}`);
+        }
+      })
+    );
   } catch (error) {
     showError(error);
   } finally {
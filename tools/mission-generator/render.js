@@ -1,6 +1,6 @@
 import { state } from "./state.js";
 import { els, ctx, miniCtx, MIN_TILE_SIZE, MAX_TILE_SIZE } from "./dom.js";
-import { clamp, resolveActionKey, resolveActionLabel } from "./utils.js";
+import { clamp, mapTileAt, resolveActionKey, resolveActionLabel } from "./utils.js";
 
 const imageCache = new Map();
 
@@ -48,7 +48,7 @@ export function renderMap() {
       const tx = camX + x;
       const ty = camY + y;
       if (tx < 0 || ty < 0 || tx >= width || ty >= height) continue;
-      const tileId = map.tiles[ty * width + tx];
+      const tileId = mapTileAt(map, tx, ty);
       const tile = tileDefs.get(tileId);
       if (state.renderAssets && tile?.asset) {
         const img = getImage(tile.asset);
@@ -105,7 +105,7 @@ export function renderMinimap(map, tileDefs, view) {
   miniCtx.clearRect(0, 0, els.minimap.width, els.minimap.height);
   for (let y = 0; y < height; y += 1) {
     for (let x = 0; x < width; x += 1) {
-      const tileId = map.tiles[y * width + x];
+      const tileId = mapTileAt(map, x, y);
       const tile = tileDefs.get(tileId);
       miniCtx.fillStyle = tile?.color || "#e2e8f0";
       miniCtx.fillRect(x * tileSize, y * tileSize, tileSize, tileSize);
@@ -240,7 +240,7 @@ export function isWalkableTile(x, y) {
   const tiles = state.bundle.tiles?.tiles || [];
   const tileDefs = new Map(tiles.map((tile) => [tile.id, tile]));
   if (x < 0 || y < 0 || x >= map.width || y >= map.height) return false;
-  const tileId = map.tiles[y * map.width + x];
+  const tileId = mapTileAt(map, x, y);
   return tileDefs.get(tileId)?.walkable ?? false;
 }
 
@@ -2,6 +2,59 @@ export function clamp(value, min, max) {
   return Math.max(min, Math.min(max, value));
 }
 
+export function decodeTiles(value, encoding) {
+  if (!encoding) return Array.isArray(value) ? value : [];
+  if (encoding === "rle") {
+    const tiles = [];
+    for (let i = 0; i + 1 < value.length; i += 2) {
+      for (let n = 0; n < value[i + 1]; n += 1) tiles.push(value[i]);
+    }
+    return tiles;
+  }
+  if (encoding === "u16-base64") {
+    const bytes = Uint8Array.from(atob(value), (ch) => ch.charCodeAt(0));
+    const view = new DataView(bytes.buffer);
+    const tiles = new Array(bytes.length >> 1);
+    for (let i = 0; i < tiles.length; i += 1) tiles[i] = view.getUint16(i * 2, true);
+    return tiles;
+  }
+  throw new Error(`Unsupported tile encoding: ${encoding}`);
+}
+
+export function decodeMapTiles(map) {
+  if (!map) return map;
+  if (Array.isArray(map.chunks)) {
+    map.chunks = map.chunks.map((chunk) => {
+      if (!chunk.encoding) return chunk;
+      const { encoding, ...rest } = chunk;
+      return { ...rest, tiles: decodeTiles(chunk.tiles, encoding) };
+    });
+    return map;
+  }
+  if (map.encoding) {
+    map.tiles = decodeTiles(map.tiles, map.encoding);
+    delete map.encoding;
+  }
+  return map;
+}
+
+const chunkIndexCache = new WeakMap();
+
+export function mapTileAt(map, x, y) {
+  if (!Array.isArray(map.chunks)) {
+    return map.tiles?.[y * map.width + x];
+  }
+  let index = chunkIndexCache.get(map.chunks);
+  if (!index) {
+    index = new Map(map.chunks.map((entry) => [`${entry.cx},${entry.cy}`, entry]));
+    chunkIndexCache.set(map.chunks, index);
+  }
+  const size = map.chunkSize || 32;
+  const chunk = index.get(`${Math.floor(x / size)},${Math.floor(y / size)}`);
+  if (!chunk || !Array.isArray(chunk.tiles)) return undefined;
+  return chunk.tiles[(y - chunk.y) * chunk.w + (x - chunk.x)];
+}
+
 export function slugify(value) {
   if (!value) return "";
   return value